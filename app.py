@@ -1,20 +1,107 @@
 import dash
+import flask
 from dash import html, dcc
 
-app = dash.Dash(__name__, use_pages=True)
+from utils import assets, estaticos, perfilado
+from utils.circuito import estado_circuitos
+from utils.compresion import activar_compresion
+from utils.metricas import TIPO_CONTENIDO, exportar, instrumentar_callbacks, nombres_callbacks
+from utils.refresco import refrescador
+from utils.serializacion import activar_serializacion_binaria
+
+app = dash.Dash(
+    __name__,
+    use_pages=True,
+    # Las hojas de assets/ van en un solo CSS minificado con huella (utils/assets.py)
+    assets_ignore=r"\.css$",
+    external_stylesheets=[assets.url_css()],
+)
 server = app.server
 
+# gzip / brotli para HTML, JS, CSS y respuestas de callbacks
+activar_compresion(server)
+
+# Figuras con arreglos en base64 (typed arrays) y JSON con orjson
+activar_serializacion_binaria()
+
+# Recarga en segundo plano de los datos externos (clima, COVID, SUNAT)
+refrescador.iniciar()
+
+# Latencia, tamaño y disparador de cada callback (se exportan en /metrics)
+instrumentar_callbacks(app)
+
+
+# Estado de los circuit breakers de las APIs externas (monitoreo)
+@server.route("/estado/circuitos")
+def ver_estado_circuitos():
+    return flask.jsonify(estado_circuitos())
+
+
+# Métricas de los callbacks en formato Prometheus
+@server.route("/metrics")
+def ver_metricas():
+    return flask.Response(exportar(), content_type=TIPO_CONTENIDO)
+
+
+# Perfilado bajo demanda (solo con el token de PERFILADO_TOKEN)
+@server.route("/admin/perfilado", methods=["GET", "POST", "DELETE"])
+def administrar_perfilado():
+    if not perfilado.autorizado(flask.request):
+        flask.abort(404)
+    if flask.request.method == "POST":
+        datos = flask.request.get_json(silent=True) or flask.request.form
+        callback = datos.get("callback")
+        if callback not in nombres_callbacks():
+            return flask.jsonify(error="callback desconocido", callbacks=nombres_callbacks()), 400
+        try:
+            perfilado.armar(callback, datos.get("n", 1), datos.get("modo", "muestreo"))
+        except ValueError as e:
+            return flask.jsonify(error=str(e)), 400
+    elif flask.request.method == "DELETE":
+        perfilado.desarmar(flask.request.args.get("callback"))
+    return flask.jsonify(perfilado.estado())
+
+
+# Acceso de administrador desde el navegador (panel /admin/rendimiento)
+FORMULARIO_ADMIN = """<!doctype html><title>Administración</title>
+<form method="post"><input type="password" name="token" placeholder="Token" autofocus>
+<button>Entrar</button></form>"""
+
+
+@server.route("/admin/entrar", methods=["GET", "POST"])
+def entrar_admin():
+    if perfilado.valor_cookie() is None:
+        flask.abort(404)
+    if flask.request.method == "GET":
+        return FORMULARIO_ADMIN
+    if not perfilado.token_valido(flask.request.form.get("token")):
+        flask.abort(404)
+    respuesta = flask.redirect("/admin/rendimiento")
+    respuesta.set_cookie(perfilado.COOKIE_ADMIN, perfilado.valor_cookie(), max_age=8 * 3600,
+                         httponly=True, samesite="Strict", secure=flask.request.is_secure)
+    return respuesta
+
+
+# Figuras estáticas precompiladas (JSON con huella, caché de un año)
+@server.route(f"{estaticos.RUTA_URL}<path:archivo>")
+def servir_estatico(archivo):
+    return estaticos.servir(archivo)
+
+
 app.layout = html.Div([
     html.H1("Técnicas de Modelamiento Matemático", className='app-header'),
 
     html.Div([
         dcc.Link(f"{page['name']}", href=page["relative_path"], className='nav-link')
         for page in dash.page_registry.values()
+        if not page.get("oculta")   # páginas de administración
     ], className='navigation'),
 
     dash.page_container
 ], className='app-container')
 
+# Desarrollo: python app.py
+# Producción (varios workers con caché compartida): gunicorn -c gunicorn.conf.py
 if __name__ == "__main__":
     app.run(debug=True, use_reloader=True)
 
@@ -0,0 +1,48 @@
+"""
+Modo producción: varios workers de gunicorn que comparten la app ya cargada
+y una caché común.
+
+    gunicorn -c gunicorn.conf.py
+
+- preload_app: el maestro importa app.py (páginas, CSS, plantillas) una vez
+  y los workers la heredan con fork, así que arrancan al instante.
+- CACHE_BACKEND=sqlite: las simulaciones memoizadas (utils/cache.py) y los
+  datos de las APIs (utils/refresco.py) se guardan en un archivo SQLite
+  local; lo que calcula un worker es un acierto en todos.
+
+Variables de entorno: GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, CACHE_SQLITE_RUTA.
+"""
+import multiprocessing
+import os
+
+# Antes de cargar la app: las cachés leen el backend al crearse
+os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+wsgi_app = "app:server"
+preload_app = True
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Los callbacks esperan a las APIs externas: hilos por worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+
+
+def when_ready(server):
+    """Figuras estáticas y fórmulas construidas en el maestro, antes de crear workers."""
+    from utils import estaticos
+    from utils.matematicas import construir_formulas
+
+    construidas = estaticos.construir_faltantes()
+    if construidas:
+        server.log.info("Figuras estáticas construidas: %s", ", ".join(construidas))
+    server.log.info("Fórmulas SVG listas: %d", len(construir_formulas()))
+
+
+def post_fork(server, worker):
+    """Ayudantes de la página 6 (utils/evaluador.py) listos antes del primer pedido."""
+    from utils import evaluador
+
+    evaluador.evaluador.precalentar()
@@ -0,0 +1,238 @@
+import os
+import time
+from collections import defaultdict
+
+import dash
+import flask
+import numpy as np
+import plotly.graph_objects as go
+from dash import html, dcc, callback, Input, Output
+from dash.exceptions import MissingCallbackContextException, PreventUpdate
+
+from utils import cache, http, memoria, metricas, perfilado, refresco
+from utils.figuras import figura_base
+
+# Oculta en la navegación (app.py) y solo para administradores: el acceso
+# se obtiene en /admin/entrar con el token de PERFILADO_TOKEN
+dash.register_page(__name__, path="/admin/rendimiento", name="Rendimiento", oculta=True)
+
+# ==================================================
+# Panel de rendimiento interno
+# ==================================================
+# Lee los anillos en memoria del proceso que atiende la petición
+# (utils/metricas.py, utils/http.py) y los contadores de caché. Con varios
+# workers cada uno muestra lo suyo (ver el PID en la primera tarjeta).
+
+VENTANA = 300            # s de historia que se muestran
+INTERVALO_MS = 3000
+TOP_CALLBACKS = 12
+
+COLORES = ["#fabd2f", "#b8bb26", "#83a598", "#fe8019", "#d3869b", "#8ec07c", "#fb4934", "#d5c4a1"]
+
+
+def _tarjeta(titulo, id_, clase):
+    return html.Div(
+        [html.H4(titulo, className=f"card-title {clase}"), html.H3(id=id_, className=f"card-value {clase}")],
+        className="clima-card",
+    )
+
+
+def _para_un_usuario():
+    """
+    True si el layout se arma para mostrarlo (callback de navegación de
+    Dash). Dash también lo arma para su validation_layout, dentro de la
+    primera petición pero fuera de un callback, y los scripts fuera de toda
+    petición: ahí va el árbol completo, o los IDs del panel no existirían
+    para la validación de callbacks.
+    """
+    if not flask.has_request_context():
+        return False
+    try:
+        dash.ctx.triggered_id
+    except MissingCallbackContextException:
+        return False
+    return True
+
+
+def layout(**_):
+    if _para_un_usuario() and not perfilado.autorizado(flask.request):
+        return html.Div(html.H2("Página no encontrada", className="title"), className="page-container")
+
+    return html.Div(
+        [
+            html.H2("Rendimiento interno", className="title"),
+            html.Div(
+                [
+                    _tarjeta("Proceso", "adm-pid", "temp"),
+                    _tarjeta("Memoria", "adm-memoria", "humedad"),
+                    _tarjeta("Callbacks / min", "adm-ritmo", "viento"),
+                    _tarjeta("Aciertos de caché", "adm-aciertos", "temp"),
+                ],
+                className="clima-card-container",
+            ),
+            html.Div(
+                [
+                    html.Div(
+                        [
+                            dcc.Graph(id="adm-latencias", style={"height": "360px"}),
+                            html.H4("Callbacks más costosos (tiempo total en la ventana)", className="title"),
+                            html.Div(id="adm-tabla-callbacks", className="admin-tabla"),
+                        ],
+                        className="content left",
+                    ),
+                    html.Div(
+                        [
+                            dcc.Graph(id="adm-caches", style={"height": "300px"}),
+                            dcc.Graph(id="adm-apis", style={"height": "300px"}),
+                            dcc.Graph(id="adm-memoria-grafica", style={"height": "260px"}),
+                        ],
+                        className="content right",
+                    ),
+                ],
+                className="admin-columnas",
+            ),
+            dcc.Interval(id="adm-intervalo", interval=INTERVALO_MS),
+        ],
+        className="page-container admin-container",
+    )
+
+
+# ==================================================
+# Resúmenes de los anillos
+# ==================================================
+def _recientes(anillo, desde):
+    return [r for r in list(anillo) if r[0] >= desde]
+
+
+def resumen_callbacks(llamadas):
+    """Filas por callback ordenadas por tiempo total (los "hot paths")."""
+    por_callback = defaultdict(list)
+    for _, nombre, total, fases, tamano, resultado in llamadas:
+        por_callback[nombre].append((total, fases.get("calculo", 0.0), tamano, resultado))
+
+    filas = []
+    for nombre, datos in por_callback.items():
+        totales = np.array([d[0] for d in datos]) * 1000
+        filas.append({
+            "callback": nombre.removeprefix("pages."),
+            "llamadas": len(datos),
+            "p50": np.percentile(totales, 50),
+            "p95": np.percentile(totales, 95),
+            "total_s": totales.sum() / 1000,
+            "calculo_pct": 100 * sum(d[1] for d in datos) / max(totales.sum() / 1000, 1e-9),
+            "kib": np.mean([d[2] for d in datos]) / 1024,
+            "errores": sum(d[3] == "error" for d in datos),
+        })
+    return sorted(filas, key=lambda f: f["total_s"], reverse=True)
+
+
+def aciertos_cache():
+    """{caché: (aciertos, consultas)} de las simulaciones memoizadas y del refresco."""
+    conteos = defaultdict(lambda: [0, 0])
+    for etiquetas, valor in cache.CONSULTAS.series():
+        c = conteos[f"sim: {etiquetas['cache']}"]
+        c[0] += valor if etiquetas["resultado"] == "acierto" else 0
+        c[1] += valor
+    for etiquetas, valor in refresco.LECTURAS.series():
+        # "vencido" también se sirve desde la caché (mientras se recarga)
+        c = conteos[f"api: {etiquetas['fuente']}"]
+        c[0] += valor if etiquetas["resultado"] in ("fresco", "vencido") else 0
+        c[1] += valor
+    return dict(sorted(conteos.items()))
+
+
+def _tabla(filas):
+    columnas = [("callback", "Callback", "{}"), ("llamadas", "Llamadas", "{}"), ("p50", "p50 ms", "{:.1f}"),
+                ("p95", "p95 ms", "{:.1f}"), ("total_s", "Total s", "{:.2f}"),
+                ("calculo_pct", "% cálculo", "{:.0f}"), ("kib", "KiB", "{:.1f}"), ("errores", "Errores", "{}")]
+    return html.Table([
+        html.Thead(html.Tr([html.Th(titulo) for _, titulo, _ in columnas])),
+        html.Tbody([
+            html.Tr([html.Td(formato.format(fila[clave])) for clave, _, formato in columnas])
+            for fila in filas[:TOP_CALLBACKS]
+        ]),
+    ])
+
+
+# ==================================================
+# CALLBACK
+# ==================================================
+@callback(
+    Output("adm-pid", "children"),
+    Output("adm-memoria", "children"),
+    Output("adm-ritmo", "children"),
+    Output("adm-aciertos", "children"),
+    Output("adm-latencias", "figure"),
+    Output("adm-tabla-callbacks", "children"),
+    Output("adm-caches", "figure"),
+    Output("adm-apis", "figure"),
+    Output("adm-memoria-grafica", "figure"),
+    Input("adm-intervalo", "n_intervals"),
+)
+def actualizar_panel(_):
+    if not perfilado.autorizado(flask.request):
+        raise PreventUpdate
+
+    ahora = time.time()
+    desde = ahora - VENTANA
+    metricas.muestrear_memoria()
+    llamadas = _recientes(metricas.RECIENTES, desde)
+    peticiones = _recientes(http.RECIENTES, desde)
+    residente, pico = metricas.memoria_proceso()
+
+    # Latencia de cada llamada reciente, una serie por callback
+    fig_latencias = figura_base(title=f"Latencia de callbacks (últimos {VENTANA // 60} min)",
+                                xaxis_title="Hace (s)", yaxis_title="ms")
+    por_callback = defaultdict(list)
+    for marca, nombre, total, *_ in llamadas:
+        por_callback[nombre.removeprefix("pages.")].append((marca - ahora, total * 1000))
+    for i, (nombre, puntos) in enumerate(sorted(por_callback.items())):
+        x, y = zip(*puntos)
+        fig_latencias.add_trace(go.Scatter(x=x, y=y, mode="markers", name=nombre,
+                                           marker=dict(size=6, color=COLORES[i % len(COLORES)])))
+
+    # Aciertos de caché
+    caches = aciertos_cache()
+    fig_caches = figura_base(title="Aciertos de caché (%)", yaxis_range=[0, 100])
+    fig_caches.add_trace(go.Bar(
+        x=list(caches), y=[100 * a / max(n, 1) for a, n in caches.values()],
+        text=[f"{a}/{n}" for a, n in caches.values()], marker_color="#b8bb26",
+    ))
+    aciertos, consultas = map(sum, zip(*caches.values())) if caches else (0, 0)
+
+    # APIs externas: p50 / p95 por host y endpoint
+    por_endpoint = defaultdict(list)
+    errores_api = defaultdict(int)
+    for _, host, endpoint, duracion, resultado in peticiones:
+        por_endpoint[f"{host}{endpoint}"].append(duracion * 1000)
+        errores_api[f"{host}{endpoint}"] += resultado != "ok"
+    fig_apis = figura_base(title="APIs externas (ms)", barmode="group")
+    nombres = sorted(por_endpoint)
+    for percentil, color in ((50, "#83a598"), (95, "#fe8019")):
+        fig_apis.add_trace(go.Bar(
+            x=nombres, y=[np.percentile(por_endpoint[n], percentil) for n in nombres],
+            name=f"p{percentil}", marker_color=color,
+        ))
+    fig_apis.update_traces(hovertext=[f"{errores_api[n]} errores de {len(por_endpoint[n])}" for n in nombres])
+
+    # Memoria residente del worker
+    muestras = _recientes(metricas.MEMORIA, desde)
+    fig_memoria = figura_base(title="Memoria residente (MiB)", xaxis_title="Hace (s)", showlegend=False)
+    if muestras:
+        fig_memoria.add_trace(go.Scatter(
+            x=[m[0] - ahora for m in muestras], y=[m[1] / 2**20 for m in muestras],
+            mode="lines", line=dict(color="#d3869b", width=3),
+        ))
+
+    return (
+        f"PID {os.getpid()}",
+        f"{residente / 2**20:.0f} MiB (pico {pico / 2**20:.0f}, cachés "
+        f"{memoria.presupuesto.total / 2**20:.1f} de {memoria.presupuesto.limite / 2**20:.0f})",
+        f"{len(llamadas) * 60 / VENTANA:.1f}",
+        f"{100 * aciertos / consultas:.0f} %" if consultas else "-",
+        fig_latencias,
+        _tabla(resumen_callbacks(llamadas)),
+        fig_caches,
+        fig_apis,
+        fig_memoria,
+    )
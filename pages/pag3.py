@@ -1,7 +1,11 @@
 import dash
-from dash import html, dcc, Input, Output, callback, no_update
+from dash import html, dcc, Input, Output, State, callback, no_update
 import numpy as np
-import plotly.graph_objects as go
+
+from utils.componentes import FIGURA_COMPLETA, estado_grafica
+from utils.figuras import figura_cruda, parche_trazas, traza
+from utils.matematicas import markdown_matematico
+from utils.tema import DORADO
 
 dash.register_page(__name__, path='/pagina3', name='Página 3')
 
@@ -9,7 +13,7 @@ dash.register_page(__name__, path='/pagina3', name='Página 3')
 # Helper para etiquetas con MathJax + valor dinámico
 # ==================================================
 def md_label(texto_md: str, for_id: str, value_span_id: str = None):
-    children = [dcc.Markdown(texto_md, mathjax=True, className="label-md")]
+    children = [markdown_matematico(texto_md, color=DORADO, className="label-md")]
     if value_span_id:
         children.append(html.Span(id=value_span_id, className="label-val"))
     return html.Label(children=children, htmlFor=for_id, className="form-label")
@@ -18,11 +22,12 @@ def md_label(texto_md: str, for_id: str, value_span_id: str = None):
 # ==================================================
 # Layout — Modelo Exponencial
 # ==================================================
-layout = html.Div([
-    html.Div([
-        html.H2("Modelo Exponencial Interactivo", className="title"),
+def layout(**_):
+    return html.Div([
+        html.Div([
+            html.H2("Modelo Exponencial Interactivo", className="title"),
 
-        dcc.Markdown(r"""
+            markdown_matematico(r"""
 El **modelo exponencial** describe el crecimiento (o decaimiento) de una población \(P(t)\)
 proporcional a su tamaño:
 
@@ -38,52 +43,53 @@ $$
 
 - Si \(r>0\): crecimiento.
 - Si \(r<0\): decaimiento.
-""", mathjax=True),
+"""),
+
+            # ------- P0 -------
+            html.Div([
+                md_label(r"Población inicial $P_0$:", "input-p0", value_span_id="val-p0"),
+                dcc.Input(id="input-p0", type="number", value=200, debounce=True, className="input-field"),
+                dcc.Slider(
+                    id="slider-p0",
+                    min=1, max=2_000_000, step=1_000, value=200,
+                    tooltip={"always_visible": False, "placement": "bottom"},
+                    className="dash-slider"
+                ),
+            ], className="input-group"),
+
+            # ------- r -------
+            html.Div([
+                md_label(r"Tasa de crecimiento $r$:", "input-r", value_span_id="val-r"),
+                dcc.Input(id="input-r", type="number", value=0.04, debounce=True, className="input-field"),
+                dcc.Slider(
+                    id="slider-r",
+                    min=-0.5, max=0.5, step=0.001, value=0.04,
+                    tooltip={"always_visible": False, "placement": "bottom"},
+                    className="dash-slider"
+                ),
+            ], className="input-group"),
+
+            # ------- t_max -------
+            html.Div([
+                md_label(r"Tiempo máximo $t_{\max}$:", "input-t", value_span_id="val-t"),
+                dcc.Input(id="input-t", type="number", value=100, debounce=True, className="input-field"),
+                dcc.Slider(
+                    id="slider-t",
+                    min=1, max=200, step=1, value=100,
+                    tooltip={"always_visible": False, "placement": "bottom"},
+                    className="dash-slider"
+                ),
+            ], className="input-group"),
+
+            html.Button("Generar gráfica", id="btn-generar", className="btn-generar")
+        ], className="content left"),
 
-        # ------- P0 -------
-        html.Div([
-            md_label(r"Población inicial $P_0$:", "input-p0", value_span_id="val-p0"),
-            dcc.Input(id="input-p0", type="number", value=200, debounce=True, className="input-field"),
-            dcc.Slider(
-                id="slider-p0",
-                min=1, max=2_000_000, step=1_000, value=200,
-                tooltip={"always_visible": False, "placement": "bottom"},
-                className="dash-slider"
-            ),
-        ], className="input-group"),
-
-        # ------- r -------
         html.Div([
-            md_label(r"Tasa de crecimiento $r$:", "input-r", value_span_id="val-r"),
-            dcc.Input(id="input-r", type="number", value=0.04, debounce=True, className="input-field"),
-            dcc.Slider(
-                id="slider-r",
-                min=-0.5, max=0.5, step=0.001, value=0.04,
-                tooltip={"always_visible": False, "placement": "bottom"},
-                className="dash-slider"
-            ),
-        ], className="input-group"),
-
-        # ------- t_max -------
-        html.Div([
-            md_label(r"Tiempo máximo $t_{\max}$:", "input-t", value_span_id="val-t"),
-            dcc.Input(id="input-t", type="number", value=100, debounce=True, className="input-field"),
-            dcc.Slider(
-                id="slider-t",
-                min=1, max=200, step=1, value=100,
-                tooltip={"always_visible": False, "placement": "bottom"},
-                className="dash-slider"
-            ),
-        ], className="input-group"),
-
-        html.Button("Generar gráfica", id="btn-generar", className="btn-generar")
-    ], className="content left"),
-
-    html.Div([
-        html.H2("Crecimiento exponencial", className="title"),
-        dcc.Graph(id='grafica-poblacion', style={'height': '380px', 'width': '100%'})
-    ], className="content right")
-], className="page-container page3-container")
+            html.H2("Crecimiento exponencial", className="title"),
+            dcc.Graph(id='grafica-poblacion', style={'height': '380px', 'width': '100%'}),
+            estado_grafica('grafica-poblacion'),
+        ], className="content right")
+    ], className="page-container page3-container")
 
 
 # ==================================================
@@ -132,18 +138,62 @@ def sync_t(t_in, t_sl):
     return no_update, no_update
 
 
+# ==================================================
+# Figura completa (solo en la carga inicial)
+# ==================================================
+def construir_figura(t, P, P0, r, t_max, y_max, idx):
+    """Figura completa con ejes, flechas y anotaciones al estilo Gruvbox."""
+    trace_exp = traza(
+        x=t, y=P,
+        mode='lines+markers',
+        line=dict(dash='dot', color='rgb(235, 219, 178)', width=2),
+        marker=dict(color='rgb(180, 205, 186)', symbol='square', size=8),
+        name='P(t) = P₀·e^{rt}',
+        hovertemplate='t: %{x:.2f}<br>P(t): %{y:.2f}<extra></extra>'
+    )
+
+    fig = figura_cruda(
+        "ejes",
+        title=dict(text="<b>Evolución poblacional (Exponencial)</b>", y=0.93),
+        xaxis_title='Tiempo (t)',
+        yaxis_title='Población P(t)',
+        yaxis_range=[0, y_max * 1.12],
+        margin=dict(t=90),
+        legend=dict(y=1.15),
+        shapes=[
+            dict(type="line", x0=0, x1=t_max * 1.02, y0=0, y1=0,
+                 line=dict(color='rgb(184, 187, 38)', width=2)),
+            dict(type="line", x0=0, x1=0, y0=0, y1=y_max * 1.12,
+                 line=dict(color='rgb(184, 187, 38)', width=2)),
+        ],
+        annotations=[
+            dict(x=0, y=P0, text=f"P₀ = {P0:.2f}",
+                 showarrow=True, arrowhead=2, ax=40, ay=-30,
+                 font=dict(color='rgb(235, 219, 178)', size=12),
+                 bgcolor='rgba(50, 48, 47, 0.5)'),
+            dict(x=t[idx], y=P[idx], text=f"r = {r:.4f}",
+                 showarrow=False, font=dict(color='rgb(235, 219, 178)', size=13),
+                 bgcolor='rgba(50, 48, 47, 0.5)', yshift=18),
+        ],
+    )
+    fig["data"] = [trace_exp]
+    return fig
+
+
 # ==================================================
 # Callback — gráfico (depende solo de los INPUTS)
 # ==================================================
 @callback(
     Output('grafica-poblacion', 'figure'),
+    Output('estado-grafica-poblacion', 'data'),
     Input('input-p0', 'value'),
     Input('input-r',  'value'),
     Input('input-t',  'value'),
     Input('btn-generar', 'n_clicks'),
+    State('estado-grafica-poblacion', 'data'),
     prevent_initial_call=False
 )
-def actualizar_grafica(P0, r, t_max, _n):
+def actualizar_grafica(P0, r, t_max, _n, estado=None):
     # Sanitización
     try: P0 = float(P0)
     except: P0 = 1.0
@@ -159,51 +209,16 @@ def actualizar_grafica(P0, r, t_max, _n):
     y_max = float(np.nanmax(P)) or 1.0
     if y_max <= 0: y_max = 1.0
 
-    trace_exp = go.Scatter(
-        x=t, y=P,
-        mode='lines+markers',
-        line=dict(dash='dot', color='rgb(235, 219, 178)', width=2),
-        marker=dict(color='rgb(180, 205, 186)', symbol='square', size=8),
-        name='P(t) = P₀·e^{rt}',
-        hovertemplate='t: %{x:.2f}<br>P(t): %{y:.2f}<extra></extra>'
-    )
-
-    fig = go.Figure(data=[trace_exp])
-    fig.update_layout(
-        title=dict(
-            text="<b>Evolución poblacional (Exponencial)</b>",
-            font=dict(size=20, color='rgb(250, 189, 47)'),
-            x=0.5, y=0.93
-        ),
-        xaxis_title='Tiempo (t)',
-        yaxis_title='Población P(t)',
-        margin=dict(l=40, r=40, t=90, b=40),
-        paper_bgcolor='rgb(40, 40, 40)',
-        plot_bgcolor='rgb(50, 48, 47)',
-        font=dict(family='Outfit', size=12, color='rgb(213, 196, 161)'),
-        legend=dict(orientation='h', yanchor='bottom', y=1.15,
-                    xanchor='center', x=0.5, bgcolor='rgba(0,0,0,0)')
-    )
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgb(80, 73, 69)',
-                     zeroline=True, zerolinewidth=2, zerolinecolor='rgb(184, 187, 38)',
-                     showline=True, linecolor='rgb(102, 92, 84)', linewidth=2, mirror=True)
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgb(80, 73, 69)',
-                     zeroline=True, zerolinewidth=2, zerolinecolor='rgb(184, 187, 38)',
-                     showline=True, linecolor='rgb(102, 92, 84)', linewidth=2, mirror=True,
-                     range=[0, y_max * 1.12])
-
-    fig.add_shape(type="line", x0=0, x1=t_max * 1.02, y0=0, y1=0,
-                  line=dict(color='rgb(184, 187, 38)', width=2))
-    fig.add_shape(type="line", x0=0, x1=0, y0=0, y1=y_max * 1.12,
-                  line=dict(color='rgb(184, 187, 38)', width=2))
-
-    fig.add_annotation(x=0, y=P0, text=f"P₀ = {P0:.2f}",
-                       showarrow=True, arrowhead=2, ax=40, ay=-30,
-                       font=dict(color='rgb(235, 219, 178)', size=12),
-                       bgcolor='rgba(50, 48, 47, 0.5)')
-
     idx = max(0, min(len(P)-1, int(len(P)*0.7)))
-    fig.add_annotation(x=t[idx], y=P[idx], text=f"r = {r:.4f}",
-                       showarrow=False, font=dict(color='rgb(235, 219, 178)', size=13),
-                       bgcolor='rgba(50, 48, 47, 0.5)', yshift=18)
-    return fig
+
+    if estado != FIGURA_COMPLETA:
+        return construir_figura(t, P, P0, r, t_max, y_max, idx), FIGURA_COMPLETA
+
+    # La gráfica ya tiene la figura: solo datos, rango de y, ejes y anotaciones
+    patch = parche_trazas([(t, P)])
+    patch["layout"]["yaxis"]["range"] = [0, y_max * 1.12]
+    patch["layout"]["shapes"][0]["x1"] = t_max * 1.02
+    patch["layout"]["shapes"][1]["y1"] = y_max * 1.12
+    patch["layout"]["annotations"][0].update(y=P0, text=f"P₀ = {P0:.2f}")
+    patch["layout"]["annotations"][1].update(x=t[idx], y=P[idx], text=f"r = {r:.4f}")
+    return patch, no_update
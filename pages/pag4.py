@@ -1,54 +1,113 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, callback, no_update
 import numpy as np
-import plotly.graph_objects as go
+
+from utils import limites
+from utils.cache import memoizar
+from utils.componentes import FIGURA_COMPLETA, aviso, estado_grafica, medidor_ancho
+from utils.figuras import figura_cruda, parche_trazas, traza
+from utils.series import presupuesto_puntos, reducir_trayectorias
 
 dash.register_page(__name__, path='/pagina4', name='Pagina 4')
 
 
-layout = html.Div([
-    # ------------------------- IZQUIERDA -------------------------
-    html.Div([
-        html.H2("Modelo SIR – Epidemiología", className="title"),
+def layout(**_):
+    return html.Div([
+        # ------------------------- IZQUIERDA -------------------------
+        html.Div([
+            html.H2("Modelo SIR – Epidemiología", className="title"),
+
+            html.Br(),
+
+            html.Label("Población Total (N):"),
+            dcc.Input(id="input-N", type="number", value=1000, className="input-field"),
+
+            html.Label("Tasa de transmisión (β):"),
+            dcc.Input(id="input-beta", type="number", value=0.3, className="input-field"),
+
+            html.Label("Tasa de recuperación (γ):"),
+            dcc.Input(id="input-gamma", type="number", value=0.1, className="input-field"),
+
+            html.Label("Infectados iniciales (I₀):"),
+            dcc.Input(id="input-I0", type="number", value=1, className="input-field"),
 
-        html.Br(),
+            html.Label("Tiempo de simulación (días):"),
+            dcc.Input(id="input-tmax", type="number", value=100, className="input-field"),
 
-        html.Label("Población Total (N):"),
-        dcc.Input(id="input-N", type="number", value=1000, className="input-field"),
+            html.Br(),
+            html.Button("Reiniciar Grafica al Ejemplo", id="btn-reiniciar", className="btn-generar"),
 
-        html.Label("Tasa de transmisión (β):"),
-        dcc.Input(id="input-beta", type="number", value=0.3, className="input-field"),
+            dcc.Interval(id='intervalo', interval=200, n_intervals=0, disabled=True),
+            html.Br(), html.Br()
+        ], className="content left"),
 
-        html.Label("Tasa de recuperación (γ):"),
-        dcc.Input(id="input-gamma", type="number", value=0.1, className="input-field"),
+        # ------------------------- DERECHA -------------------------
+        html.Div([
+            html.H2("Evolución de la Epidemia", className="title"),
+            dcc.Graph(id='grafica-sir', style={'height': '400px', 'width': '100%'}),
+            medidor_ancho('grafica-sir'),
+            estado_grafica('grafica-sir'),
+            html.Div(id="interpretacion", className="markdown-text", style={
+                "marginTop": "25px",
+                "fontSize": "15px",
+                "textAlign": "justify",
+                "color": "rgb(213,196,161)",
+                "lineHeight": "1.6",
+            })
+        ], className="content right")
 
-        html.Label("Infectados iniciales (I₀):"),
-        dcc.Input(id="input-I0", type="number", value=1, className="input-field"),
+    ], className="page-container page4-container")
 
-        html.Label("Tiempo de simulación (días):"),
-        dcc.Input(id="input-tmax", type="number", value=100, className="input-field"),
 
-        html.Br(),
-        html.Button("Reiniciar Grafica al Ejemplo", id="btn-reiniciar", className="btn-generar"),
+# ==================================================
+# Simulación (memoizada: compartida entre workers en producción)
+# ==================================================
+@memoizar("pag4-sir")
+def simular_sir(N, beta, gamma, I0, tmax, paso=1):
+    """
+    Trayectorias (t, S, I, R) del modelo SIR discreto, con `paso` días por
+    iteración (mayor que 1 solo para tmax enormes, ver utils/limites.py).
+    """
+    S0, I0, R0 = N - I0, I0, 0
+    n = tmax // paso
+    t = np.arange(n) * paso   # día de cada iteración (k · paso)
+    S, I, R = np.zeros(n), np.zeros(n), np.zeros(n)
+    S[0], I[0], R[0] = S0, I0, R0
+
+    for inicio in range(1, n, limites.BLOQUE):
+        limites.verificar()
+        for k in range(inicio, min(inicio + limites.BLOQUE, n)):
+            dS = -beta * S[k-1] * I[k-1] / N
+            dI = beta * S[k-1] * I[k-1] / N - gamma * I[k-1]
+            dR = gamma * I[k-1]
+            S[k] = S[k-1] + paso * dS
+            I[k] = I[k-1] + paso * dI
+            R[k] = R[k-1] + paso * dR
+    return t, S, I, R
 
-        dcc.Interval(id='intervalo', interval=200, n_intervals=0, disabled=True),
-        html.Br(), html.Br()
-    ], className="content left"),
 
-    # ------------------------- DERECHA -------------------------
-    html.Div([
-        html.H2("Evolución de la Epidemia", className="title"),
-        dcc.Graph(id='grafica-sir', style={'height': '400px', 'width': '100%'}),
-        html.Div(id="interpretacion", className="markdown-text", style={
-            "marginTop": "25px",
-            "fontSize": "15px",
-            "textAlign": "justify",
-            "color": "rgb(213,196,161)",
-            "lineHeight": "1.6",
-        })
-    ], className="content right")
+# ==================================================
+# Figura completa (solo en la carga inicial)
+# ==================================================
+def construir_figura(t, S, I, R):
+    """Figura completa del modelo SIR con el estilo Gruvbox."""
+    fig = figura_cruda(
+        title=dict(text="<b>Evolución del Modelo SIR</b>", y=0.93),
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Número de personas',
+        margin=dict(t=90),
+        legend=dict(y=1.1),
+    )
+    fig["data"] = [
+        traza(x=t, y=S, mode='lines', name='Susceptibles (S)',
+              line=dict(color='rgb(69,133,136)', width=3)),
+        traza(x=t, y=I, mode='lines', name='Infectados (I)',
+              line=dict(color='rgb(251,73,52)', width=3)),
+        traza(x=t, y=R, mode='lines', name='Recuperados (R)',
+              line=dict(color='rgb(184,187,38)', width=3)),
+    ]
 
-], className="page-container page4-container")
+    return fig
 
 
 # ==================================================
@@ -57,13 +116,16 @@ layout = html.Div([
 @callback(
     Output('grafica-sir', 'figure'),
     Output('interpretacion', 'children'),
+    Output('estado-grafica-sir', 'data'),
     Input('input-N', 'value'),
     Input('input-beta', 'value'),
     Input('input-gamma', 'value'),
     Input('input-I0', 'value'),
-    Input('input-tmax', 'value')
+    Input('input-tmax', 'value'),
+    State('ancho-grafica-sir', 'data'),
+    State('estado-grafica-sir', 'data'),
 )
-def actualizar_en_tiempo_real(N, beta, gamma, I0, tmax):
+def actualizar_en_tiempo_real(N, beta, gamma, I0, tmax, ancho=None, estado=None):
     """Simula el modelo SIR y genera la gráfica e interpretación."""
     N = float(N or 1000)
     beta = float(beta or 0.3)
@@ -71,62 +133,41 @@ def actualizar_en_tiempo_real(N, beta, gamma, I0, tmax):
     I0 = float(I0 or 1)
     tmax = int(tmax or 100)
 
-    S0, I0, R0 = N - I0, I0, 0
-    t = np.linspace(0, tmax, tmax)
-    S, I, R = np.zeros(tmax), np.zeros(tmax), np.zeros(tmax)
-    S[0], I[0], R[0] = S0, I0, R0
-
-    for k in range(1, tmax):
-        dS = -beta * S[k-1] * I[k-1] / N
-        dI = beta * S[k-1] * I[k-1] / N - gamma * I[k-1]
-        dR = gamma * I[k-1]
-        S[k] = S[k-1] + dS
-        I[k] = I[k-1] + dI
-        R[k] = R[k-1] + dR
-
-    # Crear figura
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)',
-                             line=dict(color='rgb(69,133,136)', width=3)))
-    fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)',
-                             line=dict(color='rgb(251,73,52)', width=3)))
-    fig.add_trace(go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)',
-                             line=dict(color='rgb(184,187,38)', width=3)))
-
-    fig.update_layout(
-        title=dict(text="<b>Evolución del Modelo SIR</b>", x=0.5, y=0.93,
-                   font=dict(size=20, color='rgb(250,189,47)')),
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Número de personas',
-        plot_bgcolor='rgb(50,48,47)',
-        paper_bgcolor='rgb(40,40,40)',
-        font=dict(family='Outfit', size=12, color='rgb(213,196,161)'),
-        margin=dict(l=40, r=40, t=90, b=40),
-        legend=dict(orientation='h', yanchor='bottom', y=1.1,
-                    xanchor='center', x=0.5, bgcolor='rgba(0,0,0,0)')
-    )
-    fig.update_xaxes(showgrid=True, gridcolor='rgb(80,73,69)',
-                     linecolor='rgb(102,92,84)', mirror=True)
-    fig.update_yaxes(showgrid=True, gridcolor='rgb(80,73,69)',
-                     linecolor='rgb(102,92,84)', mirror=True)
+    # Tamaño acotado antes de simular (tmax llega tal cual del input)
+    try:
+        plan = limites.planificar("sir", tmax, (beta, gamma))
+        t, S, I, R = limites.ejecutar(plan, simular_sir, N, beta, gamma, I0, tmax, plan.paso)
+    except limites.LimiteExcedido as e:
+        return no_update, aviso(str(e)), no_update
 
-    # Datos interpretativos dinámicos
+    # Datos interpretativos dinámicos (sobre la trayectoria completa)
     pico_I = int(np.argmax(I))
     valor_max_I = int(max(I))
     R0 = beta / gamma
 
+    # Reducción de puntos según el ancho de la gráfica (conserva el pico)
+    t_g, (S_g, I_g, R_g) = reducir_trayectorias(t, [S, I, R], presupuesto_puntos(ancho), [pico_I])
+
+    series = [(t_g, S_g), (t_g, I_g), (t_g, R_g)]
+    if estado == FIGURA_COMPLETA:
+        # La gráfica ya tiene la figura: solo se envían los nuevos datos
+        fig, estado = parche_trazas(series), no_update
+    else:
+        fig, estado = construir_figura(t_g, S_g, I_g, R_g), FIGURA_COMPLETA
+
     # Texto con formato (valores resaltados)
     interpretacion = html.Div([
+        aviso(plan.aviso),
         html.Span("Con los parámetros actuales, el número básico de reproducción es "),
         html.Span(f"R₀ ≈ {R0:.2f}", style={"fontWeight": "bold", "color": "rgb(250,189,47)"}),
         html.Span(". La cantidad de infectados alcanza su valor máximo de aproximadamente "),
         html.Span(f"{valor_max_I} personas", style={"fontWeight": "bold", "color": "rgb(251,73,52)"}),
         html.Span(" alrededor del día "),
-        html.Span(f"{pico_I}", style={"fontWeight": "bold", "color": "rgb(184,187,38)"}),
+        html.Span(f"{pico_I * plan.paso}", style={"fontWeight": "bold", "color": "rgb(184,187,38)"}),
         html.Span(". A medida que los recuperados aumentan, los susceptibles disminuyen, mostrando el ciclo de expansión y estabilización del brote epidémico."),
     ])
 
-    return fig, interpretacion
+    return fig, interpretacion, estado
 
 
 # ==================================================
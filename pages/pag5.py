@@ -1,7 +1,12 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, callback, no_update
 import numpy as np
-import plotly.graph_objects as go
+
+from utils import limites
+from utils.cache import memoizar
+from utils.componentes import FIGURA_COMPLETA, aviso, estado_grafica, medidor_ancho
+from utils.figuras import figura_cruda, parche_trazas, traza
+from utils.series import presupuesto_puntos, reducir_trayectorias
 
 # ==================================================
 # Registro de página
@@ -11,55 +16,115 @@ dash.register_page(__name__, path='/pagina5', name='Pagina 5')
 # ==================================================
 # Layout — Modelo SEIR
 # ==================================================
-layout = html.Div([
-    # ------------------------- IZQUIERDA -------------------------
-    html.Div([
-        html.H2("Modelo SEIR – Epidemiología", className="title"),
+def layout(**_):
+    return html.Div([
+        # ------------------------- IZQUIERDA -------------------------
+        html.Div([
+            html.H2("Modelo SEIR – Epidemiología", className="title"),
 
-        html.Br(),
+            html.Br(),
 
-        html.Label("Población Total (N):"),
-        dcc.Input(id="input-N-seir", type="number", value=1000, className="input-field"),
+            html.Label("Población Total (N):"),
+            dcc.Input(id="input-N-seir", type="number", value=1000, className="input-field"),
 
-        html.Label("Tasa de transmisión (β):"),
-        dcc.Input(id="input-beta-seir", type="number", value=0.3, className="input-field"),
+            html.Label("Tasa de transmisión (β):"),
+            dcc.Input(id="input-beta-seir", type="number", value=0.3, className="input-field"),
 
-        html.Label("Tasa de incubación (σ):"),
-        dcc.Input(id="input-sigma-seir", type="number", value=0.2, className="input-field"),
+            html.Label("Tasa de incubación (σ):"),
+            dcc.Input(id="input-sigma-seir", type="number", value=0.2, className="input-field"),
 
-        html.Label("Tasa de recuperación (γ):"),
-        dcc.Input(id="input-gamma-seir", type="number", value=0.1, className="input-field"),
+            html.Label("Tasa de recuperación (γ):"),
+            dcc.Input(id="input-gamma-seir", type="number", value=0.1, className="input-field"),
 
-        html.Label("Expuestos iniciales (E₀):"),
-        dcc.Input(id="input-E0-seir", type="number", value=0, className="input-field"),
+            html.Label("Expuestos iniciales (E₀):"),
+            dcc.Input(id="input-E0-seir", type="number", value=0, className="input-field"),
 
-        html.Label("Infectados iniciales (I₀):"),
-        dcc.Input(id="input-I0-seir", type="number", value=1, className="input-field"),
+            html.Label("Infectados iniciales (I₀):"),
+            dcc.Input(id="input-I0-seir", type="number", value=1, className="input-field"),
 
-        html.Label("Tiempo de simulación (días):"),
-        dcc.Input(id="input-tmax-seir", type="number", value=160, className="input-field"),
+            html.Label("Tiempo de simulación (días):"),
+            dcc.Input(id="input-tmax-seir", type="number", value=160, className="input-field"),
 
-        html.Br(),
-        html.Button("Reiniciar Valores Ejemplo", id="btn-reiniciar-seir", className="btn-generar"),
+            html.Br(),
+            html.Button("Reiniciar Valores Ejemplo", id="btn-reiniciar-seir", className="btn-generar"),
 
-        dcc.Interval(id='intervalo-seir', interval=200, n_intervals=0, disabled=True),
-        html.Br(), html.Br()
-    ], className="content left"),
+            dcc.Interval(id='intervalo-seir', interval=200, n_intervals=0, disabled=True),
+            html.Br(), html.Br()
+        ], className="content left"),
 
-    # ------------------------- DERECHA -------------------------
-    html.Div([
-        html.H2("Evolución de la Epidemia (Modelo SEIR)", className="title"),
-        dcc.Graph(id='grafica-seir', style={'height': '400px', 'width': '100%'}),
-        html.Div(id="interpretacion-seir", className="markdown-text", style={
-            "marginTop": "25px",
-            "fontSize": "15px",
-            "textAlign": "justify",
-            "color": "rgb(213,196,161)",
-            "lineHeight": "1.6",
-        })
-    ], className="content right")
+        # ------------------------- DERECHA -------------------------
+        html.Div([
+            html.H2("Evolución de la Epidemia (Modelo SEIR)", className="title"),
+            dcc.Graph(id='grafica-seir', style={'height': '400px', 'width': '100%'}),
+            medidor_ancho('grafica-seir'),
+            estado_grafica('grafica-seir'),
+            html.Div(id="interpretacion-seir", className="markdown-text", style={
+                "marginTop": "25px",
+                "fontSize": "15px",
+                "textAlign": "justify",
+                "color": "rgb(213,196,161)",
+                "lineHeight": "1.6",
+            })
+        ], className="content right")
 
-], className="page-container page5-container")
+    ], className="page-container page5-container")
+
+
+# ==================================================
+# Simulación (memoizada: compartida entre workers en producción)
+# ==================================================
+@memoizar("pag5-seir")
+def simular_seir(N, beta, sigma, gamma, E0, I0, tmax, paso=1):
+    """
+    Trayectorias (t, S, E, I, R) del modelo SEIR discreto, con `paso` días
+    por iteración (mayor que 1 solo para tmax enormes, ver utils/limites.py).
+    """
+    S0 = N - E0 - I0
+    R0 = 0
+
+    n = tmax // paso
+    t = np.arange(n) * paso   # día de cada iteración (k · paso)
+    S, E, I, R = np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n)
+    S[0], E[0], I[0], R[0] = S0, E0, I0, R0
+
+    for inicio in range(1, n, limites.BLOQUE):
+        limites.verificar()
+        for k in range(inicio, min(inicio + limites.BLOQUE, n)):
+            dS = -beta * S[k-1] * I[k-1] / N
+            dE = beta * S[k-1] * I[k-1] / N - sigma * E[k-1]
+            dI = sigma * E[k-1] - gamma * I[k-1]
+            dR = gamma * I[k-1]
+            S[k] = S[k-1] + paso * dS
+            E[k] = E[k-1] + paso * dE
+            I[k] = I[k-1] + paso * dI
+            R[k] = R[k-1] + paso * dR
+    return t, S, E, I, R
+
+
+# ==================================================
+# Figura completa (solo en la carga inicial)
+# ==================================================
+def construir_figura(t, S, E, I, R):
+    """Figura completa del modelo SEIR con el estilo Gruvbox."""
+    fig = figura_cruda(
+        title=dict(text="<b>Evolución del Modelo SEIR</b>", y=0.93),
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Número de personas',
+        margin=dict(t=90),
+        legend=dict(y=1.1),
+    )
+    fig["data"] = [
+        traza(x=t, y=S, mode='lines', name='Susceptibles (S)',
+              line=dict(color='rgb(69,133,136)', width=3)),
+        traza(x=t, y=E, mode='lines', name='Expuestos (E)',
+              line=dict(color='rgb(142,192,124)', width=3)),
+        traza(x=t, y=I, mode='lines', name='Infectados (I)',
+              line=dict(color='rgb(251,73,52)', width=3)),
+        traza(x=t, y=R, mode='lines', name='Recuperados (R)',
+              line=dict(color='rgb(184,187,38)', width=3)),
+    ]
+
+    return fig
 
 
 # ==================================================
@@ -68,15 +133,18 @@ layout = html.Div([
 @callback(
     Output('grafica-seir', 'figure'),
     Output('interpretacion-seir', 'children'),
+    Output('estado-grafica-seir', 'data'),
     Input('input-N-seir', 'value'),
     Input('input-beta-seir', 'value'),
     Input('input-sigma-seir', 'value'),
     Input('input-gamma-seir', 'value'),
     Input('input-E0-seir', 'value'),
     Input('input-I0-seir', 'value'),
-    Input('input-tmax-seir', 'value')
+    Input('input-tmax-seir', 'value'),
+    State('ancho-grafica-seir', 'data'),
+    State('estado-grafica-seir', 'data'),
 )
-def actualizar_en_tiempo_real(N, beta, sigma, gamma, E0, I0, tmax):
+def actualizar_en_tiempo_real(N, beta, sigma, gamma, E0, I0, tmax, ancho=None, estado=None):
     """Simula el modelo SEIR y genera la gráfica e interpretación."""
     N = float(N or 1000)
     beta = float(beta or 0.3)
@@ -86,67 +154,42 @@ def actualizar_en_tiempo_real(N, beta, sigma, gamma, E0, I0, tmax):
     I0 = float(I0 or 1)
     tmax = int(tmax or 160)
 
-    S0 = N - E0 - I0
-    R0 = 0
-
-    t = np.linspace(0, tmax, tmax)
-    S, E, I, R = np.zeros(tmax), np.zeros(tmax), np.zeros(tmax), np.zeros(tmax)
-    S[0], E[0], I[0], R[0] = S0, E0, I0, R0
-
-    for k in range(1, tmax):
-        dS = -beta * S[k-1] * I[k-1] / N
-        dE = beta * S[k-1] * I[k-1] / N - sigma * E[k-1]
-        dI = sigma * E[k-1] - gamma * I[k-1]
-        dR = gamma * I[k-1]
-        S[k] = S[k-1] + dS
-        E[k] = E[k-1] + dE
-        I[k] = I[k-1] + dI
-        R[k] = R[k-1] + dR
-
-    # Crear figura
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)',
-                             line=dict(color='rgb(69,133,136)', width=3)))
-    fig.add_trace(go.Scatter(x=t, y=E, mode='lines', name='Expuestos (E)',
-                             line=dict(color='rgb(142,192,124)', width=3)))
-    fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)',
-                             line=dict(color='rgb(251,73,52)', width=3)))
-    fig.add_trace(go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)',
-                             line=dict(color='rgb(184,187,38)', width=3)))
-
-    fig.update_layout(
-        title=dict(text="<b>Evolución del Modelo SEIR</b>", x=0.5, y=0.93,
-                   font=dict(size=20, color='rgb(250,189,47)')),
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Número de personas',
-        plot_bgcolor='rgb(50,48,47)',
-        paper_bgcolor='rgb(40,40,40)',
-        font=dict(family='Outfit', size=12, color='rgb(213,196,161)'),
-        margin=dict(l=40, r=40, t=90, b=40),
-        legend=dict(orientation='h', yanchor='bottom', y=1.1,
-                    xanchor='center', x=0.5, bgcolor='rgba(0,0,0,0)')
-    )
-    fig.update_xaxes(showgrid=True, gridcolor='rgb(80,73,69)',
-                     linecolor='rgb(102,92,84)', mirror=True)
-    fig.update_yaxes(showgrid=True, gridcolor='rgb(80,73,69)',
-                     linecolor='rgb(102,92,84)', mirror=True)
+    # Tamaño acotado antes de simular (tmax llega tal cual del input)
+    try:
+        plan = limites.planificar("seir", tmax, (beta, sigma, gamma))
+        t, S, E, I, R = limites.ejecutar(plan, simular_seir, N, beta, sigma, gamma, E0, I0, tmax, plan.paso)
+    except limites.LimiteExcedido as e:
+        return no_update, aviso(str(e)), no_update
 
-    # Datos interpretativos dinámicos
+    # Datos interpretativos dinámicos (sobre la trayectoria completa)
     pico_I = int(np.argmax(I))
     valor_max_I = int(max(I))
     R0_num = beta / gamma
 
+    # Reducción de puntos según el ancho de la gráfica (conserva el pico)
+    t_g, (S_g, E_g, I_g, R_g) = reducir_trayectorias(
+        t, [S, E, I, R], presupuesto_puntos(ancho), [pico_I]
+    )
+
+    series = [(t_g, S_g), (t_g, E_g), (t_g, I_g), (t_g, R_g)]
+    if estado == FIGURA_COMPLETA:
+        # La gráfica ya tiene la figura: solo se envían los nuevos datos
+        fig, estado = parche_trazas(series), no_update
+    else:
+        fig, estado = construir_figura(t_g, S_g, E_g, I_g, R_g), FIGURA_COMPLETA
+
     interpretacion = html.Div([
+        aviso(plan.aviso),
         html.Span("Con los parámetros actuales, el número básico de reproducción es "),
         html.Span(f"R₀ ≈ {R0_num:.2f}", style={"fontWeight": "bold", "color": "rgb(250,189,47)"}),
         html.Span(". La cantidad de infectados alcanza su valor máximo de aproximadamente "),
         html.Span(f"{valor_max_I} personas", style={"fontWeight": "bold", "color": "rgb(251,73,52)"}),
         html.Span(" alrededor del día "),
-        html.Span(f"{pico_I}", style={"fontWeight": "bold", "color": "rgb(184,187,38)"}),
+        html.Span(f"{pico_I * plan.paso}", style={"fontWeight": "bold", "color": "rgb(184,187,38)"}),
         html.Span(". La presencia de la fase de exposición (E) retrasa el inicio del brote, produciendo un pico más suave y una propagación más lenta en comparación con el modelo SIR."),
     ])
 
-    return fig, interpretacion
+    return fig, interpretacion, estado
 
 
 # ==================================================
@@ -1,9 +1,16 @@
 import dash
 from dash import html, dcc, callback, Input, Output, State
 import plotly.graph_objects as go
-import requests
+import math
+import zlib
 from datetime import datetime, timedelta
 
+from utils.config import url_base
+from utils.figuras import figura_base
+from utils.http import obtener_json
+from utils.metricas import medir_fase
+from utils.refresco import refrescador, formatear_edad
+
 # ==================================================
 # Registro de página
 # ==================================================
@@ -12,137 +19,138 @@ dash.register_page(__name__, path="/pagina7", name="Pagina 7")
 # ==================================================
 # Layout
 # ==================================================
-layout = html.Div(
-    [
-        # ------------------------- IZQUIERDA -------------------------
-        html.Div(
-            [
-                html.H2(
-                    "Dashboard de Clima en Tiempo Real",
-                    className="title",
-                ),
-                # --- Selector de ciudad ---
-                html.Div(
-                    [
-                        html.Label("Selecciona una ciudad:"),
-                        dcc.Dropdown(
-                            id="dropdown-ciudad",
-                            value="lima",
-                            options=[
-                                {"label": "🏛️ Lima, Perú", "value": "lima"},
-                                {"label": "🗽 Nueva York, USA", "value": "nueva_york"},
-                                {"label": "🌆 Madrid, España", "value": "madrid"},
-                                {
-                                    "label": "🌴 Ciudad de México",
-                                    "value": "mexico",
-                                },
-                                {
-                                    "label": "🏖️ Buenos Aires, Argentina",
-                                    "value": "buenos_aires",
-                                },
-                                {"label": "🌃 São Paulo, Brasil", "value": "sao_paulo"},
-                                {"label": "🗼 París, Francia", "value": "paris"},
-                                {"label": "🏰 Londres, Inglaterra", "value": "londres"},
-                                {"label": "🎌 Tokio, Japón", "value": "tokio"},
-                                {"label": "🕌 Dubái, EAU", "value": "dubai"},
-                            ],
-                            className="dropdown-clima",
-                            style={"width": "100%"},
-                        ),
-                    ],
-                    className="input-group",
-                ),
-                # --- Tipo de gráfica ---
-                html.Div(
-                    [
-                        html.Label("Tipo de visualización:"),
-                        dcc.RadioItems(
-                            id="radio-tipo-grafica",
-                            options=[
-                                {"label": " Temperatura", "value": "temperatura"},
-                                {"label": " Precipitación", "value": "precipitacion"},
-                                {"label": " Viento", "value": "viento"},
-                            ],
-                            value="temperatura",
-                            className="radio-gold",  # clase propia para CSS
-                        ),
-                    ],
-                    className="input-group",
-                ),
-                # --- Botón ---
-                html.Button(
-                    "Actualizar Clima",
-                    id="btn-actualizar-clima",
-                    className="btn-generar",
-                ),
-                # --- Info de actualización ---
-                html.Div(
-                    id="info-actualizado-clima",
-                    className="clima-info-box",
-                ),
-            ],
-            className="content left",
-        ),
-        # ------------------------- DERECHA -------------------------
-        html.Div(
-            [
-                html.H2("Pronóstico de 7 Días", className="title"),
-                # --- Tarjetas de valores actuales ---
-                html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.H4(
-                                    "Temperatura",
-                                    className="card-title temp",
-                                ),
-                                html.H3(
-                                    id="temp-actual",
-                                    className="card-value temp",
-                                ),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4(
-                                    "Humedad",
-                                    className="card-title humedad",
-                                ),
-                                html.H3(
-                                    id="humedad-actual",
-                                    className="card-value humedad",
-                                ),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4(
-                                    "Viento",
-                                    className="card-title viento",
-                                ),
-                                html.H3(
-                                    id="viento-actual",
-                                    className="card-value viento",
-                                ),
-                            ],
-                            className="clima-card",
-                        ),
-                    ],
-                    className="clima-card-container",
-                ),
-                # --- Gráfica ---
-                dcc.Graph(
-                    id="grafica-clima",
-                    style={"height": "380px", "width": "100%"},
-                ),
-            ],
-            className="content right",
-        ),
-    ],
-    className="page-container page8-container",
-)
+def layout(**_):
+    return html.Div(
+        [
+            # ------------------------- IZQUIERDA -------------------------
+            html.Div(
+                [
+                    html.H2(
+                        "Dashboard de Clima en Tiempo Real",
+                        className="title",
+                    ),
+                    # --- Selector de ciudad ---
+                    html.Div(
+                        [
+                            html.Label("Selecciona una ciudad:"),
+                            dcc.Dropdown(
+                                id="dropdown-ciudad",
+                                value="lima",
+                                options=[
+                                    {"label": "🏛️ Lima, Perú", "value": "lima"},
+                                    {"label": "🗽 Nueva York, USA", "value": "nueva_york"},
+                                    {"label": "🌆 Madrid, España", "value": "madrid"},
+                                    {
+                                        "label": "🌴 Ciudad de México",
+                                        "value": "mexico",
+                                    },
+                                    {
+                                        "label": "🏖️ Buenos Aires, Argentina",
+                                        "value": "buenos_aires",
+                                    },
+                                    {"label": "🌃 São Paulo, Brasil", "value": "sao_paulo"},
+                                    {"label": "🗼 París, Francia", "value": "paris"},
+                                    {"label": "🏰 Londres, Inglaterra", "value": "londres"},
+                                    {"label": "🎌 Tokio, Japón", "value": "tokio"},
+                                    {"label": "🕌 Dubái, EAU", "value": "dubai"},
+                                ],
+                                className="dropdown-clima",
+                                style={"width": "100%"},
+                            ),
+                        ],
+                        className="input-group",
+                    ),
+                    # --- Tipo de gráfica ---
+                    html.Div(
+                        [
+                            html.Label("Tipo de visualización:"),
+                            dcc.RadioItems(
+                                id="radio-tipo-grafica",
+                                options=[
+                                    {"label": " Temperatura", "value": "temperatura"},
+                                    {"label": " Precipitación", "value": "precipitacion"},
+                                    {"label": " Viento", "value": "viento"},
+                                ],
+                                value="temperatura",
+                                className="radio-gold",  # clase propia para CSS
+                            ),
+                        ],
+                        className="input-group",
+                    ),
+                    # --- Botón ---
+                    html.Button(
+                        "Actualizar Clima",
+                        id="btn-actualizar-clima",
+                        className="btn-generar",
+                    ),
+                    # --- Info de actualización ---
+                    html.Div(
+                        id="info-actualizado-clima",
+                        className="clima-info-box",
+                    ),
+                ],
+                className="content left",
+            ),
+            # ------------------------- DERECHA -------------------------
+            html.Div(
+                [
+                    html.H2("Pronóstico de 7 Días", className="title"),
+                    # --- Tarjetas de valores actuales ---
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.H4(
+                                        "Temperatura",
+                                        className="card-title temp",
+                                    ),
+                                    html.H3(
+                                        id="temp-actual",
+                                        className="card-value temp",
+                                    ),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4(
+                                        "Humedad",
+                                        className="card-title humedad",
+                                    ),
+                                    html.H3(
+                                        id="humedad-actual",
+                                        className="card-value humedad",
+                                    ),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4(
+                                        "Viento",
+                                        className="card-title viento",
+                                    ),
+                                    html.H3(
+                                        id="viento-actual",
+                                        className="card-value viento",
+                                    ),
+                                ],
+                                className="clima-card",
+                            ),
+                        ],
+                        className="clima-card-container",
+                    ),
+                    # --- Gráfica ---
+                    dcc.Graph(
+                        id="grafica-clima",
+                        style={"height": "380px", "width": "100%"},
+                    ),
+                ],
+                className="content right",
+            ),
+        ],
+        className="page-container page8-container",
+    )
 
 # ==========================================
 # COORDENADAS DE LAS CIUDADES
@@ -167,14 +175,14 @@ CIUDADES = {
 # ==========================================
 
 
-def obtener_datos_clima(ciudad_key):
+def obtener_datos_clima(ciudad_key, base_url=None):
     """
     Intenta obtener datos del clima usando Open-Meteo.
     Si falla, devuelve None y el callback usará datos ficticios.
     """
     try:
         ciudad = CIUDADES[ciudad_key]
-        url = "https://api.open-meteo.com/v1/forecast"
+        url = f"{base_url or url_base('clima')}/v1/forecast"
         params = {
             "latitude": ciudad["lat"],
             "longitude": ciudad["lon"],
@@ -183,15 +191,17 @@ def obtener_datos_clima(ciudad_key):
             "timezone": "auto",
             "forecast_days": 7,
         }
-        resp = requests.get(url, params=params, timeout=8)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
+        return obtener_json(url, params=params, timeout=8)
+    except Exception:
         # Si hay error de red / API, devolvemos None y no rompemos la app
-        print(f"[CLIMA] Error al obtener datos reales: {e}")
+        # (host, endpoint, estado y latencia quedan en utils/http.py)
         return None
 
 
+# Los datos se sirven desde el refrescador (último valor bueno + recarga en fondo)
+refrescador.registrar("clima", obtener_datos_clima)
+
+
 # ==========================================
 # CALLBACK PRINCIPAL
 # ==========================================
@@ -218,7 +228,8 @@ def actualizar_dashboard_clima(n_clicks, ciudad_key, tipo_grafica):
     # ----------------------------------------------
     # 1. Intentamos usar datos REALES
     # ----------------------------------------------
-    datos = obtener_datos_clima(ciudad_key)
+    # El botón pide una recarga inmediata (no solo el valor guardado)
+    datos, edad = refrescador.obtener("clima", ciudad_key, forzar=bool(n_clicks))
 
     if datos:
         try:
@@ -246,10 +257,11 @@ def actualizar_dashboard_clima(n_clicks, ciudad_key, tipo_grafica):
         fechas_dt = [datetime.combine(hoy + timedelta(days=i), datetime.min.time()) for i in range(7)]
 
         # Patrones simples distintos por ciudad, solo para variar un poco
-        base = 20 + (abs(hash(ciudad_key)) % 7)  # base de temperatura por ciudad
+        # crc32 es estable entre procesos (hash() cambia por la aleatorización)
+        base = 20 + (zlib.crc32(ciudad_key.encode()) % 7)  # base de temperatura por ciudad
         temp_max = [base + 2 + i * 0.5 for i in range(7)]
         temp_min = [t - 5 for t in temp_max]
-        precipitacion = [max(0, 8 * abs(__import__("math").sin(i))) for i in range(7)]
+        precipitacion = [max(0, 8 * abs(math.sin(i))) for i in range(7)]
         viento_max = [8 + 2 * i for i in range(7)]
 
         temp_actual = temp_max[0]
@@ -265,143 +277,72 @@ def actualizar_dashboard_clima(n_clicks, ciudad_key, tipo_grafica):
     # 3. Construimos la figura según tipo seleccionado
     # ----------------------------------------------
     # ===========================================
-    # FIGURA BASE — TEMA GRUVBOX APLICADO SIEMPRE
+    # FIGURA BASE — TEMA GRUVBOX (plantilla registrada)
     # ===========================================
-    fig = go.Figure()
-
-    fig.update_layout(
-        plot_bgcolor='rgb(50,48,47)',     # fondo interno
-        paper_bgcolor='rgb(40,40,40)',    # fondo general
-        font=dict(
-            family='Outfit',
-            size=12,
-            color='rgb(213,196,161)'
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='rgb(80,73,69)',
-            linecolor='rgb(102,92,84)',
-            zerolinecolor='rgb(102,92,84)',
-            mirror=True
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='rgb(80,73,69)',
-            linecolor='rgb(102,92,84)',
-            zerolinecolor='rgb(102,92,84)',
-            mirror=True
-        )
-    )
-
-
-    if tipo_grafica == "temperatura":
-        fig.add_trace(
-            go.Scatter(
-                x=fechas_dt,
-                y=temp_max,
-                mode="lines+markers",
-                name="Temp. Máxima",
-                line=dict(color="#ffb74d", width=2.5),
-                marker=dict(size=8),
+    with medir_fase("figura"):
+        fig = figura_base(xaxis_title="Fecha", hovermode="x unified")
+
+        if tipo_grafica == "temperatura":
+            fig.add_trace(
+                go.Scatter(
+                    x=fechas_dt,
+                    y=temp_max,
+                    mode="lines+markers",
+                    name="Temp. Máxima",
+                    line=dict(color="#ffb74d", width=2.5),
+                    marker=dict(size=8),
+                )
             )
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=fechas_dt,
-                y=temp_min,
-                mode="lines+markers",
-                name="Temp. Mínima",
-                line=dict(color="#4fc3f7", width=2.5),
-                marker=dict(size=8),
+            fig.add_trace(
+                go.Scatter(
+                    x=fechas_dt,
+                    y=temp_min,
+                    mode="lines+markers",
+                    name="Temp. Mínima",
+                    line=dict(color="#4fc3f7", width=2.5),
+                    marker=dict(size=8),
+                )
             )
-        )
-        titulo = f"<b>Temperatura en {nombre_ciudad} - Próximos 7 días</b>"
-        yaxis_title = "Temperatura (°C)"
-
-    elif tipo_grafica == "precipitacion":
-        fig.add_trace(
-            go.Bar(
-                x=fechas_dt,
-                y=precipitacion,
-                name="Precipitación",
-                marker_color="#4fc3f7",
+            titulo = f"<b>Temperatura en {nombre_ciudad} - Próximos 7 días</b>"
+            yaxis_title = "Temperatura (°C)"
+
+        elif tipo_grafica == "precipitacion":
+            fig.add_trace(
+                go.Bar(
+                    x=fechas_dt,
+                    y=precipitacion,
+                    name="Precipitación",
+                    marker_color="#4fc3f7",
+                )
             )
-        )
-        titulo = f"<b>Precipitación en {nombre_ciudad} - Próximos 7 días</b>"
-        yaxis_title = "Precipitación (mm)"
-
-    else:  # viento
-        fig.add_trace(
-            go.Scatter(
-                x=fechas_dt,
-                y=viento_max,
-                mode="lines+markers",
-                name="Velocidad del viento",
-                line=dict(color="#4db6ac", width=2.5),
-                marker=dict(size=8),
-                fill="tozeroy",
-                fillcolor="rgba(77,182,172,0.18)",
+            titulo = f"<b>Precipitación en {nombre_ciudad} - Próximos 7 días</b>"
+            yaxis_title = "Precipitación (mm)"
+
+        else:  # viento
+            fig.add_trace(
+                go.Scatter(
+                    x=fechas_dt,
+                    y=viento_max,
+                    mode="lines+markers",
+                    name="Velocidad del viento",
+                    line=dict(color="#4db6ac", width=2.5),
+                    marker=dict(size=8),
+                    fill="tozeroy",
+                    fillcolor="rgba(77,182,172,0.18)",
+                )
             )
-        )
-        titulo = f"<b>Viento en {nombre_ciudad} - Próximos 7 días</b>"
-        yaxis_title = "Velocidad (km/h)"
-
-    # ===============================================================
-    # ESTILO GRUBOX — EXACTO AL DE PÁGINA 7
-    # ===============================================================
-    fig.update_layout(
-        title=dict(
-            text=titulo,
-            x=0.5,
-            font=dict(size=20, color='rgb(250,189,47)')  # dorado Gruvbox
-        ),
-        xaxis_title="Fecha",
-        yaxis_title=yaxis_title,
-
-        plot_bgcolor='rgb(50,48,47)',   # fondo interno
-        paper_bgcolor='rgb(40,40,40)',  # fondo total
-
-        font=dict(
-            family='Outfit',
-            size=12,
-            color='rgb(213,196,161)'     # beige Gruvbox
-        ),
-
-        hovermode="x unified",
-
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=1.02,
-            xanchor='center',
-            x=0.5,
-            bgcolor='rgba(0,0,0,0)'      # transparente
-        ),
-
-        margin=dict(l=40, r=40, t=60, b=40)
-    )
-
-    # GRID Y EJES AL ESTILO GRUBOX
-    fig.update_xaxes(
-        showgrid=True,
-        gridcolor='rgb(80,73,69)',      # grid marrón suave
-        linecolor='rgb(102,92,84)',     # eje Gruvbox
-        zerolinecolor='rgb(102,92,84)',
-        mirror=True
-    )
+            titulo = f"<b>Viento en {nombre_ciudad} - Próximos 7 días</b>"
+            yaxis_title = "Velocidad (km/h)"
 
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor='rgb(80,73,69)',
-        linecolor='rgb(102,92,84)',
-        zerolinecolor='rgb(102,92,84)',
-        mirror=True
-    )
+        fig.update_layout(title=dict(text=titulo), yaxis_title=yaxis_title)
 
     # ----------------------------------------------
     # 5. Mensaje de actualización
     # ----------------------------------------------
     ahora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    mensaje = f"✅ Clima actualizado: {ahora} — {nombre_ciudad}"
+    if datos:
+        mensaje = f"✅ Clima actualizado: {ahora} — {nombre_ciudad} (datos {formatear_edad(edad)})"
+    else:
+        mensaje = f"⚠️ Datos de ejemplo: {ahora} — {nombre_ciudad}"
 
     return fig, temp_texto, humedad_texto, viento_texto, mensaje
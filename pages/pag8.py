@@ -1,9 +1,23 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, Input, Output, State, ctx
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
-import requests
 from datetime import datetime
-import pandas as pd
+
+from utils import tema
+from utils.componentes import medidor_ancho
+from utils.config import url_base
+from utils.epidemiologia import serie_desde_timeline, calcular_metricas
+from utils.figuras import figura_base
+from utils.http import obtener_json
+from utils.metricas import medir_fase
+from utils.refresco import refrescador, formatear_edad
+from utils.series import (
+    construir_piramide,
+    presupuesto_puntos,
+    seleccionar_nivel,
+    ventana_desde_relayout,
+)
 
 # =============================
 # Registro de Página
@@ -13,147 +27,228 @@ dash.register_page(__name__, path="/pagina8", name="Pagina 8")
 # =============================
 # Layout
 # =============================
-layout = html.Div(
-    [
-        # --------------------- COLUMNA IZQUIERDA ---------------------
-        html.Div(
-            [
-                html.H2("Dashboard COVID-19 Global", className="title"),
-
-                # Selector país
-                html.Div(
-                    [
-                        html.Label("Selecciona un país:"),
-                        dcc.Dropdown(
-                            id="dropdown-pais",
-                            options=[
-                                {'label': '🌎 Perú', 'value': 'Peru'},
-                                {'label': '🇺🇸 Estados Unidos', 'value': 'US'},
-                                {'label': '🇪🇸 España', 'value': 'Spain'},
-                                {'label': '🇲🇽 México', 'value': 'Mexico'},
-                                {'label': '🇦🇷 Argentina', 'value': 'Argentina'},
-                                {'label': '🇧🇷 Brasil', 'value': 'Brazil'},
-                                {'label': '🇨🇴 Colombia', 'value': 'Colombia'},
-                                {'label': '🇨🇱 Chile', 'value': 'Chile'},
-                                {'label': '🇮🇹 Italia', 'value': 'Italy'},
-                                {'label': '🇫🇷 Francia', 'value': 'France'},
-                            ],
-                            value="Peru",
-                            className="dropdown-clima",
-                            style={"width": "100%"},
-                        ),
-                    ],
-                    className="input-group",
-                ),
-
-                # Selector histórico
-                html.Div(
-                    [
-                        html.Label("Días de histórico:"),
-                        dcc.Dropdown(
-                            id="dropdown-dias-covid",
-                            options=[
-                                {'label': '30 días', 'value': 30},
-                                {'label': '60 días', 'value': 60},
-                                {'label': '90 días', 'value': 90},
-                                {'label': 'Todo el histórico', 'value': 'all'},
-                            ],
-                            value=90,
-                            className="dropdown-clima",
-                            style={"width": "100%"},
-                        ),
-                    ],
-                    className="input-group",
-                ),
-
-                html.Button(
-                    "Actualizar Datos",
-                    id="btn-actualizar-covid",
-                    className="btn-generar",
-                ),
-
-                html.Div(
-                    id="info-actualizado-covid",
-                    className="clima-info-box",
-                ),
-            ],
-            className="content left",
-        ),
-
-        # --------------------- COLUMNA DERECHA ---------------------
-        html.Div(
-            [
-                html.H2("Estadísticas en Tiempo Real", className="title"),
-
-                # Cards estilo Pag8
-                html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.H4("Total Casos", className="card-title temp"),
-                                html.H3(id="total-casos", className="card-value temp"),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4("Casos Nuevos Hoy", className="card-title humedad"),
-                                html.H3(id="casos-nuevos", className="card-value humedad"),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4("Total Muertes", className="card-title viento"),
-                                html.H3(id="total-muertes", className="card-value viento"),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4("Recuperados", className="card-title temp"),
-                                html.H3(id="total-recuperados", className="card-value temp"),
-                            ],
-                            className="clima-card",
-                        ),
-                    ],
-                    className="clima-card-container",
-                ),
-
-                dcc.Graph(
-                    id="grafica-covid",
-                    style={"height": "380px", "width": "100%"},
-                ),
-            ],
-            className="content right",
-        ),
-    ],
-    className="page-container page8-container",
-)
+def layout(**_):
+    return html.Div(
+        [
+            # --------------------- COLUMNA IZQUIERDA ---------------------
+            html.Div(
+                [
+                    html.H2("Dashboard COVID-19 Global", className="title"),
+
+                    # Selector país
+                    html.Div(
+                        [
+                            html.Label("Selecciona un país:"),
+                            dcc.Dropdown(
+                                id="dropdown-pais",
+                                options=[
+                                    {'label': '🌎 Perú', 'value': 'Peru'},
+                                    {'label': '🇺🇸 Estados Unidos', 'value': 'US'},
+                                    {'label': '🇪🇸 España', 'value': 'Spain'},
+                                    {'label': '🇲🇽 México', 'value': 'Mexico'},
+                                    {'label': '🇦🇷 Argentina', 'value': 'Argentina'},
+                                    {'label': '🇧🇷 Brasil', 'value': 'Brazil'},
+                                    {'label': '🇨🇴 Colombia', 'value': 'Colombia'},
+                                    {'label': '🇨🇱 Chile', 'value': 'Chile'},
+                                    {'label': '🇮🇹 Italia', 'value': 'Italy'},
+                                    {'label': '🇫🇷 Francia', 'value': 'France'},
+                                ],
+                                value="Peru",
+                                className="dropdown-clima",
+                                style={"width": "100%"},
+                            ),
+                        ],
+                        className="input-group",
+                    ),
+
+                    # Selector histórico
+                    html.Div(
+                        [
+                            html.Label("Días de histórico:"),
+                            dcc.Dropdown(
+                                id="dropdown-dias-covid",
+                                options=[
+                                    {'label': '30 días', 'value': 30},
+                                    {'label': '60 días', 'value': 60},
+                                    {'label': '90 días', 'value': 90},
+                                    {'label': 'Todo el histórico', 'value': 'all'},
+                                ],
+                                value=90,
+                                className="dropdown-clima",
+                                style={"width": "100%"},
+                            ),
+                        ],
+                        className="input-group",
+                    ),
+
+                    # Modo de gráfica (métricas derivadas)
+                    html.Div(
+                        [
+                            html.Label("Modo de gráfica:"),
+                            dcc.Dropdown(
+                                id="dropdown-modo-covid",
+                                options=[
+                                    {'label': 'Totales acumulados', 'value': 'acumulados'},
+                                    {'label': 'Nuevos casos diarios', 'value': 'diarios'},
+                                    {'label': 'Promedios móviles 7/14 días', 'value': 'promedios'},
+                                    {'label': 'Tasa de crecimiento', 'value': 'crecimiento'},
+                                    {'label': 'Tiempo de duplicación', 'value': 'duplicacion'},
+                                    {'label': 'Rt estimado', 'value': 'rt'},
+                                ],
+                                value="acumulados",
+                                clearable=False,
+                                className="dropdown-clima",
+                                style={"width": "100%"},
+                            ),
+                        ],
+                        className="input-group",
+                    ),
+
+                    html.Button(
+                        "Actualizar Datos",
+                        id="btn-actualizar-covid",
+                        className="btn-generar",
+                    ),
+
+                    html.Div(
+                        id="info-actualizado-covid",
+                        className="clima-info-box",
+                    ),
+                ],
+                className="content left",
+            ),
+
+            # --------------------- COLUMNA DERECHA ---------------------
+            html.Div(
+                [
+                    html.H2("Estadísticas en Tiempo Real", className="title"),
+
+                    # Cards estilo Pag8
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.H4("Total Casos", className="card-title temp"),
+                                    html.H3(id="total-casos", className="card-value temp"),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4("Casos Nuevos Hoy", className="card-title humedad"),
+                                    html.H3(id="casos-nuevos", className="card-value humedad"),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4("Total Muertes", className="card-title viento"),
+                                    html.H3(id="total-muertes", className="card-value viento"),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4("Recuperados", className="card-title temp"),
+                                    html.H3(id="total-recuperados", className="card-value temp"),
+                                ],
+                                className="clima-card",
+                            ),
+                        ],
+                        className="clima-card-container",
+                    ),
+
+                    dcc.Graph(
+                        id="grafica-covid",
+                        style={"height": "380px", "width": "100%"},
+                    ),
+                    # Ancho real de la gráfica en píxeles (lo llena el navegador)
+                    medidor_ancho("grafica-covid"),
+                ],
+                className="content right",
+            ),
+        ],
+        className="page-container page8-container",
+    )
 
 # ==========================================================
 # Funciones API disease.sh
 # ==========================================================
-def obtener_datos_pais(pais):
+def obtener_datos_pais(pais, base_url=None):
     try:
-        url = f"https://disease.sh/v3/covid-19/countries/{pais}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except:
-        return None
+        url = f"{base_url or url_base('covid')}/v3/covid-19/countries/{pais}"
+        return obtener_json(url, timeout=10, endpoint="/v3/covid-19/countries/{pais}")
+    except Exception:
+        return None  # el error queda en las métricas y el log de utils/http.py
 
 
-def obtener_historico_pais(pais, dias):
+def obtener_historico_pais(pais, dias, base_url=None):
     try:
-        url = f"https://disease.sh/v3/covid-19/historical/{pais}"
+        url = f"{base_url or url_base('covid')}/v3/covid-19/historical/{pais}"
         params = {"lastdays": dias}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except:
+        return obtener_json(url, params=params, timeout=10,
+                            endpoint="/v3/covid-19/historical/{pais}")
+    except Exception:
+        return None  # el error queda en las métricas y el log de utils/http.py
+
+
+def ingerir_covid(pais, dias):
+    """
+    Descarga datos actuales e histórico y calcula las métricas derivadas
+    una sola vez por ingesta. El refrescador guarda el resultado y lo
+    recarga en segundo plano; los cambios de modo lo reutilizan.
+    """
+    datos_actuales = obtener_datos_pais(pais)
+    historico = obtener_historico_pais(pais, dias)
+    if not datos_actuales or not historico:
         return None
 
+    serie = calcular_metricas(serie_desde_timeline(historico.get("timeline", {})))
+    return {
+        "actuales": datos_actuales,
+        "serie": serie,
+        "piramide": construir_piramide(serie),
+        "obtenido": datetime.now(),
+    }
+
+
+refrescador.registrar("covid", ingerir_covid)
+
+
+# ==========================================================
+# Modos de gráfica: ([(columna, nombre, color), ...], título eje y)
+# ==========================================================
+MODOS_COVID = {
+    "acumulados": (
+        [("casos", "Casos", "rgb(250,189,47)"), ("muertes", "Muertes", "rgb(204,36,29)")],
+        "Casos Totales",
+    ),
+    "diarios": (
+        [("nuevos_casos", "Casos nuevos", "rgb(250,189,47)"),
+         ("nuevas_muertes", "Muertes nuevas", "rgb(204,36,29)")],
+        "Casos por día",
+    ),
+    "promedios": (
+        [("casos_7d", "Casos (media 7 días)", "rgb(250,189,47)"),
+         ("casos_14d", "Casos (media 14 días)", "rgb(254,128,25)"),
+         ("muertes_7d", "Muertes (media 7 días)", "rgb(204,36,29)"),
+         ("muertes_14d", "Muertes (media 14 días)", "rgb(211,134,155)")],
+        "Promedio diario",
+    ),
+    "crecimiento": (
+        [("crecimiento", "Tasa de crecimiento diaria", "rgb(184,187,38)")],
+        "Tasa (log) por día",
+    ),
+    "duplicacion": (
+        [("duplicacion", "Tiempo de duplicación", "rgb(131,165,152)")],
+        "Días",
+    ),
+    "rt": (
+        [("rt", "Rt estimado", "rgb(251,73,52)")],
+        "Rt",
+    ),
+}
+
 
 def formatear_numero(n):
     if n is None:
@@ -162,7 +257,7 @@ def formatear_numero(n):
 
 
 # ==========================================================
-# CALLBACK
+# CALLBACKS
 # ==========================================================
 @callback(
     [
@@ -175,95 +270,84 @@ def formatear_numero(n):
     ],
     [
         Input("btn-actualizar-covid", "n_clicks"),
+        Input("dropdown-modo-covid", "value"),
+        Input("grafica-covid", "relayoutData"),
         State("dropdown-pais", "value"),
         State("dropdown-dias-covid", "value"),
+        State("ancho-grafica-covid", "data"),
     ],
     prevent_initial_call=False,
 )
-def actualizar_dashboard_covid(n_clicks, pais, dias):
-    datos_actuales = obtener_datos_pais(pais)
-    historico = obtener_historico_pais(pais, dias)
+def actualizar_dashboard_covid(n_clicks, modo, relayout, pais, dias, ancho):
+    # Zoom / paneo: solo se vuelve a consultar si cambió el eje x
+    ventana = None
+    if ctx.triggered_id == "grafica-covid":
+        ventana = ventana_desde_relayout(relayout)
+        if ventana is None:
+            raise PreventUpdate
 
-    if not datos_actuales or not historico:
-        fig = go.Figure()
-        fig.update_layout(
-            title="⚠️ Error de conexión con la API",
-            paper_bgcolor="rgb(40,40,40)",
-            plot_bgcolor="rgb(50,48,47)",
-            font=dict(color="rgb(213,196,161)", size=14),
-        )
+    # El botón pide una recarga inmediata; modo y zoom reutilizan lo guardado
+    entrada, edad = refrescador.obtener("covid", pais, dias,
+                                        forzar=ctx.triggered_id == "btn-actualizar-covid")
+
+    if entrada is None:
+        fig = figura_base("sencilla", title="⚠️ Error de conexión con la API", font=dict(size=14))
         return fig, "-", "-", "-", "-", "❌ Error al actualizar datos"
 
+    datos_actuales = entrada["actuales"]
+
     # Extraer valores actuales
     total_casos = formatear_numero(datos_actuales.get("cases"))
     casos_hoy = "+" + formatear_numero(datos_actuales.get("todayCases"))
     total_muertes = formatear_numero(datos_actuales.get("deaths"))
     total_recuperados = formatear_numero(datos_actuales.get("recovered"))
 
-    # Histórico
-    timeline = historico.get("timeline", {})
-    casos_hist = timeline.get("cases", {})
-    muertes_hist = timeline.get("deaths", {})
-
-    fechas = list(casos_hist.keys())
-    fechas_dt = [datetime.strptime(f, "%m/%d/%y") for f in fechas]
-
-    casos_val = list(casos_hist.values())
-    muertes_val = list(muertes_hist.values())
-
     # ================
     # Gráfica estilo GRUVBOX
     # ================
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=fechas_dt,
-            y=casos_val,
-            mode="lines",
-            name="Casos",
-            line=dict(color="rgb(250,189,47)", width=2.5),
-            fill="tozeroy",
-            fillcolor="rgba(250,189,47,0.15)",
-        )
+    columnas, yaxis_title = MODOS_COVID.get(modo, MODOS_COVID["acumulados"])
+
+    # Nivel de la pirámide que cabe en el ancho de la gráfica
+    nivel, datos_nivel = seleccionar_nivel(
+        entrada["piramide"],
+        [columna for columna, _, _ in columnas],
+        presupuesto_puntos(ancho),
+        ventana,
     )
 
-    fig.add_trace(
-        go.Scatter(
-            x=fechas_dt,
-            y=muertes_val,
-            mode="lines",
-            name="Muertes",
-            line=dict(color="rgb(204,36,29)", width=2),
+    with medir_fase("figura"):
+        fig = figura_base(
+            "sencilla",
+            title=dict(tema.TITULO, text=f"<b>Evolución COVID-19 en {pais}</b>"),
+            xaxis_title="Fecha",
+            yaxis_title=yaxis_title,
+            hovermode="x unified",
+            # Conserva el zoom del usuario al recibir datos más finos
+            uirevision=f"{pais}-{dias}-{modo}",
         )
-    )
 
-    fig.update_layout(
-        title=dict(
-            text=f"<b>Evolución COVID-19 en {pais}</b>",
-            x=0.5,
-            font=dict(size=20, color="rgb(250,189,47)"),
-        ),
-        xaxis_title="Fecha",
-        yaxis_title="Casos Totales",
-        plot_bgcolor="rgb(50,48,47)",
-        paper_bgcolor="rgb(40,40,40)",
-        font=dict(family="Outfit", size=12, color="rgb(213,196,161)"),
-        hovermode="x unified",
-        margin=dict(l=40, r=40, t=60, b=40),
-    )
+        for i, (columna, nombre, color) in enumerate(columnas):
+            fig.add_trace(
+                go.Scatter(
+                    x=datos_nivel[columna].index,
+                    y=datos_nivel[columna].to_numpy(),
+                    mode="lines",
+                    name=nombre,
+                    line=dict(color=color, width=2.5 if i == 0 else 2),
+                    fill="tozeroy" if i == 0 else None,
+                    fillcolor=color.replace("rgb", "rgba").replace(")", ",0.15)") if i == 0 else None,
+                )
+            )
 
-    fig.update_xaxes(
-        showgrid=True,
-        gridcolor="rgb(80,73,69)",
-    )
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor="rgb(80,73,69)",
-    )
+        if ventana not in (None, "auto"):
+            fig.update_xaxes(range=list(ventana))
 
     # Mensaje
     ahora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    msg = f"✅ Datos COVID actualizados: {ahora}"
+    obtenido = entrada["obtenido"].strftime("%d/%m/%Y %H:%M:%S")
+    msg = (
+        f"✅ Datos COVID actualizados: {ahora} "
+        f"(descargados: {obtenido}, {formatear_edad(edad)}, resolución: {nivel})"
+    )
 
     return fig, total_casos, casos_hoy, total_muertes, total_recuperados, msg
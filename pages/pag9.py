@@ -1,100 +1,107 @@
 import dash
 from dash import html, dcc, callback, Input, Output, State
 import plotly.graph_objects as go
-import requests
 import numpy as np
 from datetime import datetime, timedelta
 
+from utils.config import url_base
+from utils.figuras import figura_base
+from utils.http import obtener_json
+from utils.metricas import medir_fase
+from utils.refresco import refrescador, formatear_edad
+
 dash.register_page(__name__, path="/pagina9", name="Pagina 9")
 
 # ==================================================
 # SUNAT API
 # ==================================================
-def obtener_tc_sunat():
+def obtener_tc_sunat(base_url=None):
     try:
-        url = "https://api.apis.net.pe/v1/tipo-cambio-sunat"
-        r = requests.get(url, timeout=5)
-        r.raise_for_status()
-        return r.json()
-    except:
-        return None
+        url = f"{base_url or url_base('sunat')}/v1/tipo-cambio-sunat"
+        return obtener_json(url, timeout=5)
+    except Exception:
+        return None  # el error queda en las métricas y el log de utils/http.py
+
+
+refrescador.registrar("sunat", obtener_tc_sunat)
 
 # ==================================================
 # Layout
 # ==================================================
-layout = html.Div(
-    [
-        html.Div(
-            [
-                html.H2("Tipo de Cambio – SUNAT Perú", className="title"),
-
-                html.Label("Tipo de análisis:"),
-                dcc.RadioItems(
-                    id="tipo-analisis",
-                    options=[
-                        {"label": " Compra", "value": "compra"},
-                        {"label": " Venta", "value": "venta"},
-                        {"label": " Spread", "value": "spread"},
-                    ],
-                    value="compra",
-                    className="radio-gold",
-                ),
-
-                html.Br(),
-
-                html.Button(
-                    "Actualizar Valores",
-                    id="btn-tc",
-                    className="btn-generar",
-                ),
-
-                html.Div(
-                    id="mensaje-sunat",
-                    className="clima-info-box",
-                    style={"marginTop": "10px"},
-                ),
-            ],
-            className="content left",
-        ),
-
-        html.Div(
-            [
-                html.H2("Evolución Modelada del Tipo de Cambio", className="title"),
-
-                html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.H4("Compra", className="card-title temp"),
-                                html.H3(id="sunat-compra", className="card-value temp"),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4("Venta", className="card-title humedad"),
-                                html.H3(id="sunat-venta", className="card-value humedad"),
-                            ],
-                            className="clima-card",
-                        ),
-                        html.Div(
-                            [
-                                html.H4("Spread", className="card-title viento"),
-                                html.H3(id="sunat-spread", className="card-value viento"),
-                            ],
-                            className="clima-card",
-                        ),
-                    ],
-                    className="clima-card-container",
-                ),
-
-                dcc.Graph(id="grafico-sunat", style={"height": "380px"}),
-            ],
-            className="content right",
-        ),
-    ],
-    className="page-container page8-container",
-)
+def layout(**_):
+    return html.Div(
+        [
+            html.Div(
+                [
+                    html.H2("Tipo de Cambio – SUNAT Perú", className="title"),
+
+                    html.Label("Tipo de análisis:"),
+                    dcc.RadioItems(
+                        id="tipo-analisis",
+                        options=[
+                            {"label": " Compra", "value": "compra"},
+                            {"label": " Venta", "value": "venta"},
+                            {"label": " Spread", "value": "spread"},
+                        ],
+                        value="compra",
+                        className="radio-gold",
+                    ),
+
+                    html.Br(),
+
+                    html.Button(
+                        "Actualizar Valores",
+                        id="btn-tc",
+                        className="btn-generar",
+                    ),
+
+                    html.Div(
+                        id="mensaje-sunat",
+                        className="clima-info-box",
+                        style={"marginTop": "10px"},
+                    ),
+                ],
+                className="content left",
+            ),
+
+            html.Div(
+                [
+                    html.H2("Evolución Modelada del Tipo de Cambio", className="title"),
+
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.H4("Compra", className="card-title temp"),
+                                    html.H3(id="sunat-compra", className="card-value temp"),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4("Venta", className="card-title humedad"),
+                                    html.H3(id="sunat-venta", className="card-value humedad"),
+                                ],
+                                className="clima-card",
+                            ),
+                            html.Div(
+                                [
+                                    html.H4("Spread", className="card-title viento"),
+                                    html.H3(id="sunat-spread", className="card-value viento"),
+                                ],
+                                className="clima-card",
+                            ),
+                        ],
+                        className="clima-card-container",
+                    ),
+
+                    dcc.Graph(id="grafico-sunat", style={"height": "380px"}),
+                ],
+                className="content right",
+            ),
+        ],
+        className="page-container page8-container",
+    )
 
 # ==================================================
 # CALLBACK
@@ -109,16 +116,11 @@ layout = html.Div(
     State("tipo-analisis", "value"),
 )
 def actualizar_tc_sunat(n_clicks, tipo):
-    datos = obtener_tc_sunat()
+    # El botón pide una recarga inmediata (no solo el valor guardado)
+    datos, edad = refrescador.obtener("sunat", forzar=bool(n_clicks))
 
     if not datos:
-        fig = go.Figure()
-        fig.update_layout(
-            paper_bgcolor="rgb(40,40,40)",
-            plot_bgcolor="rgb(50,48,47)",
-            font=dict(color="white"),
-            title="No se pudo obtener datos."
-        )
+        fig = figura_base("sencilla", title="No se pudo obtener datos.", font=dict(color="white"))
         return fig, "-", "-", "-", "❌ Error API SUNAT"
 
     compra = float(datos["compra"])
@@ -150,29 +152,25 @@ def actualizar_tc_sunat(n_clicks, tipo):
     # --------------------------------------
     # FIGURA — TEMA GRUVBOX
     # --------------------------------------
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=fechas,
-            y=serie,
-            mode="lines+markers",
-            line=dict(color="#ffb74d", width=3),
-            marker=dict(size=7),
-            name="Predicción OU",
+    with medir_fase("figura"):
+        fig = figura_base(
+            "sencilla",
+            title=f"Proyección SUNAT – {tipo.capitalize()}",
+            xaxis_title="Fecha",
+            yaxis_title="Tipo de cambio (S/.)",
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=fechas,
+                y=serie,
+                mode="lines+markers",
+                line=dict(color="#ffb74d", width=3),
+                marker=dict(size=7),
+                name="Predicción OU",
+            )
         )
-    )
-
-    fig.update_layout(
-        title=f"Proyección SUNAT – {tipo.capitalize()}",
-        plot_bgcolor="rgb(50,48,47)",
-        paper_bgcolor="rgb(40,40,40)",
-        font=dict(color="rgb(213,196,161)", family="Outfit"),
-        xaxis_title="Fecha",
-        yaxis_title="Tipo de cambio (S/.)",
-        margin=dict(l=40, r=40, t=60, b=40),
-    )
 
-    mensaje = f"✔ Datos oficiales SUNAT — Fecha: {datos['fecha']}"
+    mensaje = f"✔ Datos oficiales SUNAT — Fecha: {datos['fecha']} ({formatear_edad(edad)})"
 
     return (
         fig,
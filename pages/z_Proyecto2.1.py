@@ -1,8 +1,13 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, callback
 import numpy as np
 import plotly.graph_objects as go
-from scipy.integrate import odeint
+
+from utils.cache import memoizar
+from utils.componentes import FIGURA_COMPLETA, estado_grafica, medidor_ancho
+from utils.figuras import figura_base, parche_trazas
+from utils.metricas import medir_fase
+from utils.series import presupuesto_puntos, reducir_trayectorias
 
 # ==================================================
 # Registro de página
@@ -13,104 +18,96 @@ dash.register_page(__name__, path="/Proyecto2.1", name="PROYECTO 2.1")
 # ==================================================
 # Layout
 # ==================================================
-layout = html.Div([
-    # ------------------------- IZQUIERDA -------------------------
-    html.Div([
-        html.H2("Modelo SIR  - ASIGNACION 2 (GRUPO 01)- Rumor", className="title"),
+def layout(**_):
+    return html.Div([
+        # ------------------------- IZQUIERDA -------------------------
+        html.Div([
+            html.H2("Modelo SIR  - ASIGNACION 2 (GRUPO 01)- Rumor", className="title"),
 
-        html.Label("Población total (N):"),
-        dcc.Input(id="sirN", type="number", value=275, className="input-field"),
+            html.Label("Población total (N):"),
+            dcc.Input(id="sirN", type="number", value=275, className="input-field"),
 
-        html.Label("Tasa de transmisión del rumor (b):"),
-        dcc.Input(id="sirB", type="number", value=0.004, step=0.0001, className="input-field"),
+            html.Label("Tasa de transmisión del rumor (b):"),
+            dcc.Input(id="sirB", type="number", value=0.004, step=0.0001, className="input-field"),
 
-        html.Label("Constante de racionalización (k):"),
-        dcc.Input(id="sirK", type="number", value=0.01, step=0.0001, className="input-field"),
+            html.Label("Constante de racionalización (k):"),
+            dcc.Input(id="sirK", type="number", value=0.01, step=0.0001, className="input-field"),
 
-        html.Label("Ignorantes iniciales S₀:"),
-        dcc.Input(id="sirS0", type="number", value=266, className="input-field"),
+            html.Label("Ignorantes iniciales S₀:"),
+            dcc.Input(id="sirS0", type="number", value=266, className="input-field"),
 
-        html.Label("Divulgadores iniciales I₀:"),
-        dcc.Input(id="sirI0", type="number", value=1, className="input-field"),
+            html.Label("Divulgadores iniciales I₀:"),
+            dcc.Input(id="sirI0", type="number", value=1, className="input-field"),
 
-        html.Label("Racionales iniciales R₀:"),
-        dcc.Input(id="sirR0", type="number", value=8, className="input-field"),
+            html.Label("Racionales iniciales R₀:"),
+            dcc.Input(id="sirR0", type="number", value=8, className="input-field"),
 
-        html.Label("Duración de la simulación (días):"),
-        dcc.Input(id="sirTmax", type="number", value=15, className="input-field"),
+            html.Label("Duración de la simulación (días):"),
+            dcc.Input(id="sirTmax", type="number", value=15, className="input-field"),
 
-        html.Br(),
-        html.Button("Reiniciar valores", id="btnResetSir6", className="btn-generar"),
+            html.Br(),
+            html.Button("Reiniciar valores", id="btnResetSir6", className="btn-generar"),
 
-        html.Br(), html.Br(),
+            html.Br(), html.Br(),
 
-        html.Div(
-            "Se simula la propagación de un rumor con los valores iniciales observados en un grupo de 275 personas.",
-            className="text-explain"
-        )
-    ], className="content left"),
+            html.Div(
+                "Se simula la propagación de un rumor con los valores iniciales observados en un grupo de 275 personas.",
+                className="text-explain"
+            )
+        ], className="content left"),
 
-    # ------------------------- DERECHA -------------------------
-    html.Div([
-        html.H2("Evolución del rumor", className="title"),
-        dcc.Graph(id='graficaSIR6', style={'height': '420px', 'width': '100%'}),
-        html.Div(id="interpretacionSIR6", className="markdown-text", style={
-            "marginTop": "25px",
-            "fontSize": "15px",
-            "textAlign": "justify",
-            "color": "rgb(213,196,161)",
-            "lineHeight": "1.6",
-        })
-    ], className="content right")
+        # ------------------------- DERECHA -------------------------
+        html.Div([
+            html.H2("Evolución del rumor", className="title"),
+            dcc.Graph(id='graficaSIR6', style={'height': '420px', 'width': '100%'}),
+            medidor_ancho('graficaSIR6'),
+            estado_grafica('graficaSIR6'),
+            html.Div(id="interpretacionSIR6", className="markdown-text", style={
+                "marginTop": "25px",
+                "fontSize": "15px",
+                "textAlign": "justify",
+                "color": "rgb(213,196,161)",
+                "lineHeight": "1.6",
+            })
+        ], className="content right")
 
-], className="page-container page6-container")
+    ], className="page-container page6-container")
 
 
 # ==================================================
-# Callback — Actualización del gráfico e interpretación
+# Simulación (memoizada: compartida entre workers en producción)
 # ==================================================
-@callback(
-    Output('graficaSIR6', 'figure'),
-    Output('interpretacionSIR6', 'children'),
-    Input('sirN', 'value'),
-    Input('sirB', 'value'),
-    Input('sirK', 'value'),
-    Input('sirS0', 'value'),
-    Input('sirI0', 'value'),
-    Input('sirR0', 'value'),
-    Input('sirTmax', 'value')
-)
-def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
+def sir_rumor(y, t, b, k):
+    """Modelo SIR del rumor."""
+    S, I, R = y
+    dSdt = -b * S * I
+    dIdt = b * S * I - k * I
+    dRdt = k * I
+    return [dSdt, dIdt, dRdt]
 
-    N = float(N or 275)
-    b = float(b or 0.004)
-    k = float(k or 0.01)
-    S0 = float(S0 or 266)
-    I0 = float(I0 or 1)
-    R0 = float(R0 or 8)
-    tmax = int(tmax or 15)
 
-    # Modelo SIR del rumor
-    def sir_rumor(y, t, b, k):
-        S, I, R = y
-        dSdt = -b * S * I
-        dIdt = b * S * I - k * I
-        dRdt = k * I
-        return [dSdt, dIdt, dRdt]
+@memoizar("proyecto2.1-rumor")
+def simular_rumor(b, k, S0, I0, R0, tmax):
+    """Trayectorias (t, S, I, R) del rumor integradas con odeint."""
+    from scipy.integrate import odeint  # SciPy se carga en la primera simulación
 
     t = np.linspace(0, tmax, 500)
     sol = odeint(sir_rumor, (S0, I0, R0), t, args=(b, k))
     S, I, R = sol.T
+    return t, S, I, R
 
-    # Pico del rumor
-    pico_idx = np.argmax(I)
-    dia_pico = t[pico_idx]
-    maxI = I[pico_idx]
 
-    # ==================================================
-    # GRÁFICA — Misma paleta que Página 4
-    # ==================================================
-    fig = go.Figure()
+# ==================================================
+# Figura completa (solo en la carga inicial) — Misma paleta que Página 4
+# ==================================================
+@medir_fase("figura")
+def construir_figura(t, S, I, R, dia_pico):
+    fig = figura_base(
+        title=dict(text="<b>Modelo SIR – Difusión del rumor</b>", y=0.9),
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Número de personas',
+        margin=dict(t=90, b=60),
+    )
 
     fig.add_trace(go.Scatter(
         x=t, y=S, mode='lines', name='Ignorantes (S)',
@@ -134,37 +131,55 @@ def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
         annotation_font=dict(color='rgb(250,189,47)', size=12)
     )
 
-    fig.update_layout(
-        title=dict(
-            text="<b>Modelo SIR – Difusión del rumor</b>",
-            x=0.5, y=0.9,
-            font=dict(size=20, color='rgb(250,189,47)')
-        ),
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Número de personas',
+    return fig
 
-        plot_bgcolor='rgb(50,48,47)',
-        paper_bgcolor='rgb(40,40,40)',
 
-        font=dict(family='Outfit', size=12, color='rgb(213,196,161)'),
-        margin=dict(l=40, r=40, t=90, b=60),
+# ==================================================
+# Callback — Actualización del gráfico e interpretación
+# ==================================================
+@callback(
+    Output('graficaSIR6', 'figure'),
+    Output('interpretacionSIR6', 'children'),
+    Output('estado-graficaSIR6', 'data'),
+    Input('sirN', 'value'),
+    Input('sirB', 'value'),
+    Input('sirK', 'value'),
+    Input('sirS0', 'value'),
+    Input('sirI0', 'value'),
+    Input('sirR0', 'value'),
+    Input('sirTmax', 'value'),
+    State('ancho-graficaSIR6', 'data'),
+    State('estado-graficaSIR6', 'data'),
+)
+def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax, ancho=None, estado=None):
 
-        legend=dict(
-            orientation='h',
-            yanchor='bottom', y=1.02,
-            xanchor='center', x=0.5,
-            bgcolor='rgba(0,0,0,0)'
-        )
-    )
+    N = float(N or 275)
+    b = float(b or 0.004)
+    k = float(k or 0.01)
+    S0 = float(S0 or 266)
+    I0 = float(I0 or 1)
+    R0 = float(R0 or 8)
+    tmax = int(tmax or 15)
 
-    fig.update_xaxes(
-        showgrid=True, gridcolor='rgb(80,73,69)',
-        linecolor='rgb(102,92,84)', mirror=True
-    )
-    fig.update_yaxes(
-        showgrid=True, gridcolor='rgb(80,73,69)',
-        linecolor='rgb(102,92,84)', mirror=True
-    )
+    t, S, I, R = simular_rumor(b, k, S0, I0, R0, tmax)
+
+    # Pico del rumor
+    pico_idx = np.argmax(I)
+    dia_pico = t[pico_idx]
+    maxI = I[pico_idx]
+
+    # Reducción de puntos según el ancho de la gráfica (conserva el pico)
+    t, (S, I, R) = reducir_trayectorias(t, [S, I, R], presupuesto_puntos(ancho), [pico_idx])
+
+    if estado != FIGURA_COMPLETA:
+        fig, estado = construir_figura(t, S, I, R, dia_pico), FIGURA_COMPLETA
+    else:
+        # La gráfica ya tiene la figura: datos y posición/texto de la línea del pico
+        fig, estado = parche_trazas([(t, S), (t, I), (t, R)]), dash.no_update
+        fig["layout"]["shapes"][0].update(x0=dia_pico, x1=dia_pico)
+        fig["layout"]["annotations"][0].update(
+            x=dia_pico, text=f"Pico del rumor (día {dia_pico:.1f})"
+        )
 
     # ==================================================
     # Interpretación
@@ -176,7 +191,7 @@ def actualizar_sir_modificado(N, b, k, S0, I0, R0, tmax):
         html.Span("Posteriormente, la cantidad de racionales aumenta a medida que el rumor pierde interés.")
     ])
 
-    return fig, interpretacion
+    return fig, interpretacion, estado
 
 
 # ==================================================
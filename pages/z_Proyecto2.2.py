@@ -2,7 +2,12 @@ import dash
 from dash import html, dcc, Input, Output, State, callback
 import numpy as np
 import plotly.graph_objects as go
-from scipy.integrate import odeint
+
+from utils.cache import memoizar
+from utils.componentes import FIGURA_COMPLETA, estado_grafica, medidor_ancho
+from utils.figuras import parche_trazas
+from utils.metricas import medir_fase
+from utils.series import presupuesto_puntos, reducir_trayectorias
 
 dash.register_page(__name__, path='/Proyecto2.2', name='Proyecto2.2')
 
@@ -13,12 +18,21 @@ def modelo_sir(y, t, beta, gamma, N):
     dRdt = gamma * I
     return [dSdt, dIdt, dRdt]
 
-def generar_grafico_sir(S0, I0, R0, beta, gamma, t_max):
+@memoizar("proyecto2.2-sir")
+def resolver_sir(S0, I0, R0, beta, gamma, t_max):
+    """Trayectorias (t, S, I, R) integradas con odeint (memoizadas)."""
+    from scipy.integrate import odeint  # SciPy se carga en la primera simulación
+
     N = S0 + I0 + R0
     t = np.linspace(0, t_max, 1000)
     y0 = [S0, I0, R0]
     solucion = odeint(modelo_sir, y0, t, args=(beta, gamma, N))
     S, I, R = solucion.T
+    return t, S, I, R
+
+def generar_grafico_sir(S0, I0, R0, beta, gamma, t_max, ancho=None, parche=False):
+    N = S0 + I0 + R0
+    t, S, I, R = resolver_sir(S0, I0, R0, beta, gamma, t_max)
     
     R0_val = beta / gamma if gamma != 0 else float('inf')
     idx_pico = np.argmax(I)
@@ -27,103 +41,118 @@ def generar_grafico_sir(S0, I0, R0, beta, gamma, t_max):
     S_final = S[-1]
     R_final = R[-1]
     tasa_ataque_final = (R_final / N) * 100
+
+    # Reducción de puntos según el ancho de la gráfica (conserva el pico)
+    t, (S, I, R) = reducir_trayectorias(t, [S, I, R], presupuesto_puntos(ancho), [idx_pico])
+
+    if parche:
+        # La gráfica ya existe: solo datos, pico (línea + marcador) y título
+        fig = parche_trazas([(t, S), (t, I), (t, R), ([tiempo_pico], [valor_pico])])
+        fig["layout"]["shapes"][0].update(x0=tiempo_pico, x1=tiempo_pico)
+        fig["layout"]["annotations"][0].update(x=tiempo_pico, text=f"Pico: día {tiempo_pico:.1f}")
+        fig["layout"]["title"]["text"] = f'Modelo SIR - R₀ = {R0_val:.2f}'
+        return fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final
     
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue', width=2)))
-    fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red', width=2)))
-    fig.add_trace(go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green', width=2)))
-    fig.add_vline(x=tiempo_pico, line_dash="dash", line_color="orange", annotation_text=f"Pico: día {tiempo_pico:.1f}")
-    fig.add_trace(go.Scatter(x=[tiempo_pico], y=[valor_pico], mode='markers', marker=dict(size=10, color='orange'), name='Pico de infección', showlegend=True))
+    with medir_fase("figura"):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue', width=2)))
+        fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red', width=2)))
+        fig.add_trace(go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green', width=2)))
+        fig.add_vline(x=tiempo_pico, line_dash="dash", line_color="orange", annotation_text=f"Pico: día {tiempo_pico:.1f}")
+        fig.add_trace(go.Scatter(x=[tiempo_pico], y=[valor_pico], mode='markers', marker=dict(size=10, color='orange'), name='Pico de infección', showlegend=True))
     
-    fig.update_layout(
-        title=f'Modelo SIR - R₀ = {R0_val:.2f}',
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Población',
-        hovermode='x unified',
-        template='plotly_white',
-        height=500,
-        legend=dict(orientation="h", yanchor="bottom", y=0.98, xanchor="right", x=1)
-    )
+        fig.update_layout(
+            title=f'Modelo SIR - R₀ = {R0_val:.2f}',
+            xaxis_title='Tiempo (días)',
+            yaxis_title='Población',
+            hovermode='x unified',
+            template='plotly_white',
+            height=500,
+            legend=dict(orientation="h", yanchor="bottom", y=0.98, xanchor="right", x=1)
+        )
     
     return fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final
 
-layout = html.Div(children=[  
-    html.Div(children=[
-        html.Div(children=[  
-            html.H2("Modelo SIR Interactivo", className="title"),  
-            html.Div([
-                html.H3("Población Inicial", className="subtitle"),
-                html.Div([
-                    html.Label("Población Total (N):", className="sir-input-label"),
-                    dcc.Input(id="input-n-sir", type="number", value=100000, min=1, className="sir-input-field")
-                ], className="sir-input-group"),
-                html.Div([
-                    html.Label("Susceptibles Iniciales (S₀):", className="sir-input-label"),
-                    dcc.Input(id="input-s0-sir", type="number", value=99500, min=0, className="sir-input-field")
-                ], className="sir-input-group"),
-                html.Div([
-                    html.Label("Infectados Iniciales (I₀):", className="sir-input-label"),
-                    dcc.Input(id="input-i0-sir", type="number", value=500, min=0, className="sir-input-field")
-                ], className="sir-input-group"),
+def layout(**_):
+    return html.Div(children=[
+        html.Div(children=[
+            html.Div(children=[  
+                html.H2("Modelo SIR Interactivo", className="title"),  
                 html.Div([
-                    html.Label("Recuperados Iniciales (R₀):", className="sir-input-label"),
-                    dcc.Input(id="input-r0-sir", type="number", value=0, min=0, className="sir-input-field")
-                ], className="sir-input-group"),
-            ], className="controls-container"),
-            html.Div([
-                html.H3("Parámetros Epidemiológicos", className="subtitle"),
+                    html.H3("Población Inicial", className="subtitle"),
+                    html.Div([
+                        html.Label("Población Total (N):", className="sir-input-label"),
+                        dcc.Input(id="input-n-sir", type="number", value=100000, min=1, className="sir-input-field")
+                    ], className="sir-input-group"),
+                    html.Div([
+                        html.Label("Susceptibles Iniciales (S₀):", className="sir-input-label"),
+                        dcc.Input(id="input-s0-sir", type="number", value=99500, min=0, className="sir-input-field")
+                    ], className="sir-input-group"),
+                    html.Div([
+                        html.Label("Infectados Iniciales (I₀):", className="sir-input-label"),
+                        dcc.Input(id="input-i0-sir", type="number", value=500, min=0, className="sir-input-field")
+                    ], className="sir-input-group"),
+                    html.Div([
+                        html.Label("Recuperados Iniciales (R₀):", className="sir-input-label"),
+                        dcc.Input(id="input-r0-sir", type="number", value=0, min=0, className="sir-input-field")
+                    ], className="sir-input-group"),
+                ], className="controls-container"),
                 html.Div([
-    html.Label("Tasa de Infección (β) [1/día]:", className="sir-input-label"),
-    dcc.Input(
-        id="input-beta-sir", 
-        type="number", 
-        value=0.1143, 
-        step="any",  # ← Cambia esto
-        min=0, 
-        className="sir-input-field"
-    ),
-    ], className="sir-input-group"),
-
-    html.Div([
-        html.Label("Tasa de Recuperación (γ) [1/día]:", className="sir-input-label"),
+                    html.H3("Parámetros Epidemiológicos", className="subtitle"),
+                    html.Div([
+        html.Label("Tasa de Infección (β) [1/día]:", className="sir-input-label"),
         dcc.Input(
-            id="input-gamma-sir", 
+            id="input-beta-sir", 
             type="number", 
-            value=0.0286, 
+            value=0.1143, 
             step="any",  # ← Cambia esto
             min=0, 
             className="sir-input-field"
         ),
-    ], className="sir-input-group"),
+        ], className="sir-input-group"),
+
+        html.Div([
+            html.Label("Tasa de Recuperación (γ) [1/día]:", className="sir-input-label"),
+            dcc.Input(
+                id="input-gamma-sir", 
+                type="number", 
+                value=0.0286, 
+                step="any",  # ← Cambia esto
+                min=0, 
+                className="sir-input-field"
+            ),
+        ], className="sir-input-group"),
+                    html.Div([
+                        html.Label("Tiempo máximo (días):", className="sir-input-label"),
+                        dcc.Input(id="input-t-max-sir", type="number", value=365, min=10, className="sir-input-field")
+                    ], className="sir-input-group"),
+                ], className="controls-container"),
                 html.Div([
-                    html.Label("Tiempo máximo (días):", className="sir-input-label"),
-                    dcc.Input(id="input-t-max-sir", type="number", value=365, min=10, className="sir-input-field")
-                ], className="sir-input-group"),
-            ], className="controls-container"),
-            html.Div([
+                    html.Div([
+                        html.Div("Número Reproductivo Básico:", className="r0-label"),
+                        html.Div(id="r0-value-display", className="r0-value")
+                    ], className="r0-display-panel"),
+                    html.Button("Generar simulación", id="btn-generar", className="btn-generar", n_clicks=0)
+                ], className="controls-footer")
+            ], className="left-container"),
+            html.Div(children=[
+                html.H2("Simulación del Modelo SIR", className="title"),
                 html.Div([
-                    html.Div("Número Reproductivo Básico:", className="r0-label"),
-                    html.Div(id="r0-value-display", className="r0-value")
-                ], className="r0-display-panel"),
-                html.Button("Generar simulación", id="btn-generar", className="btn-generar", n_clicks=0)
-            ], className="controls-footer")
-        ], className="left-container"),
-        html.Div(children=[
-            html.H2("Simulación del Modelo SIR", className="title"),
-            html.Div([
-                dcc.Graph(
-                    id='grafico-sir-interactivo',
-                    config={'displayModeBar': True},
-                    style={'height': '500px', 'width': '100%'}
-                )
-            ], className="sir-graph-container"),
-            html.Div([
-                html.H3("Información de la Simulación"),
-                html.Div(id="simulation-info", className="sir-info-panel")
-            ])
-        ], className="right-container")
-    ], className="main-container")
-])
+                    dcc.Graph(
+                        id='grafico-sir-interactivo',
+                        config={'displayModeBar': True},
+                        style={'height': '500px', 'width': '100%'}
+                    ),
+                    medidor_ancho('grafico-sir-interactivo'),
+                    estado_grafica('grafico-sir-interactivo'),
+                ], className="sir-graph-container"),
+                html.Div([
+                    html.H3("Información de la Simulación"),
+                    html.Div(id="simulation-info", className="sir-info-panel")
+                ])
+            ], className="right-container")
+        ], className="main-container")
+    ])
 
 @callback(
     Output('r0-value-display', 'children'),
@@ -161,16 +190,21 @@ def actualizar_poblacion_total(N, S0, I0, R0):
 
 @callback(
     [Output('grafico-sir-interactivo', 'figure'),
-     Output('simulation-info', 'children')],
+     Output('simulation-info', 'children'),
+     Output('estado-grafico-sir-interactivo', 'data')],
     Input('btn-generar', 'n_clicks'),
     [State('input-s0-sir', 'value'),
      State('input-i0-sir', 'value'),
      State('input-r0-sir', 'value'),
      State('input-beta-sir', 'value'),
      State('input-gamma-sir', 'value'),
-     State('input-t-max-sir', 'value')]
+     State('input-t-max-sir', 'value'),
+     State('ancho-grafico-sir-interactivo', 'data'),
+     State('estado-grafico-sir-interactivo', 'data')]
 )
-def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
+def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max, ancho=None, estado=None):
+    # Las figuras de error reemplazan a la completa: el estado vuelve a None
+    # y la próxima simulación se envía entera
     if None in [S0, I0, R0, beta, gamma, t_max]:
         fig = go.Figure()
         fig.update_layout(
@@ -180,7 +214,7 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
             template='plotly_white',
             height=500
         )
-        return fig, "Error: Todos los campos deben estar completos"
+        return fig, "Error: Todos los campos deben estar completos", None
     
     if S0 + I0 + R0 <= 0:
         fig = go.Figure()
@@ -191,13 +225,14 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
             template='plotly_white',
             height=500
         )
-        return fig, "Error: La población total debe ser mayor a 0"
+        return fig, "Error: La población total debe ser mayor a 0", None
     
     N = S0 + I0 + R0
     
     try:
         fig, R0_val, tiempo_pico, valor_pico, S_final, R_final, tasa_ataque_final = generar_grafico_sir(
-            S0, I0, R0, beta, gamma, t_max
+            S0, I0, R0, beta, gamma, t_max, ancho,
+            parche=(estado == FIGURA_COMPLETA)
         )
         
         if R0_val > 1:
@@ -225,7 +260,7 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
             ], className="simulation-summary")
         ]
         
-        return fig, info_content
+        return fig, info_content, FIGURA_COMPLETA
         
     except Exception as e:
         fig = go.Figure()
@@ -236,4 +271,4 @@ def actualizar_grafica_sir(n_clicks, S0, I0, R0, beta, gamma, t_max):
             template='plotly_white',
             height=500
         )
-        return fig, f"Error: {str(e)}"
\ No newline at end of file
+        return fig, f"Error: {str(e)}", None
\ No newline at end of file
@@ -1,11 +1,16 @@
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import odeint
 
 from styles import INPUT_STYLE_COMPACT, INFO_CARD_STYLE
+from utils.cache import memoizar
+from utils.componentes import FIGURA_COMPLETA, estado_grafica, medidor_ancho
+from utils.figuras import parche_trazas
+from utils.matematicas import formula
+from utils.metricas import medir_fase
+from utils.series import presupuesto_puntos, reducir_trayectorias
 
 dash.register_page(__name__, name="PROYECTO 2.3")
 
@@ -20,94 +25,95 @@ LABEL_STYLE = {
 # LAYOUT COMPLETO
 # ===========================================================
 
-layout = html.Div(
-    [
-        dbc.Card(
-            dbc.CardBody(
-                [
-
-                    # =====================================================
-                    #     TITULO PRINCIPAL
-                    # =====================================================
-                    html.H2(
-                        "Modelo Epidemiológico SIR - ASIGNACION 2 - GRUPO 01",
-                        className="text-center",
-                        style={
-                            "fontWeight": "800",
-                            "letterSpacing": "2px",
-                            "color": "#2E2E2E",
-                            "marginBottom": "25px",
-                        },
-                    ),
-
-                    html.P(
-                        "Este modelo describe la propagación de una enfermedad dividiendo "
-                        "la población en Susceptibles (S), Infectados (I) y Recuperados (R).",
-                        className="text-center",
-                        style={"color": "#2E2E2E"},
-                    ),
-
-                    html.Hr(),
-
-                    # =====================================================
-                    #     ECUACIONES + INTERPRETACIÓN
-                    # =====================================================
-                    html.Div(
-                        [
-                            # ---------------- ECUACIONES ----------------
-                            html.Div(
-                                dbc.Card(
-                                    dbc.CardBody(
-                                        [
-                                            html.H5(
-                                                "SISTEMA DE ECUACIONES DIFERENCIALES",
-                                                style={
-                                                    "textAlign": "center",
-                                                    "fontWeight": "700",
-                                                    "letterSpacing": "1px",
-                                                    "color": "#2E2E2E",
-                                                    "marginBottom": "12px",
-                                                },
-                                            ),
-
-                                            html.Img(
-                                                src=(
-                                                    r"https://latex.codecogs.com/svg.latex?"
-                                                    r"\frac{dS}{dt}=-\beta SI,\;"
-                                                    r"\frac{dI}{dt}=\beta SI-\gamma I,\;"
-                                                    r"\frac{dR}{dt}=\gamma I"
+def layout(**_):
+    return html.Div(
+        [
+            dbc.Card(
+                dbc.CardBody(
+                    [
+
+                        # =====================================================
+                        #     TITULO PRINCIPAL
+                        # =====================================================
+                        html.H2(
+                            "Modelo Epidemiológico SIR - ASIGNACION 2 - GRUPO 01",
+                            className="text-center",
+                            style={
+                                "fontWeight": "800",
+                                "letterSpacing": "2px",
+                                "color": "#2E2E2E",
+                                "marginBottom": "25px",
+                            },
+                        ),
+
+                        html.P(
+                            "Este modelo describe la propagación de una enfermedad dividiendo "
+                            "la población en Susceptibles (S), Infectados (I) y Recuperados (R).",
+                            className="text-center",
+                            style={"color": "#2E2E2E"},
+                        ),
+
+                        html.Hr(),
+
+                        # =====================================================
+                        #     ECUACIONES + INTERPRETACIÓN
+                        # =====================================================
+                        html.Div(
+                            [
+                                # ---------------- ECUACIONES ----------------
+                                html.Div(
+                                    dbc.Card(
+                                        dbc.CardBody(
+                                            [
+                                                html.H5(
+                                                    "SISTEMA DE ECUACIONES DIFERENCIALES",
+                                                    style={
+                                                        "textAlign": "center",
+                                                        "fontWeight": "700",
+                                                        "letterSpacing": "1px",
+                                                        "color": "#2E2E2E",
+                                                        "marginBottom": "12px",
+                                                    },
+                                                ),
+
+                                                formula(
+                                                    (
+                                                        r"\frac{dS}{dt}=-\beta SI,\;"
+                                                        r"\frac{dI}{dt}=\beta SI-\gamma I,\;"
+                                                        r"\frac{dR}{dt}=\gamma I"
+                                                    ),
+                                                    color="#2E2E2E",
+                                                    style={
+                                                        "display": "block",
+                                                        "margin": "10px auto",
+                                                        "height": "60px",
+                                                    },
                                                 ),
-                                                style={
-                                                    "display": "block",
-                                                    "margin": "10px auto",
-                                                    "height": "60px",
-                                                },
-                                            ),
-                                        ]
+                                            ]
+                                        ),
+                                        style=INFO_CARD_STYLE,
                                     ),
-                                    style=INFO_CARD_STYLE,
+                                    style={"width": "50%"},
                                 ),
-                                style={"width": "50%"},
-                            ),
 
-                            # ---------------- INTERPRETACIÓN ----------------
-                            html.Div(
-                                dbc.Card(
-                                    dbc.CardBody(
-                                        [
-                                            html.H5(
-                                                "INTERPRETACIÓN",
-                                                style={
-                                                    "textAlign": "center",
-                                                    "fontWeight": "700",
-                                                    "letterSpacing": "1px",
-                                                    "color": "#2E2E2E",
-                                                    "marginBottom": "12px",
-                                                },
-                                            ),
-
-                                            dcc.Markdown(
-                                                """
+                                # ---------------- INTERPRETACIÓN ----------------
+                                html.Div(
+                                    dbc.Card(
+                                        dbc.CardBody(
+                                            [
+                                                html.H5(
+                                                    "INTERPRETACIÓN",
+                                                    style={
+                                                        "textAlign": "center",
+                                                        "fontWeight": "700",
+                                                        "letterSpacing": "1px",
+                                                        "color": "#2E2E2E",
+                                                        "marginBottom": "12px",
+                                                    },
+                                                ),
+
+                                                dcc.Markdown(
+                                                    """
 * **S(t):** Población susceptible.  
 * **I(t):** Población infectada.  
 * **R(t):** Población recuperada.  
@@ -115,148 +121,168 @@ layout = html.Div(
 * **γ:** Tasa de recuperación.  
 * **N = S + I + R:** Población total constante.  
                                                 """,
-                                                style={"color": "#2E2E2E"},
-                                            ),
-                                        ]
+                                                    style={"color": "#2E2E2E"},
+                                                ),
+                                            ]
+                                        ),
+                                        style=INFO_CARD_STYLE,
                                     ),
-                                    style=INFO_CARD_STYLE,
-                                ),
-                                style={"width": "50%"},
-                            ),
-                        ],
-                        style={
-                            "display": "flex",
-                            "flexDirection": "row",
-                            "gap": "20px",
-                            "alignItems": "stretch",
-                            "marginBottom": "30px",
-                        },
-                    ),
-
-                    html.Hr(),
-
-                    # =====================================================
-                    #  PARÁMETROS + GRÁFICA
-                    # =====================================================
-                    html.Div(
-                        [
-
-                            # ======================= IZQUIERDA =======================
-                        html.Div(
-                            [
-                                html.H3(
-                                    "PARÁMETROS",
-                                    className="text-center",
-                                    style={
-                                        "fontWeight": "700",
-                                        "letterSpacing": "2px",
-                                        "color": "#2E2E2E",
-                                        "marginBottom": "25px",
-                                    },
-                                ),
-
-                                html.Div([
-                                    dbc.Label("Susceptibles Iniciales (S₀):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-s0", type="number", value=990, min=0,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div([
-                                    dbc.Label("Infectados Iniciales (I₀):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-i0", type="number", value=10, min=1,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div([
-                                    dbc.Label("Recuperados Iniciales (R₀):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-r0", type="number", value=0, min=0,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div([
-                                    dbc.Label("Tasa de contagio (β):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-beta", type="number", value=0.002, step=0.001,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div([
-                                    dbc.Label("Tasa de recuperación (γ):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-gamma", type="number", value=0.5, step=0.01,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div([
-                                    dbc.Label("Tiempo máximo (tₘₐₓ):", style=LABEL_STYLE),
-                                    dcc.Input(id="sir-tmax", type="number", value=60, min=1, step=1,
-                                            style=INPUT_STYLE_COMPACT),
-                                ], style={"marginBottom": "20px"}),
-
-                                html.Div(
-                                    id="sir-result",
-                                    className="mt-3",
-                                    style={
-                                        "fontWeight": "700",
-                                        "color": "#E25822",
-                                        "fontSize": "1.1rem",
-                                    },
+                                    style={"width": "50%"},
                                 ),
                             ],
                             style={
-                                "width": "30%",
-                                "paddingRight": "25px",
-                                "marginTop": "35px",
+                                "display": "flex",
+                                "flexDirection": "row",
+                                "gap": "20px",
+                                "alignItems": "stretch",
+                                "marginBottom": "30px",
                             },
                         ),
 
+                        html.Hr(),
 
-                            # ======================= DERECHA =======================
+                        # =====================================================
+                        #  PARÁMETROS + GRÁFICA
+                        # =====================================================
+                        html.Div(
+                            [
+
+                                # ======================= IZQUIERDA =======================
                             html.Div(
                                 [
                                     html.H3(
-                                        "Dinámica del Modelo SIR",
+                                        "PARÁMETROS",
+                                        className="text-center",
                                         style={
-                                            "textAlign": "center",
+                                            "fontWeight": "700",
+                                            "letterSpacing": "2px",
                                             "color": "#2E2E2E",
-                                            "marginBottom": "18px",
-                                            "fontWeight": "600",
+                                            "marginBottom": "25px",
                                         },
                                     ),
 
-                                    dcc.Graph(
-                                        id="sir-graph",
+                                    html.Div([
+                                        dbc.Label("Susceptibles Iniciales (S₀):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-s0", type="number", value=990, min=0,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div([
+                                        dbc.Label("Infectados Iniciales (I₀):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-i0", type="number", value=10, min=1,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div([
+                                        dbc.Label("Recuperados Iniciales (R₀):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-r0", type="number", value=0, min=0,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div([
+                                        dbc.Label("Tasa de contagio (β):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-beta", type="number", value=0.002, step=0.001,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div([
+                                        dbc.Label("Tasa de recuperación (γ):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-gamma", type="number", value=0.5, step=0.01,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div([
+                                        dbc.Label("Tiempo máximo (tₘₐₓ):", style=LABEL_STYLE),
+                                        dcc.Input(id="sir-tmax", type="number", value=60, min=1, step=1,
+                                                style=INPUT_STYLE_COMPACT),
+                                    ], style={"marginBottom": "20px"}),
+
+                                    html.Div(
+                                        id="sir-result",
+                                        className="mt-3",
                                         style={
-                                            "height": "520px",
-                                            "backgroundColor": "white",
-                                            "borderRadius": "16px",
-                                            "boxShadow": "6px 6px 14px rgba(0,0,0,0.25)",
-                                            "padding": "10px",
+                                            "fontWeight": "700",
+                                            "color": "#E25822",
+                                            "fontSize": "1.1rem",
                                         },
                                     ),
                                 ],
-                                style={"width": "70%"},
+                                style={
+                                    "width": "30%",
+                                    "paddingRight": "25px",
+                                    "marginTop": "35px",
+                                },
                             ),
-                        ],
-                        style={
-                            "display": "flex",
-                            "flexDirection": "row",
-                            "gap": "20px",
-                            "alignItems": "center",
-                        },
-                    ),
-                ]
-            ),
-            style={
-                "padding": "35px",
-                "backgroundColor": "#FFFBF5",
-                "borderRadius": "16px",
-                "boxShadow": "0 6px 14px rgba(0,0,0,0.35)",
-                "maxWidth": "1600px",
-                "margin": "0 auto",
-                "marginTop": "25px",
-            },
-        )
-    ]
-)
+
+
+                                # ======================= DERECHA =======================
+                                html.Div(
+                                    [
+                                        html.H3(
+                                            "Dinámica del Modelo SIR",
+                                            style={
+                                                "textAlign": "center",
+                                                "color": "#2E2E2E",
+                                                "marginBottom": "18px",
+                                                "fontWeight": "600",
+                                            },
+                                        ),
+
+                                        dcc.Graph(
+                                            id="sir-graph",
+                                            style={
+                                                "height": "520px",
+                                                "backgroundColor": "white",
+                                                "borderRadius": "16px",
+                                                "boxShadow": "6px 6px 14px rgba(0,0,0,0.25)",
+                                                "padding": "10px",
+                                            },
+                                        ),
+                                        medidor_ancho("sir-graph"),
+                                        estado_grafica("sir-graph"),
+                                    ],
+                                    style={"width": "70%"},
+                                ),
+                            ],
+                            style={
+                                "display": "flex",
+                                "flexDirection": "row",
+                                "gap": "20px",
+                                "alignItems": "center",
+                            },
+                        ),
+                    ]
+                ),
+                style={
+                    "padding": "35px",
+                    "backgroundColor": "#FFFBF5",
+                    "borderRadius": "16px",
+                    "boxShadow": "0 6px 14px rgba(0,0,0,0.35)",
+                    "maxWidth": "1600px",
+                    "margin": "0 auto",
+                    "marginTop": "25px",
+                },
+            )
+        ]
+    )
+
+
+# ===========================================================
+# SIMULACIÓN (memoizada: compartida entre workers en producción)
+# ===========================================================
+
+@memoizar("proyecto2_3-sir")
+def resolver_sir(s0, i0, r0, beta, gamma, tmax):
+    """Trayectorias (t, S, I, R) integradas con odeint."""
+    def sir_eq(y, t):
+        S, I, R = y
+        return -beta * S * I, beta * S * I - gamma * I, gamma * I
+
+    from scipy.integrate import odeint  # SciPy se carga en la primera simulación
+
+    t = np.linspace(0, tmax, 400)
+    S, I, R = odeint(sir_eq, (s0, i0, r0), t).T
+    return t, S, I, R
 
 
 # ===========================================================
@@ -266,35 +292,45 @@ layout = html.Div(
 @callback(
     Output("sir-graph", "figure"),
     Output("sir-result", "children"),
+    Output("estado-sir-graph", "data"),
     Input("sir-s0", "value"),
     Input("sir-i0", "value"),
     Input("sir-r0", "value"),
     Input("sir-beta", "value"),
     Input("sir-gamma", "value"),
     Input("sir-tmax", "value"),
+    State("ancho-sir-graph", "data"),
+    State("estado-sir-graph", "data"),
 )
-def update_sir(s0, i0, r0, beta, gamma, tmax):
+def update_sir(s0, i0, r0, beta, gamma, tmax, ancho=None, estado=None):
 
     if None in (s0, i0, r0, beta, gamma, tmax):
-        return dash.no_update, ""
+        return dash.no_update, "", dash.no_update
 
-    def sir_eq(y, t):
-        S, I, R = y
-        return -beta * S * I, beta * S * I - gamma * I, gamma * I
-
-    t = np.linspace(0, tmax, 400)
-    S, I, R = odeint(sir_eq, (s0, i0, r0), t).T
+    t, S, I, R = resolver_sir(s0, i0, r0, beta, gamma, tmax)
+    pico_I = np.max(I)
 
-    fig = go.Figure([
-        go.Scatter(x=t, y=S, mode="lines", name="Susceptibles"),
-        go.Scatter(x=t, y=I, mode="lines", name="Infectados"),
-        go.Scatter(x=t, y=R, mode="lines", name="Recuperados"),
-    ])
-
-    fig.update_layout(
-        xaxis_title="Tiempo",
-        yaxis_title="Población",
-        template="plotly_white",
+    # Reducción de puntos según el ancho de la gráfica (conserva el pico)
+    t, (S, I, R) = reducir_trayectorias(
+        t, [S, I, R], presupuesto_puntos(ancho), [int(np.argmax(I))]
     )
 
-    return fig, f"Pico máximo de infectados: {np.max(I):.2f}"
+    if estado == FIGURA_COMPLETA:
+        # La gráfica ya tiene la figura: solo se envían los nuevos datos
+        fig = parche_trazas([(t, S), (t, I), (t, R)])
+        return fig, f"Pico máximo de infectados: {pico_I:.2f}", dash.no_update
+
+    with medir_fase("figura"):
+        fig = go.Figure([
+            go.Scatter(x=t, y=S, mode="lines", name="Susceptibles"),
+            go.Scatter(x=t, y=I, mode="lines", name="Infectados"),
+            go.Scatter(x=t, y=R, mode="lines", name="Recuperados"),
+        ])
+
+        fig.update_layout(
+            xaxis_title="Tiempo",
+            yaxis_title="Población",
+            template="plotly_white",
+        )
+
+    return fig, f"Pico máximo de infectados: {pico_I:.2f}", FIGURA_COMPLETA
@@ -0,0 +1,195 @@
+"""
+Micro-benchmarks de los callbacks más costosos, llamados directamente
+(sin navegador ni servidor Dash) con parámetros representativos y de peor
+caso. Por cada caso mide:
+
+- latencia mínima / p50 / p95 / máx (ms) sobre varias repeticiones, con
+  el recolector de basura apagado (como timeit: sus pausas dependen de lo
+  que haya en el proceso, no del callback). La regresión se juzga sobre
+  el mínimo, que casi no cambia entre corridas, y sobre el p95 con más
+  margen; el p50 es solo informativo,
+- memoria pico asignada durante una llamada (tracemalloc, KiB; el mínimo
+  de varias llamadas, porque el pico de una sola varía entre corridas),
+- tamaño de la figura serializada como la envía la app (utils/serializacion.py).
+
+Las APIs externas se reemplazan por el simulador local
+(utils/apis_simuladas.py) y las simulaciones memoizadas se calculan siempre
+en frío (CACHE_BACKEND=ninguno).
+
+Compara contra las líneas base de scripts/lineas_base_callbacks.json y
+sale con código 1 si algún caso empeora más que la tolerancia.
+
+Uso (desde la raíz del repo):
+    python scripts/benchmark_callbacks.py                # comparar
+    python scripts/benchmark_callbacks.py --guardar      # actualizar líneas base
+    python scripts/benchmark_callbacks.py --casos pag4   # solo los casos que contienen "pag4"
+"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+LINEAS_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lineas_base_callbacks.json")
+
+REPETICIONES = 30
+REPETICIONES_PEOR_CASO = 15
+REPETICIONES_MEMORIA = 3
+
+# Cuánto puede empeorar cada métrica respecto de la línea base. El tiempo
+# tiene más margen porque depende de la máquina y de su carga: en la misma
+# máquina el mínimo varía hasta ~50 % entre corridas de distintos momentos,
+# así que solo se marca lo que al menos duplica la línea base.
+TOLERANCIAS = {"min_ms": 1.0, "p95_ms": 1.5, "pico_kib": 0.25, "bytes": 0.10}
+# Diferencias menores que esto no cuentan como regresión (ruido)
+MINIMOS = {"min_ms": 1.0, "p95_ms": 2.0, "pico_kib": 64, "bytes": 1024}
+
+
+def preparar():
+    """Simulador de APIs, caché desactivada y páginas importadas."""
+    from utils.apis_simuladas import iniciar_en_hilo
+
+    url, _ = iniciar_en_hilo()
+    os.environ["APIS_BASE_URL"] = url
+    os.environ["CACHE_BACKEND"] = "ninguno"
+
+    import app  # noqa: F401  (registra páginas y plantilla)
+    from utils import evaluador
+
+    # Sin esto, el arranque de los ayudantes de la pág. 6 cae en las mediciones
+    evaluador.evaluador.precalentar()
+
+    return {nombre: importlib.import_module(f"pages.{nombre}")
+            for nombre in ("pag4", "pag5", "pag6", "pag9", "z_Proyecto2.1", "z_Proyecto2.2")}
+
+
+def casos(paginas):
+    """[(nombre, función sin argumentos que devuelve la figura, repeticiones)]."""
+    pag4, pag5, pag6, pag9 = (paginas[p] for p in ("pag4", "pag5", "pag6", "pag9"))
+    p21, p22 = paginas["z_Proyecto2.1"], paginas["z_Proyecto2.2"]
+    R, P = REPETICIONES, REPETICIONES_PEOR_CASO
+    return [
+        ("pag4 SIR típico", lambda: pag4.actualizar_en_tiempo_real(1000, 0.3, 0.1, 1, 100, 800)[0], R),
+        ("pag4 SIR tmax=20000", lambda: pag4.actualizar_en_tiempo_real(10**6, 0.9, 0.05, 1, 20000, 1920)[0], P),
+        ("pag5 SEIR típico", lambda: pag5.actualizar_en_tiempo_real(1000, 0.3, 0.2, 0.1, 0, 1, 160, 800)[0], R),
+        ("pag5 SEIR tmax=20000",
+         lambda: pag5.actualizar_en_tiempo_real(10**6, 0.9, 0.3, 0.05, 10, 1, 20000, 1920)[0], P),
+        ("pag6 campo 15×15", lambda: pag6.actualizar_campo(1, "np.sin(X)", "np.cos(Y)", 5, 5, 15)[0], R),
+        ("pag6 campo 100×100",
+         lambda: pag6.actualizar_campo(1, "np.sin(X*Y) + X**2", "np.exp(-Y**2) * np.cos(X)", 10, 10, 100)[0], P),
+        ("proyecto2.2 SIR típico",
+         lambda: p22.generar_grafico_sir(99500, 500, 0, 0.3, 0.1, 365, 800)[0], R),
+        ("proyecto2.2 SIR rígido t=5000",
+         lambda: p22.generar_grafico_sir(10**7, 1, 0, 5.0, 0.01, 5000, 1920)[0], P),
+        ("proyecto2.1 rumor típico",
+         lambda: p21.actualizar_sir_modificado(275, 0.004, 0.01, 266, 1, 8, 15, 800)[0], R),
+        ("proyecto2.1 rumor tmax=2000",
+         lambda: p21.actualizar_sir_modificado(10**5, 0.05, 0.01, 10**5 - 1, 1, 0, 2000, 1920)[0], P),
+        ("pag9 SUNAT (API local)", lambda: pag9.actualizar_tc_sunat(1, "venta")[0], R),
+    ]
+
+
+def medir(funcion, repeticiones):
+    """Métricas de un caso (la primera llamada no cuenta: calienta importaciones)."""
+    from utils.serializacion import a_json
+
+    figura = funcion()
+    tiempos = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        gc.enable()
+
+    picos = []
+    for _ in range(REPETICIONES_MEMORIA):
+        gc.collect()
+        tracemalloc.start()
+        funcion()
+        picos.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    pico = min(picos)
+
+    respuesta = {"multi": True, "response": {"grafica": {"figure": figura}}}
+    return {
+        "min_ms": round(min(tiempos), 3),
+        "p50_ms": round(float(np.percentile(tiempos, 50)), 3),
+        "p95_ms": round(float(np.percentile(tiempos, 95)), 3),
+        "max_ms": round(max(tiempos), 3),
+        "pico_kib": round(pico / 1024, 1),
+        "bytes": len(a_json(respuesta).encode()),
+    }
+
+
+def regresiones(actual, base):
+    """[(métrica, base, actual)] que empeoraron más que la tolerancia."""
+    peores = []
+    for metrica, tolerancia in TOLERANCIAS.items():
+        if metrica not in base:
+            continue
+        limite = max(base[metrica] * (1 + tolerancia), base[metrica] + MINIMOS[metrica])
+        if actual[metrica] > limite:
+            peores.append((metrica, base[metrica], actual[metrica]))
+    return peores
+
+
+def maquina():
+    return {"python": platform.python_version(), "sistema": platform.platform(), "cpu": platform.processor()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de callbacks con líneas base")
+    parser.add_argument("--guardar", action="store_true", help="escribe los resultados como nuevas líneas base")
+    parser.add_argument("--casos", default="", help="solo los casos cuyo nombre contiene este texto")
+    args = parser.parse_args()
+
+    try:
+        with open(LINEAS_BASE, encoding="utf-8") as f:
+            guardadas = json.load(f)
+    except (OSError, ValueError):
+        guardadas = {"maquina": None, "casos": {}}
+    if not args.guardar and guardadas["maquina"] and guardadas["maquina"] != maquina():
+        print(f"Aviso: las líneas base son de otra máquina ({guardadas['maquina']['sistema']}); "
+              "compare tiempos con cuidado.\n")
+
+    resultados, fallas = {}, 0
+    print(f"{'caso':32} {'mín ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} {'pico KiB':>9} {'bytes':>10}  resultado")
+    for nombre, funcion, repeticiones in casos(preparar()):
+        if args.casos not in nombre:
+            continue
+        actual = resultados[nombre] = medir(funcion, repeticiones)
+        base = guardadas["casos"].get(nombre)
+        if args.guardar:
+            estado = "guardado"
+        elif base is None:
+            estado = "sin línea base"
+        else:
+            peores = regresiones(actual, base)
+            fallas += bool(peores)
+            estado = "OK" if not peores else "REGRESIÓN " + ", ".join(
+                f"{m} {b:g}→{a:g}" for m, b, a in peores
+            )
+        print(f"{nombre:32} {actual['min_ms']:>8.2f} {actual['p50_ms']:>8.2f} {actual['p95_ms']:>8.2f} {actual['max_ms']:>8.2f} "
+              f"{actual['pico_kib']:>9.1f} {actual['bytes']:>10,}  {estado}")
+
+    if args.guardar:
+        guardadas["maquina"] = maquina()
+        guardadas["casos"].update(resultados)
+        with open(LINEAS_BASE, "w", encoding="utf-8") as f:
+            json.dump(guardadas, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nLíneas base guardadas en {os.path.relpath(LINEAS_BASE)}")
+
+    sys.exit(1 if fallas else 0)
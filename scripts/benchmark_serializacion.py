@@ -0,0 +1,76 @@
+"""
+Compara tamaño y tiempo de serialización de respuestas de callbacks con
+la serialización estándar de Dash (JSON) y con la binaria
+(utils/serializacion.py: typed arrays base64 + orjson).
+
+Uso (desde la raíz del repo):
+    python scripts/benchmark_serializacion.py
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plotly.io.json import to_json_plotly  # noqa: E402
+
+from utils.apis_simuladas import iniciar_en_hilo  # noqa: E402
+from utils.serializacion import a_json  # noqa: E402
+
+REPETICIONES = 20
+
+
+def casos():
+    """Respuestas representativas: (nombre, respuesta de callback)."""
+    url, _ = iniciar_en_hilo()
+    os.environ["APIS_BASE_URL"] = url
+
+    import app  # noqa: F401  (registra páginas y plantilla)
+    import importlib
+
+    pag4 = importlib.import_module("pages.pag4")
+    pag6 = importlib.import_module("pages.pag6")
+    pag8 = importlib.import_module("pages.pag8")
+
+    respuestas = []
+
+    # pag8: histórico completo a resolución diaria (ancho grande)
+    entrada = pag8.ingerir_covid("Peru", "all")
+    serie = entrada["serie"]
+    fig = pag8.figura_base()
+    for col in ("casos", "muertes", "casos_7d", "muertes_7d"):
+        fig.add_scatter(x=serie.index, y=serie[col].tolist(), mode="lines", name=col)
+    respuestas.append(("pag8 histórico diario (listas)", fig))
+
+    # pag6: malla 30 × 30
+    fig, _ = pag6.actualizar_campo(1, "np.sin(X)", "np.cos(Y)", 5, 5, 30)
+    respuestas.append(("pag6 campo 30×30", fig))
+
+    # pag4: trayectoria larga sin reducción de puntos
+    fig = pag4.actualizar_en_tiempo_real(1000, 0.3, 0.1, 1, 20000, 10**6)[0]
+    respuestas.append(("pag4 tmax=20000", fig))
+
+    return [
+        (nombre, {"multi": True, "response": {"grafica": {"figure": fig}}})
+        for nombre, fig in respuestas
+    ]
+
+
+def medir(funcion, respuesta):
+    import copy
+    copias = [copy.deepcopy(respuesta) for _ in range(REPETICIONES)]
+    inicio = time.perf_counter()
+    for c in copias:
+        texto = funcion(c)
+    return len(texto.encode()), (time.perf_counter() - inicio) / REPETICIONES * 1000
+
+
+if __name__ == "__main__":
+    estandar = lambda r: to_json_plotly(r, engine="json")
+
+    print(f"{'caso':34} {'bytes json':>11} {'ms json':>8} {'bytes bin':>10} {'ms bin':>7} {'ratio':>6}")
+    for nombre, respuesta in casos():
+        b0, t0 = medir(estandar, respuesta)
+        b1, t1 = medir(a_json, respuesta)
+        print(f"{nombre:34} {b0:>11,} {t0:>8.2f} {b1:>10,} {t1:>7.2f} {b0 / b1:>6.1f}x")
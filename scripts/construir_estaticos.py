@@ -0,0 +1,44 @@
+"""
+Precompila en estaticos/ (con huella y estaticos/manifiesto.json):
+  - las figuras estáticas (pág. 1 y 2) como JSON;
+  - el CSS de assets/ unido y minificado;
+  - variantes WebP/JPEG de assets/images (si Pillow está instalado);
+  - las fórmulas LaTeX de las páginas como SVG (si matplotlib está instalado).
+Conviene correrlo en cada despliegue; si no, el arranque y la primera
+visita construyen lo que falte (salvo las imágenes).
+
+Uso (desde la raíz del repo):
+    python scripts/construir_estaticos.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402,F401  (registra páginas y figuras estáticas)
+from utils import assets, estaticos  # noqa: E402
+from utils.matematicas import construir_formulas  # noqa: E402
+
+
+def mostrar(nombre, entrada):
+    print(f"{nombre:16} {entrada['archivo']:36} {entrada['bytes']:>8,} bytes")
+
+
+if __name__ == "__main__":
+    for nombre, entrada in estaticos.construir_todo().items():
+        mostrar(nombre, entrada)
+
+    hojas = assets.hojas_css()
+    originales = sum(os.path.getsize(h) for h in hojas)
+    mostrar(assets.NOMBRE_CSS, assets.construir_css())
+    print(f"{'':16} ({len(hojas)} hojas, {originales:,} bytes sin minificar)")
+
+    if not assets.HAY_PILLOW:
+        print("Pillow no está instalado: se omiten las variantes de imágenes")
+    for nombre, entrada in assets.construir_imagenes().items():
+        mostrar(nombre, entrada)
+
+    # Fórmulas: armar los layouts genera los SVG que falten (los layouts
+    # fijos ya se armaron al importar app)
+    formulas = construir_formulas()
+    print(f"{len(formulas)} fórmulas SVG, {sum(e['bytes'] for e in formulas):,} bytes")
@@ -0,0 +1,420 @@
+"""
+Prueba de carga de extremo a extremo contra /_dash-update-component.
+
+Usuarios virtuales concurrentes repiten sesiones realistas como las haría
+el navegador: abrir una página (HTML + layout de la página + callbacks
+iniciales), arrastrar los sliders de pag3, cambiar parámetros de los
+modelos y pulsar los botones de pag6/7/8/9. Los callbacks que dependen de
+lo que devolvió otro (p. ej. slider -> input -> gráfica en pag3) se
+disparan en cadena, igual que en el navegador.
+
+Por cada nivel de concurrencia reporta throughput, tasa de error y
+latencia p50/p95/p99 global y por callback; con eso se dimensiona el
+número de workers de gunicorn.conf.py.
+
+El servidor se levanta localmente con las APIs externas simuladas
+(utils/apis_simuladas.py): el de desarrollo de Flask con hilos, o
+gunicorn con gunicorn.conf.py. Con --url se usa un servidor ya iniciado.
+
+Uso (desde la raíz del repo):
+    python scripts/prueba_carga.py
+    python scripts/prueba_carga.py --concurrencia 1,4,16,32 --duracion 30
+    python scripts/prueba_carga.py --servidor gunicorn --workers 4
+    python scripts/prueba_carga.py --url http://127.0.0.1:8050 --json carga.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import requests  # noqa: E402
+
+from utils.apis_simuladas import iniciar_en_hilo  # noqa: E402
+
+# Ancho de gráfica que el navegador mediría (medidor_ancho, clientside)
+ANCHO_PANTALLA = 1280
+TIMEOUT = 60
+ESPERA_ARRANQUE = 90
+
+SERVIDOR_DESARROLLO = """
+import sys
+import app
+app.server.run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True)
+"""
+
+
+# ==================================================
+# Servidor bajo prueba
+# ==================================================
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def levantar_servidor(tipo, workers, threads, apis_url):
+    """Inicia la app en un subproceso y devuelve (url, proceso)."""
+    puerto = puerto_libre()
+    entorno = dict(os.environ, APIS_BASE_URL=apis_url, PYTHONPATH=RAIZ)
+    if tipo == "gunicorn":
+        entorno.update(
+            GUNICORN_BIND=f"127.0.0.1:{puerto}",
+            GUNICORN_WORKERS=str(workers),
+            GUNICORN_THREADS=str(threads),
+        )
+        comando = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    else:
+        comando = [sys.executable, "-c", SERVIDOR_DESARROLLO, str(puerto)]
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{puerto}"
+
+    limite = time.monotonic() + ESPERA_ARRANQUE
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            sys.exit(f"El servidor terminó al arrancar (código {proceso.returncode}): {' '.join(comando)}")
+        try:
+            if requests.get(f"{url}/_dash-layout", timeout=2).ok:
+                return url, proceso
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proceso.terminate()
+    sys.exit(f"El servidor no respondió en {ESPERA_ARRANQUE} s")
+
+
+# ==================================================
+# Navegador simulado
+# ==================================================
+def _clave(id_, prop):
+    return f"{id_}.{prop}"
+
+
+def _componentes(arbol, props):
+    """Recorre el JSON de un layout y guarda las props de cada componente con id."""
+    if isinstance(arbol, list):
+        for hijo in arbol:
+            _componentes(hijo, props)
+    elif isinstance(arbol, dict) and "props" in arbol and "type" in arbol:
+        p = arbol["props"] or {}
+        if isinstance(p.get("id"), str):
+            props[p["id"]] = p
+        for valor in p.values():
+            if isinstance(valor, (dict, list)):
+                _componentes(valor, props)
+
+
+class Sesion:
+    """
+    Un usuario: cookies (requests.Session), valores actuales de las props
+    de la página abierta y los callbacks que esa página puede disparar.
+    """
+
+    def __init__(self, url, dependencias, azar, registrar):
+        self.url = url
+        self.http = requests.Session()
+        self.azar = azar
+        self.registrar = registrar
+        self.dependencias = dependencias
+        self.props = {}       # id -> props del layout (opciones de dropdowns, etc.)
+        self.valores = {}     # "id.prop" -> valor actual
+        self.pagina = []      # dependencias de la página abierta
+
+    def _pedir(self, etiqueta, metodo, ruta, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resp = self.http.request(metodo, self.url + ruta, timeout=TIMEOUT, **kwargs)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            resp, ok = None, False
+        self.registrar(etiqueta, time.perf_counter() - inicio, ok)
+        return resp if ok else None
+
+    def _callback(self, dep, cambiados):
+        """POST a /_dash-update-component como lo arma dash-renderer."""
+        salidas = [s.split(".", 1) for s in dep["output"].strip(".").split("...")]
+        cuerpo = {
+            "output": dep["output"],
+            "outputs": ([{"id": i, "property": p} for i, p in salidas] if dep["output"].startswith("..")
+                        else {"id": salidas[0][0], "property": salidas[0][1]}),
+            "inputs": [dict(d, value=self.valores.get(_clave(d["id"], d["property"]))) for d in dep["inputs"]],
+            "state": [dict(d, value=self.valores.get(_clave(d["id"], d["property"]))) for d in dep["state"]],
+            "changedPropIds": sorted(cambiados),
+        }
+        resp = self._pedir(dep["etiqueta"], "POST", "/_dash-update-component", json=cuerpo)
+        if resp is None or resp.status_code == 204:   # error o PreventUpdate
+            return {}
+        nuevos = {}
+        for id_, props in resp.json().get("response", {}).items():
+            for prop, valor in props.items():
+                nuevos[_clave(id_, prop)] = valor
+        return nuevos
+
+    def _propagar(self, cambiados):
+        """Dispara en cadena los callbacks de la página cuyos inputs cambiaron."""
+        llamados = set()
+        while cambiados:
+            pendientes = [
+                d for d in self.pagina
+                if d["output"] not in llamados and cambiados & d["claves_inputs"]
+            ]
+            siguientes = set()
+            for dep in pendientes:
+                llamados.add(dep["output"])
+                nuevos = self._callback(dep, cambiados & dep["claves_inputs"])
+                self.valores.update(nuevos)
+                siguientes |= set(nuevos)
+            cambiados = siguientes
+
+    # Acciones de usuario ---------------------------------------------
+    def visitar(self, ruta):
+        self._pedir(f"GET {ruta}", "GET", ruta)
+        self.valores = {_clave("_pages_location", "pathname"): ruta, _clave("_pages_location", "search"): ""}
+        rutas = next(d for d in self.dependencias if d["output"].startswith(".._pages_content."))
+        nuevos = self._callback(rutas, {_clave("_pages_location", "pathname")})
+
+        self.props = {}
+        _componentes(nuevos.get(_clave("_pages_content", "children")), self.props)
+        for id_, props in self.props.items():
+            for prop, valor in props.items():
+                self.valores[_clave(id_, prop)] = valor
+            if id_.startswith("ancho-"):
+                self.valores[_clave(id_, "data")] = ANCHO_PANTALLA
+
+        ids = set(self.props)
+        self.pagina = [d for d in self.dependencias if d["ids"] and d["ids"] <= ids]
+        for dep in self.pagina:
+            if not dep["prevent_initial_call"]:
+                self.valores.update(self._callback(dep, set()))
+
+    def cambiar(self, id_, valor, prop="value"):
+        self.valores[_clave(id_, prop)] = valor
+        self._propagar({_clave(id_, prop)})
+
+    def elegir(self, id_):
+        """Elige al azar una opción de un dropdown / radio."""
+        opciones = self.props[id_].get("options") or []
+        valor = self.azar.choice(opciones)
+        self.cambiar(id_, valor["value"] if isinstance(valor, dict) else valor)
+
+    def pulsar(self, id_):
+        clave = _clave(id_, "n_clicks")
+        self.cambiar(id_, (self.valores.get(clave) or 0) + 1, "n_clicks")
+
+    def pensar(self, pausa):
+        if pausa:
+            time.sleep(self.azar.uniform(0, 2 * pausa))
+
+
+def preparar_dependencias(url):
+    """Callbacks de servidor de /_dash-dependencies con sus ids e inputs."""
+    dependencias = []
+    for dep in requests.get(f"{url}/_dash-dependencies", timeout=TIMEOUT).json():
+        if dep.get("clientside_function") or dep.get("no_output"):
+            continue
+        todos = dep["inputs"] + dep["state"]
+        if not all(isinstance(d["id"], str) for d in todos):
+            continue   # pattern-matching (figuras estáticas): lo resuelve el navegador
+        primera = dep["output"].strip(".").split("...")[0]
+        dependencias.append(dict(
+            dep,
+            etiqueta=primera + ("…" if dep["output"].startswith("..") else ""),
+            ids={d["id"] for d in todos} - {"_pages_location", "_pages_store"},
+            claves_inputs={_clave(d["id"], d["property"]) for d in dep["inputs"]},
+        ))
+    return dependencias
+
+
+# ==================================================
+# Sesiones de usuario (recorridos típicos)
+# ==================================================
+def sesion_crecimiento(s, pausa):
+    """pag3: arrastrar sliders (cada paso es un callback de sincronización + la gráfica)."""
+    s.visitar("/pagina3")
+    for _ in range(s.azar.randint(3, 8)):
+        s.pensar(pausa / 4)
+        s.cambiar("slider-p0", s.azar.randrange(1_000, 2_000_000, 1_000))
+    for _ in range(s.azar.randint(2, 5)):
+        s.pensar(pausa / 4)
+        s.cambiar("slider-r", round(s.azar.uniform(-0.5, 0.5), 3))
+    s.cambiar("slider-t", s.azar.randint(1, 200))
+
+
+def sesion_sir(s, pausa):
+    """pag4 y pag5: cambiar parámetros de los modelos."""
+    s.visitar("/pagina4")
+    for _ in range(s.azar.randint(2, 4)):
+        s.pensar(pausa)
+        s.cambiar("input-beta", round(s.azar.uniform(0.1, 1.0), 2))
+        s.cambiar("input-tmax", s.azar.choice([100, 200, 365, 1000]))
+    s.visitar("/pagina5")
+    s.pensar(pausa)
+    s.cambiar("input-sigma-seir", round(s.azar.uniform(0.05, 0.5), 2))
+
+
+def sesion_campo(s, pausa):
+    """pag6: generar campos vectoriales con distintas resoluciones."""
+    s.visitar("/pagina6")
+    for _ in range(s.azar.randint(1, 3)):
+        s.pensar(pausa)
+        s.cambiar("input-n", s.azar.choice([10, 15, 20, 30]))
+        s.pulsar("btn-generar")
+
+
+def sesion_apis(s, pausa):
+    """pag7, pag8, pag9: consultar datos externos."""
+    s.visitar("/pagina7")
+    s.pensar(pausa)
+    s.elegir("dropdown-ciudad")
+    s.pulsar("btn-actualizar-clima")
+    s.visitar("/pagina8")
+    s.pensar(pausa)
+    s.elegir("dropdown-pais")
+    s.pulsar("btn-actualizar-covid")
+    s.elegir("dropdown-modo-covid")
+    s.visitar("/pagina9")
+    s.pensar(pausa)
+    s.pulsar("btn-tc")
+
+
+# (sesión, peso): proporción aproximada de usuarios en cada recorrido
+SESIONES = [(sesion_crecimiento, 3), (sesion_sir, 3), (sesion_campo, 2), (sesion_apis, 2)]
+
+
+# ==================================================
+# Ejecución por nivel de concurrencia
+# ==================================================
+class Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.sesiones = 0
+
+    def __call__(self, etiqueta, segundos, ok):
+        with self._lock:
+            self.latencias[etiqueta].append(segundos)
+            if not ok:
+                self.errores[etiqueta] += 1
+
+
+def usuario(url, dependencias, semilla, fin, pausa, registro):
+    azar = random.Random(semilla)
+    recorridos, pesos = zip(*SESIONES)
+    while time.monotonic() < fin:
+        sesion = Sesion(url, dependencias, azar, registro)
+        try:
+            azar.choices(recorridos, pesos)[0](sesion, pausa)
+        except Exception as e:   # p. ej. layout vacío tras un error: se cuenta y se sigue
+            registro("sesion", 0.0, False)
+            print(f"[CARGA] Sesión interrumpida: {e!r}")
+        with registro._lock:
+            registro.sesiones += 1
+
+
+def ejecutar_nivel(url, dependencias, concurrencia, duracion, pausa, semilla):
+    registro = Registro()
+    inicio = time.monotonic()
+    fin = inicio + duracion
+    hilos = [
+        threading.Thread(target=usuario, args=(url, dependencias, semilla + i, fin, pausa, registro), daemon=True)
+        for i in range(concurrencia)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return registro, time.monotonic() - inicio
+
+
+def resumir(latencias, errores, segundos):
+    ms = np.array(latencias) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0, 0, 0)
+    return {
+        "peticiones": len(ms),
+        "por_segundo": round(len(ms) / segundos, 2),
+        "error_pct": round(100 * errores / len(ms), 2) if len(ms) else 0.0,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+    }
+
+
+def imprimir(filas, titulo):
+    print(f"\n{titulo}")
+    print(f"  {'':44} {'pet.':>7} {'pet/s':>8} {'error %':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for nombre, r in filas:
+        print(f"  {nombre:44} {r['peticiones']:>7} {r['por_segundo']:>8.1f} {r['error_pct']:>8.2f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de los callbacks de la app")
+    parser.add_argument("--url", help="servidor ya iniciado (sin él se levanta uno local)")
+    parser.add_argument("--servidor", choices=("desarrollo", "gunicorn"), default="desarrollo")
+    parser.add_argument("--workers", type=int, default=2, help="workers de gunicorn")
+    parser.add_argument("--threads", type=int, default=4, help="hilos por worker de gunicorn")
+    parser.add_argument("--concurrencia", default="1,2,4,8,16", help="usuarios simultáneos por nivel")
+    parser.add_argument("--duracion", type=float, default=20, help="segundos por nivel")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="tiempo medio de reflexión entre acciones (0 = carga máxima)")
+    parser.add_argument("--latencia-apis", type=float, default=0.05, help="latencia de las APIs simuladas (s)")
+    parser.add_argument("--fallos-apis", type=float, default=0.0, help="probabilidad de 503 de las APIs simuladas")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)   # sin una línea por petición simulada
+    proceso = None
+    if args.url:
+        url = args.url.rstrip("/")
+    else:
+        apis_url, _ = iniciar_en_hilo(latencia=args.latencia_apis, tasa_fallos=args.fallos_apis,
+                                      semilla=args.semilla)
+        url, proceso = levantar_servidor(args.servidor, args.workers, args.threads, apis_url)
+        print(f"Servidor {args.servidor} en {url} (APIs simuladas en {apis_url})")
+
+    try:
+        dependencias = preparar_dependencias(url)
+        # Calentamiento: una vez cada recorrido (importaciones perezosas, estáticos)
+        calentamiento = Registro()
+        for recorrido, _ in SESIONES:
+            recorrido(Sesion(url, dependencias, random.Random(args.semilla), calentamiento), 0)
+
+        resultados = []
+        for concurrencia in (int(c) for c in args.concurrencia.split(",")):
+            registro, segundos = ejecutar_nivel(url, dependencias, concurrencia, args.duracion,
+                                                args.pausa, args.semilla)
+            todas = [x for lista in registro.latencias.values() for x in lista]
+            total = resumir(todas, sum(registro.errores.values()), segundos)
+            callbacks = {
+                etiqueta: resumir(lista, registro.errores[etiqueta], segundos)
+                for etiqueta, lista in sorted(registro.latencias.items())
+            }
+            resultados.append({"concurrencia": concurrencia, "segundos": round(segundos, 1),
+                               "sesiones": registro.sesiones, "total": total, "callbacks": callbacks})
+            imprimir([("TOTAL", total)] + list(callbacks.items()),
+                     f"== {concurrencia} usuarios, {segundos:.0f} s, {registro.sesiones} sesiones ==")
+
+        imprimir([(f"{r['concurrencia']} usuarios", r["total"]) for r in resultados],
+                 "== Resumen por concurrencia ==")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"servidor": args.url or args.servidor, "resultados": resultados},
+                          f, indent=2, ensure_ascii=False)
+            print(f"\nResultados guardados en {args.json}")
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait(10)
@@ -0,0 +1,104 @@
+"""
+Reporte del costo de arranque de un worker: cuánto tarda `import app`
+y cuánto aporta cada módulo, según `python -X importtime`.
+
+Muestra:
+- el tiempo total hasta tener la app lista (varias corridas, en frío),
+- el tiempo propio agrupado por paquete de terceros (dash, plotly, numpy...),
+- el tiempo propio y acumulado de cada módulo del proyecto (app, utils.*;
+  Dash carga pages/ con exec_module, así que las páginas cuentan en el
+  tiempo propio de app),
+- si alguna dependencia pesada que debería cargarse al primer uso
+  (SciPy, pandas, matplotlib, Pillow) se importó al arrancar.
+
+Uso (desde la raíz del repo):
+    python scripts/reporte_arranque.py [--corridas 5] [--top 15]
+
+Sale con código 1 si alguna dependencia perezosa se cargó al arrancar.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se importan dentro de las funciones que las usan (ver pages/ y utils/)
+# (plotly importa PIL._version, que es liviano; lo pesado es PIL.Image)
+PEREZOSOS = ("scipy", "pandas", "matplotlib", "PIL.Image")
+PROPIOS = ("app", "pages", "utils", "styles")
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_MEDIR = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import app\n"
+    "print(time.perf_counter() - t)\n"
+    f"print(','.join(m for m in {PEREZOSOS!r} if m in sys.modules))\n"
+)
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+
+
+def medir_arranque(corridas):
+    """(segundos de cada corrida, dependencias perezosas cargadas)."""
+    tiempos, cargados = [], set()
+    for _ in range(corridas):
+        salida = _python("-c", _MEDIR).stdout.split("\n")
+        tiempos.append(float(salida[0]))
+        cargados.update(m for m in salida[1].split(",") if m)
+    return tiempos, sorted(cargados)
+
+
+def costos_importacion():
+    """[(módulo, µs propios, µs acumulados)] de `import app`."""
+    resultado = _python("-X", "importtime", "-c", "import app")
+    return [
+        (m.group(4), int(m.group(1)), int(m.group(2)))
+        for m in map(_LINEA.match, resultado.stderr.splitlines()) if m
+    ]
+
+
+def reporte(corridas=5, top=15):
+    tiempos, cargados = medir_arranque(corridas)
+    costos = costos_importacion()
+
+    por_paquete = defaultdict(int)
+    for modulo, propio, _ in costos:
+        raiz = modulo.split(".")[0]
+        if raiz not in PROPIOS:
+            por_paquete[raiz] += propio
+    propios = [c for c in costos if c[0].split(".")[0] in PROPIOS]
+
+    print(f"import app ({corridas} corridas): mediana {statistics.median(tiempos) * 1000:.0f} ms, "
+          f"mín {min(tiempos) * 1000:.0f} ms, máx {max(tiempos) * 1000:.0f} ms")
+
+    print(f"\nTerceros (tiempo propio, top {top}):")
+    for paquete, us in sorted(por_paquete.items(), key=lambda p: -p[1])[:top]:
+        print(f"  {paquete:30} {us / 1000:8.1f} ms")
+
+    print(f"\nMódulos del proyecto (top {top}):    propio   acumulado")
+    for modulo, propio, acumulado in sorted(propios, key=lambda p: -p[2])[:top]:
+        print(f"  {modulo:30} {propio / 1000:6.1f} ms {acumulado / 1000:8.1f} ms")
+
+    if cargados:
+        print(f"\nDependencias perezosas importadas al arrancar: {', '.join(cargados)}")
+    else:
+        print(f"\nNinguna dependencia perezosa ({', '.join(PEREZOSOS)}) se cargó al arrancar.")
+    return not cargados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(0 if reporte(args.corridas, args.top) else 1)
@@ -0,0 +1,58 @@
+"""
+Comprueba que el circuit breaker por host (utils/circuito.py, usado por
+utils/http.obtener_json) solo se abre por fallos del host: muchos 4xx
+seguidos (p. ej. países inválidos en la pág. 8) no deben abrirlo, y los
+5xx sí.
+
+Uso (desde la raíz del repo):
+    python scripts/verificar_circuito.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import http  # noqa: E402
+from utils.apis_simuladas import iniciar_en_hilo  # noqa: E402
+from utils.circuito import ABIERTO, CERRADO, circuito_para  # noqa: E402
+
+LLAMADAS = 12   # más que minimo_llamadas del circuito
+
+
+def llamar_varias(url):
+    for _ in range(LLAMADAS):
+        try:
+            http.obtener_json(url, reintentos=0)
+        except Exception:
+            pass
+
+
+def casos():
+    """[(nombre, función que devuelve el estado final del circuito, estado esperado)]."""
+    def con_4xx():
+        url, servidor = iniciar_en_hilo()
+        llamar_varias(f"{url}/v3/covid-19/countries/Atlantida")   # 404
+        servidor.shutdown()
+        return circuito_para(url.removeprefix("http://")).estado
+
+    def con_5xx():
+        url, servidor = iniciar_en_hilo(tasa_fallos=1.0)
+        llamar_varias(f"{url}/v1/tipo-cambio-sunat")              # 503
+        servidor.shutdown()
+        return circuito_para(url.removeprefix("http://")).estado
+
+    return [
+        ("404 repetidos", con_4xx, CERRADO),
+        ("503 repetidos", con_5xx, ABIERTO),
+    ]
+
+
+if __name__ == "__main__":
+    errores = 0
+    print(f"{'caso':20} {'estado':>12} {'esperado':>12}  resultado")
+    for nombre, probar, esperado in casos():
+        estado = probar()
+        errores += estado != esperado
+        print(f"{nombre:20} {estado:>12} {esperado:>12}  {'OK' if estado == esperado else 'FALLA'}")
+
+    sys.exit(1 if errores else 0)
@@ -0,0 +1,64 @@
+"""
+Comprueba que las expresiones de la página 6 (utils/evaluador.py) solo
+alcanzan X, Y y las funciones de NumPy permitidas: las de siempre se
+aceptan y se evalúan, y cualquier otro atributo de NumPy (np.load,
+np.lib, np.ctypeslib, ...) se rechaza antes de llegar a eval.
+
+Uso (desde la raíz del repo):
+    python scripts/verificar_evaluador.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.evaluador import ExpresionInvalida, validar  # noqa: E402
+from utils.evaluador_ayudante import evaluar_local, malla  # noqa: E402
+
+
+def casos():
+    """[(expresión, True si se debe aceptar)]."""
+    return [
+        ("np.sin(X)", True),
+        ("-Y", True),
+        ("np.sin(X) * Y", True),
+        ("sin(X) + cos(Y)", True),
+        ("np.exp(-Y**2) * np.cos(X)", True),
+        ("np.sqrt(np.abs(X)) - np.pi * np.e", True),
+        ("np.arctan2(Y, X) + np.hypot(X, Y)", True),
+        ("np.ctypeslib", False),
+        ("np.ctypeslib.ctypes.CDLL(None).getpid() * 0 + X", False),
+        ("np.load('/etc/passwd')", False),
+        ("np.lib", False),
+        ("np.lib.npyio.open('/etc/passwd').read()", False),
+        ("np.sin.__class__", False),
+        ("X.T", False),
+        ("(X + Y).sum()", False),
+        ("np.zeros(10**10)", False),
+        ("__import__('os')", False),
+    ]
+
+
+def probar(expresion):
+    """'aceptada' o 'rechazada' (validar y, si pasa, evaluar sobre una malla chica)."""
+    try:
+        validar(expresion)
+    except ExpresionInvalida:
+        return "rechazada"
+    evaluar_local(expresion, "Y", *malla(1.0, 1.0, 3))
+    return "aceptada"
+
+
+if __name__ == "__main__":
+    errores = 0
+    print(f"{'expresión':52} {'resultado':>10} {'esperado':>10}")
+    for expresion, aceptar in casos():
+        esperado = "aceptada" if aceptar else "rechazada"
+        try:
+            resultado = probar(expresion)
+        except Exception as e:
+            resultado = f"error: {e}"
+        errores += resultado != esperado
+        print(f"{expresion:52} {resultado:>10} {esperado:>10}  {'OK' if resultado == esperado else 'FALLA'}")
+
+    sys.exit(1 if errores else 0)
@@ -0,0 +1,79 @@
+"""
+Comprueba que las figuras crudas (utils.figuras.figura_cruda) de las
+páginas interactivas son válidas para plotly y producen el mismo JSON
+que su versión validada con go.Figure. También mide cuánto tarda cada
+construcción.
+
+Uso (desde la raíz del repo):
+    python scripts/verificar_figuras.py
+"""
+import base64
+import importlib
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from plotly.io.json import to_json_plotly  # noqa: E402
+
+import app  # noqa: E402,F401  (registra páginas y plantilla)
+from utils.figuras import validar_figura  # noqa: E402
+
+REPETICIONES = 50
+
+
+def normalizar(valor):
+    """JSON de la figura con los typed arrays decodificados a listas."""
+    if isinstance(valor, dict) and "bdata" in valor:
+        datos = np.frombuffer(base64.b64decode(valor["bdata"]), dtype=valor["dtype"])
+        if "shape" in valor:
+            datos = datos.reshape([int(d) for d in str(valor["shape"]).split(",")])
+        return normalizar(datos.tolist())
+    if isinstance(valor, dict):
+        return {k: normalizar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [normalizar(v) for v in valor]
+    if isinstance(valor, float) and np.isnan(valor):
+        return None  # NaN en typed arrays equivale a null en listas
+    return valor
+
+
+def casos():
+    """(nombre, función que devuelve la figura cruda) por página."""
+    pag3 = importlib.import_module("pages.pag3")
+    pag4 = importlib.import_module("pages.pag4")
+    pag5 = importlib.import_module("pages.pag5")
+    pag6 = importlib.import_module("pages.pag6")
+    return [
+        ("pag3 exponencial", lambda: pag3.actualizar_grafica(200, 0.04, 100, None)[0]),
+        ("pag4 SIR", lambda: pag4.actualizar_en_tiempo_real(1000, 0.3, 0.1, 1, 100, 800)[0]),
+        ("pag5 SEIR", lambda: pag5.actualizar_en_tiempo_real(1000, 0.3, 0.2, 0.1, 0, 1, 160, 800)[0]),
+        ("pag6 campo 15×15", lambda: pag6.actualizar_campo(1, "np.sin(X)", "np.sin(Y)", 5, 5, 15)[0]),
+    ]
+
+
+if __name__ == "__main__":
+    errores = 0
+    print(f"{'caso':20} {'ms crudo':>9} {'ms validado':>12}  resultado")
+    for nombre, construir in casos():
+        cruda = construir()
+        try:
+            validada = validar_figura(cruda)
+        except ValueError as e:
+            errores += 1
+            print(f"{nombre:20} inválida: {e}")
+            continue
+
+        igual = normalizar(json.loads(to_json_plotly(cruda))) == normalizar(json.loads(validada.to_json()))
+        errores += not igual
+
+        t_crudo = timeit.timeit(construir, number=REPETICIONES) / REPETICIONES * 1000
+        t_validado = timeit.timeit(
+            lambda: validar_figura(construir()), number=REPETICIONES
+        ) / REPETICIONES * 1000
+        print(f"{nombre:20} {t_crudo:>9.2f} {t_validado:>12.2f}  {'OK' if igual else 'DISTINTA'}")
+
+    sys.exit(1 if errores else 0)
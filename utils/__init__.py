@@ -0,0 +1 @@
+# Utilidades compartidas por las páginas (caché, métricas, etc.)
@@ -0,0 +1,208 @@
+"""
+Servidor local que imita Open-Meteo, disease.sh y la API SUNAT de
+apis.net.pe con datos deterministas (misma semilla → mismas respuestas en
+cualquier proceso). Permite latencia y fallos configurables.
+
+Uso:
+    python -m utils.apis_simuladas --puerto 8051 --latencia 0.2 --fallos 0.1
+    APIS_BASE_URL=http://127.0.0.1:8051 python app.py
+"""
+import argparse
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+
+import flask
+import numpy as np
+from werkzeug.serving import make_server
+
+# Último día con datos en el histórico de disease.sh (JHU)
+FIN_HISTORICO = date(2023, 3, 9)
+INICIO_HISTORICO = date(2020, 1, 22)
+
+POBLACIONES = {
+    "Peru": 33_000_000, "US": 331_000_000, "Spain": 47_000_000,
+    "Mexico": 126_000_000, "Argentina": 45_000_000, "Brazil": 213_000_000,
+    "Colombia": 51_000_000, "Chile": 19_000_000, "Italy": 59_000_000,
+    "France": 67_000_000,
+}
+
+
+def nombre_pais(pais):
+    """Nombre canónico de `pais` (sin distinguir mayúsculas) o None si no existe."""
+    return {nombre.lower(): nombre for nombre in POBLACIONES}.get(pais.lower())
+
+
+def generador(semilla, *partes):
+    """RNG de NumPy sembrado de forma estable (no depende de hash())."""
+    texto = ":".join(str(p) for p in (semilla,) + partes)
+    return np.random.default_rng(zlib.crc32(texto.encode()))
+
+
+# ==================================================
+# Generadores de datos (vectorizados)
+# ==================================================
+def pronostico(semilla, lat, lon, dias, hoy):
+    rng = generador(semilla, round(lat, 2), round(lon, 2))
+    horas = dias * 24
+
+    # Temperatura base según latitud + ciclo diario + ruido
+    base = 28 - 0.35 * abs(lat)
+    h = np.arange(horas)
+    temp = base + 5 * np.sin((h % 24 - 9) / 24 * 2 * np.pi) + rng.normal(0, 1, horas)
+    humedad = np.clip(65 + 15 * np.cos(h / 24 * 2 * np.pi) + rng.normal(0, 5, horas), 5, 100)
+    lluvia = np.round(np.maximum(rng.normal(-0.3, 0.6, horas), 0), 1)
+    viento = np.abs(12 + 4 * np.sin(h / 36) + rng.normal(0, 2, horas))
+
+    por_dia = lambda v: v.reshape(dias, 24)
+    fechas = [hoy + timedelta(days=i) for i in range(dias)]
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": {
+            "time": [
+                (datetime.combine(hoy, datetime.min.time()) + timedelta(hours=int(i))).strftime("%Y-%m-%dT%H:%M")
+                for i in h
+            ],
+            "temperature_2m": np.round(temp, 1).tolist(),
+            "relative_humidity_2m": np.round(humedad).astype(int).tolist(),
+            "precipitation": lluvia.tolist(),
+            "wind_speed_10m": np.round(viento, 1).tolist(),
+        },
+        "daily": {
+            "time": [f.isoformat() for f in fechas],
+            "temperature_2m_max": np.round(por_dia(temp).max(axis=1), 1).tolist(),
+            "temperature_2m_min": np.round(por_dia(temp).min(axis=1), 1).tolist(),
+            "precipitation_sum": np.round(por_dia(lluvia).sum(axis=1), 1).tolist(),
+            "wind_speed_10m_max": np.round(por_dia(viento).max(axis=1), 1).tolist(),
+        },
+    }
+
+
+def historico_covid(semilla, pais):
+    """Casos y muertes acumulados con varias olas logísticas + ruido."""
+    rng = generador(semilla, pais)
+    poblacion = POBLACIONES.get(pais, 20_000_000)
+    n = (FIN_HISTORICO - INICIO_HISTORICO).days + 1
+    t = np.arange(n)
+
+    olas = rng.integers(3, 6)
+    centros = np.sort(rng.uniform(60, n - 60, olas))
+    anchos = rng.uniform(15, 45, olas)
+    alturas = rng.uniform(0.01, 0.08, olas) * poblacion
+
+    curva = (alturas[:, None] / (1 + np.exp(-(t[None, :] - centros[:, None]) / anchos[:, None]))).sum(axis=0)
+    # Olas + transmisión endémica de fondo, con ruido multiplicativo
+    nuevos = (np.diff(curva, prepend=0) + 2e-5 * poblacion) * rng.lognormal(0, 0.25, n)
+    casos = np.cumsum(np.round(nuevos)).astype(np.int64)
+    muertes = np.cumsum(np.round(nuevos * rng.uniform(0.005, 0.02))).astype(np.int64)
+    return casos, muertes
+
+
+def fechas_covid(n):
+    return [
+        f"{d.month}/{d.day}/{d:%y}"
+        for d in (FIN_HISTORICO - timedelta(days=i) for i in range(n - 1, -1, -1))
+    ]
+
+
+def tipo_cambio(semilla, dia):
+    rng = generador(semilla, dia.isoformat())
+    compra = round(3.70 + rng.normal(0, 0.03), 3)
+    return {
+        "compra": compra,
+        "venta": round(compra + rng.uniform(0.003, 0.01), 3),
+        "origen": "SUNAT",
+        "moneda": "USD",
+        "fecha": dia.isoformat(),
+    }
+
+
+# ==================================================
+# Servidor Flask
+# ==================================================
+def crear_app(latencia=0.0, tasa_fallos=0.0, semilla=0):
+    app = flask.Flask("apis_simuladas")
+    azar_fallos = random.Random(semilla)
+    lock = threading.Lock()
+
+    @app.before_request
+    def simular_red():
+        if latencia:
+            time.sleep(latencia)
+        with lock:
+            fallar = azar_fallos.random() < tasa_fallos
+        if fallar:
+            return flask.jsonify({"error": "fallo simulado"}), 503
+
+    @app.route("/v1/forecast")
+    def forecast():
+        args = flask.request.args
+        dias = int(args.get("forecast_days", 7))
+        return flask.jsonify(
+            pronostico(semilla, float(args["latitude"]), float(args["longitude"]), dias, date.today())
+        )
+
+    # Como disease.sh: 404 con "message" para países desconocidos
+    @app.route("/v3/covid-19/countries/<pais>")
+    def pais_actual(pais):
+        pais = nombre_pais(pais)
+        if pais is None:
+            return flask.jsonify({"message": "Country not found or doesn't have any cases"}), 404
+        casos, muertes = historico_covid(semilla, pais)
+        return flask.jsonify({
+            "country": pais,
+            "cases": int(casos[-1]),
+            "todayCases": int(casos[-1] - casos[-2]),
+            "deaths": int(muertes[-1]),
+            "todayDeaths": int(muertes[-1] - muertes[-2]),
+            "recovered": int(casos[-1] * 0.97),
+            "population": POBLACIONES[pais],
+        })
+
+    @app.route("/v3/covid-19/historical/<pais>")
+    def historico(pais):
+        pais = nombre_pais(pais)
+        if pais is None:
+            return flask.jsonify({"message": "Country not found or doesn't have any historical data"}), 404
+        casos, muertes = historico_covid(semilla, pais)
+        dias = flask.request.args.get("lastdays", "30")
+        n = len(casos) if dias == "all" else min(int(dias), len(casos))
+        fechas = fechas_covid(n)
+        return flask.jsonify({
+            "country": pais,
+            "timeline": {
+                "cases": dict(zip(fechas, casos[-n:].tolist())),
+                "deaths": dict(zip(fechas, muertes[-n:].tolist())),
+                "recovered": {},
+            },
+        })
+
+    @app.route("/v1/tipo-cambio-sunat")
+    def sunat():
+        return flask.jsonify(tipo_cambio(semilla, date.today()))
+
+    return app
+
+
+def iniciar_en_hilo(puerto=0, **opciones):
+    """
+    Levanta el simulador en un hilo (para benchmarks y pruebas).
+    Devuelve (url_base, servidor); `servidor.shutdown()` lo detiene.
+    """
+    servidor = make_server("127.0.0.1", puerto, crear_app(**opciones), threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_port}", servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="APIs externas simuladas")
+    parser.add_argument("--puerto", type=int, default=8051)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por respuesta")
+    parser.add_argument("--fallos", type=float, default=0.0, help="probabilidad de error 503")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    crear_app(args.latencia, args.fallos, args.semilla).run(port=args.puerto, threaded=True)
@@ -0,0 +1,145 @@
+import hashlib
+import importlib.util
+import os
+import re
+from io import BytesIO
+
+from utils import estaticos
+
+# ==================================================
+# Pipeline de assets: CSS en un solo archivo y variantes de imágenes
+# ==================================================
+# Dash carga cada .css de assets/ en todas las páginas (14 hojas). Aquí se
+# unen en el mismo orden en que Dash las cargaría, se minifican y se
+# publican como un archivo con huella en estaticos/ (caché inmutable).
+# app.py le dice a Dash que ignore los .css sueltos y enlaza el paquete.
+# Las imágenes de assets/images se reducen a anchos fijos en WebP y JPEG
+# si Pillow está instalado; si no, se usa la original.
+
+CARPETA_ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+CARPETA_IMAGENES = os.path.join(CARPETA_ASSETS, "images")
+NOMBRE_CSS = "app.css"
+
+# Anchos de las variantes (px): tamaño en pantalla y su versión 2x
+ANCHOS_IMAGEN = (300, 600)
+CALIDAD_IMAGEN = 80
+
+# Pillow es opcional y se importa solo al construir las variantes
+HAY_PILLOW = importlib.util.find_spec("PIL") is not None
+
+_IMPORT = re.compile(r"@import\s+url\(\s*(['\"]?)([^'\")]+)\1\s*\)\s*;")
+# Cadenas (se copian tal cual) y comentarios (se eliminan)
+_CADENA_O_COMENTARIO = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.S)
+
+
+# ==================================================
+# CSS
+# ==================================================
+def hojas_css():
+    """Rutas de los .css de assets/ en el orden en que Dash los carga."""
+    hojas = []
+    for actual, _, archivos in sorted(os.walk(CARPETA_ASSETS)):
+        hojas.extend(os.path.join(actual, f) for f in sorted(archivos) if f.endswith(".css"))
+    return hojas
+
+
+def _compactar(texto):
+    texto = re.sub(r"\s+", " ", texto)
+    texto = re.sub(r"\s*([{};,>])\s*", r"\1", texto)
+    texto = re.sub(r":\s+", ":", texto)
+    return texto.replace(";}", "}")
+
+
+def minificar_css(texto):
+    """Quita comentarios y espacios sobrantes sin tocar las cadenas."""
+    texto = _CADENA_O_COMENTARIO.sub(lambda m: m.group(1) or "", texto)
+    partes, inicio = [], 0
+    for m in _CADENA_O_COMENTARIO.finditer(texto):
+        partes.append(_compactar(texto[inicio:m.start()]))
+        partes.append(m.group(1))
+        inicio = m.end()
+    partes.append(_compactar(texto[inicio:]))
+    return "".join(partes).strip()
+
+
+def _version_css(hojas):
+    huella = hashlib.sha256()
+    for ruta in hojas:
+        with open(ruta, "rb") as f:
+            huella.update(f.read())
+    return huella.hexdigest()[:12]
+
+
+def construir_css():
+    """
+    Une y minifica las hojas. Los @import externos (fuentes) van al inicio,
+    que es donde CSS los admite; los locales se omiten porque esa hoja ya
+    está en el paquete.
+    """
+    hojas = hojas_css()
+    importaciones, cuerpos = [], []
+    for ruta in hojas:
+        with open(ruta, encoding="utf-8") as f:
+            texto = f.read()
+        for m in _IMPORT.finditer(texto):
+            if m.group(2).startswith(("http://", "https://")) and m.group(0) not in importaciones:
+                importaciones.append(m.group(0))
+        cuerpos.append(minificar_css(_IMPORT.sub("", texto)))
+
+    contenido = "\n".join(importaciones + cuerpos).encode()
+    return estaticos.guardar(NOMBRE_CSS, contenido, "css", version=_version_css(hojas))
+
+
+def url_css():
+    """URL con huella del CSS empaquetado (se reconstruye si cambió alguna hoja)."""
+    if not estaticos.vigente(NOMBRE_CSS, _version_css(hojas_css())):
+        construir_css()
+    return estaticos.RUTA_URL + estaticos.entrada(NOMBRE_CSS)["archivo"]
+
+
+# ==================================================
+# Imágenes
+# ==================================================
+def _nombre_variante(archivo, ancho, formato):
+    return f"{os.path.splitext(archivo)[0]}-{ancho}.{formato}"
+
+
+def construir_imagenes():
+    """Variantes WebP/JPEG de cada imagen de assets/images (requiere Pillow)."""
+    if not HAY_PILLOW:
+        return {}
+    from PIL import Image
+
+    resultado = {}
+    for archivo in sorted(os.listdir(CARPETA_IMAGENES)):
+        ruta = os.path.join(CARPETA_IMAGENES, archivo)
+        with Image.open(ruta) as original:
+            original = original.convert("RGB")
+            for ancho in ANCHOS_IMAGEN:
+                alto = round(original.height * min(1, ancho / original.width))
+                reducida = original.resize((min(ancho, original.width), alto), Image.LANCZOS)
+                for formato, extension in (("WEBP", "webp"), ("JPEG", "jpg")):
+                    nombre = _nombre_variante(archivo, ancho, extension)
+                    buffer = BytesIO()
+                    reducida.save(buffer, formato, quality=CALIDAD_IMAGEN, optimize=True)
+                    resultado[nombre] = estaticos.guardar(nombre, buffer.getvalue(), extension)
+    return resultado
+
+
+def variantes_imagen(archivo):
+    """
+    {"webp": srcset, "jpg": srcset, "src": jpg más pequeña} de
+    assets/images/<archivo>, o None si no se construyeron las variantes.
+    """
+    resultado = {}
+    for extension in ("webp", "jpg"):
+        entradas = [(ancho, estaticos.entrada(_nombre_variante(archivo, ancho, extension)))
+                    for ancho in ANCHOS_IMAGEN]
+        if not all(e for _, e in entradas):
+            return None
+        resultado[extension] = ", ".join(
+            f"{estaticos.RUTA_URL}{e['archivo']} {ancho}w" for ancho, e in entradas
+        )
+        if extension == "jpg":
+            resultado["src"] = estaticos.RUTA_URL + entradas[0][1]["archivo"]
+    return resultado
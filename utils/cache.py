@@ -0,0 +1,282 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils import memoria, metricas
+
+# ==================================================
+# Caché en memoria con tiempo de expiración (TTL)
+# ==================================================
+class CacheTTL:
+    """
+    Diccionario protegido por lock cuyas entradas expiran tras `ttl` segundos.
+    Se usa para guardar resultados costosos (datos de APIs ya procesados)
+    y reutilizarlos entre callbacks.
+
+    Cada entrada se anota en el presupuesto global de memoria
+    (utils/memoria.py), que puede comprimirla si está fría o desalojarla.
+    Los arreglos de NumPy guardados se devuelven de solo lectura.
+    """
+
+    def __init__(self, ttl, nombre="cache"):
+        self.ttl = ttl
+        self.nombre = nombre
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado o None si no existe o ya expiró."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            guardado, valor = entrada
+            vencido = time.time() - guardado > self.ttl
+            if vencido:
+                del self._datos[clave]
+        if vencido:
+            memoria.presupuesto.quitar(self, clave)
+            return None
+        if isinstance(valor, memoria.Comprimido):
+            # Vuelve a estar en uso: se guarda descomprimido otra vez
+            valor = memoria.descomprimir(valor)
+            with self._lock:
+                if clave in self._datos:
+                    self._datos[clave] = (guardado, valor)
+            memoria.presupuesto.anotar(self, clave, memoria.tamano_bytes(valor))
+        else:
+            memoria.presupuesto.usar(self, clave)
+        return valor
+
+    def guardar(self, clave, valor, costo=0.0):
+        """`costo`: segundos que tomó calcular el valor (para decidir qué desalojar)."""
+        memoria.solo_lectura(valor)
+        with self._lock:
+            self._datos[clave] = (time.time(), valor)
+        memoria.presupuesto.anotar(self, clave, memoria.tamano_bytes(valor), costo)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+        memoria.presupuesto.quitar_todo(self)
+
+    # Llamados por el presupuesto de memoria
+    def desalojar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def comprimir(self, clave):
+        """Comprime la entrada y devuelve su nuevo tamaño (None si ya no está)."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+        if entrada is None or isinstance(entrada[1], memoria.Comprimido):
+            return None
+        comprimido = memoria.comprimir(entrada[1])
+        with self._lock:
+            if self._datos.get(clave) is not entrada:
+                return None
+            self._datos[clave] = (entrada[0], comprimido)
+        return memoria.tamano_bytes(comprimido)
+
+
+# ==================================================
+# Caché compartida entre procesos (SQLite)
+# ==================================================
+# Con varios workers (gunicorn.conf.py) cada proceso tiene su propia
+# memoria: un CacheTTL se llena por separado en cada uno. CacheSQLite tiene
+# la misma interfaz pero guarda los valores (pickle) en un archivo SQLite
+# local, así que lo que calcula un worker es un acierto en todos.
+# El backend se elige con la variable de entorno CACHE_BACKEND
+# ("memoria" por defecto, "sqlite" en producción, "ninguno" para medir sin
+# caché) y el archivo con CACHE_SQLITE_RUTA.
+# El archivo tiene tamaño acotado: no se guardan valores de más de
+# CACHE_SQLITE_VALOR_MB (p. ej. una simulación "fondo" de utils/limites.py,
+# hasta LIMITES_MAXIMO_MB) y, si la suma pasa CACHE_SQLITE_MB, se borran las
+# entradas más viejas. SQLite reutiliza las páginas liberadas, así que el
+# archivo deja de crecer.
+
+RUTA_SQLITE = os.environ.get(
+    "CACHE_SQLITE_RUTA", os.path.join(tempfile.gettempdir(), "tecnicas_modelamiento_cache.sqlite3")
+)
+
+MAXIMO_VALOR_BYTES = int(float(os.environ.get("CACHE_SQLITE_VALOR_MB", 32)) * 2**20)
+MAXIMO_SQLITE_BYTES = int(float(os.environ.get("CACHE_SQLITE_MB", 512)) * 2**20)
+
+# Cada tantas escrituras (en promedio), o tras escribir una décima parte
+# del máximo, se borran las entradas vencidas y se revisa el tamaño total
+PROBABILIDAD_PURGA = 0.01
+OBJETIVO_SQLITE = 0.9   # al pasarse, se baja a este fragmento del máximo
+
+OMITIDOS = metricas.registrar(metricas.Contador(
+    "cache_sqlite_omitidos_total",
+    "Valores no guardados en la caché SQLite por superar CACHE_SQLITE_VALOR_MB.",
+))
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    espacio  TEXT NOT NULL,
+    clave    TEXT NOT NULL,
+    guardado REAL NOT NULL,
+    valor    BLOB NOT NULL,
+    PRIMARY KEY (espacio, clave)
+)
+"""
+
+
+class CacheSQLite:
+    """
+    Igual que CacheTTL, pero en un archivo SQLite compartido por todos los
+    procesos. `espacio` separa las entradas de cada caché dentro del archivo.
+    Si la base está bloqueada o falla, se comporta como un fallo de caché.
+    """
+
+    def __init__(self, espacio, ttl, ruta=None):
+        self.espacio = espacio
+        self.ttl = ttl
+        self.ruta = ruta or RUTA_SQLITE
+        self._local = threading.local()
+        self._escritos = 0   # bytes escritos desde la última purga (este proceso)
+
+    def _conexion(self):
+        """Una conexión por hilo y por proceso (no se heredan tras un fork)."""
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.pid != os.getpid():
+            con = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute(_ESQUEMA)
+            self._local.con, self._local.pid = con, os.getpid()
+        return con
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado o None si no existe o ya expiró."""
+        try:
+            fila = self._conexion().execute(
+                "SELECT guardado, valor FROM cache WHERE espacio = ? AND clave = ?",
+                (self.espacio, repr(clave)),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[CACHE] Error al leer {self.espacio}: {e}")
+            return None
+        if fila is None or time.time() - fila[0] > self.ttl:
+            return None
+        return memoria.solo_lectura(pickle.loads(fila[1]))
+
+    def guardar(self, clave, valor, costo=0.0):
+        # Se estima antes de serializar: no vale la pena el pickle de cientos de MB
+        if memoria.tamano_bytes(valor) > MAXIMO_VALOR_BYTES:
+            OMITIDOS.incrementar(cache=self.espacio)
+            return
+        datos = pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+        if len(datos) > MAXIMO_VALOR_BYTES:
+            OMITIDOS.incrementar(cache=self.espacio)
+            return
+        try:
+            con = self._conexion()
+            con.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (self.espacio, repr(clave), time.time(), datos),
+            )
+            self._escritos += len(datos)
+            if random.random() < PROBABILIDAD_PURGA or self._escritos > MAXIMO_SQLITE_BYTES / 10:
+                self._escritos = 0
+                self._purgar(con)
+        except sqlite3.Error as e:
+            print(f"[CACHE] Error al guardar en {self.espacio}: {e}")
+
+    def _purgar(self, con):
+        """Borra lo vencido de este espacio y, si el archivo se pasa del máximo, lo más viejo."""
+        con.execute(
+            "DELETE FROM cache WHERE espacio = ? AND guardado < ?",
+            (self.espacio, time.time() - self.ttl),
+        )
+        total = con.execute("SELECT COALESCE(SUM(length(valor)), 0) FROM cache").fetchone()[0]
+        if total <= MAXIMO_SQLITE_BYTES:
+            return
+        sobrante = total - MAXIMO_SQLITE_BYTES * OBJETIVO_SQLITE
+        filas = con.execute("SELECT rowid, length(valor) FROM cache ORDER BY guardado").fetchall()
+        borrar = []
+        for rowid, tamano in filas:
+            if sobrante <= 0:
+                break
+            borrar.append((rowid,))
+            sobrante -= tamano
+        con.executemany("DELETE FROM cache WHERE rowid = ?", borrar)
+        print(f"[CACHE] SQLite sobre {MAXIMO_SQLITE_BYTES // 2**20} MB: {len(borrar)} entradas viejas borradas")
+
+    def limpiar(self):
+        try:
+            self._conexion().execute("DELETE FROM cache WHERE espacio = ?", (self.espacio,))
+        except sqlite3.Error as e:
+            print(f"[CACHE] Error al limpiar {self.espacio}: {e}")
+
+
+class SinCache:
+    """Backend "ninguno": nunca guarda nada (benchmarks que miden el cálculo en frío)."""
+
+    def obtener(self, clave):
+        return None
+
+    def guardar(self, clave, valor, costo=0.0):
+        pass
+
+    def limpiar(self):
+        pass
+
+
+def backend():
+    """Backend configurado: "memoria", "sqlite" o "ninguno"."""
+    return os.environ.get("CACHE_BACKEND", "memoria").lower()
+
+
+def crear_cache(nombre, ttl):
+    """Caché con el backend configurado (CacheSQLite, CacheTTL o SinCache)."""
+    if backend() == "sqlite":
+        return CacheSQLite(nombre, ttl)
+    if backend() == "ninguno":
+        return SinCache()
+    return CacheTTL(ttl, nombre)
+
+
+CONSULTAS = metricas.registrar(metricas.Contador(
+    "cache_consultas_total",
+    "Consultas a las simulaciones memoizadas por caché y resultado (acierto, fallo).",
+))
+
+
+def memoizar(nombre, ttl=3600):
+    """
+    Decorador para funciones puras (simulaciones): guarda el resultado por
+    argumentos en la caché configurada. La clave incluye la huella del
+    código de la función, así que al cambiarla no se reutilizan resultados
+    viejos. El valor devuelto se comparte: sus arreglos de NumPy son de
+    solo lectura.
+    """
+    def decorador(funcion):
+        huella = hashlib.sha256(inspect.getsource(funcion).encode()).hexdigest()[:12]
+        cache = None
+
+        @functools.wraps(funcion)
+        def envoltura(*args):
+            nonlocal cache
+            if cache is None:  # al primer uso, con el backend ya configurado
+                cache = crear_cache(f"{nombre}:{huella}", ttl)
+            valor = cache.obtener(args)
+            if valor is None:
+                CONSULTAS.incrementar(cache=nombre, resultado="fallo")
+                inicio = time.perf_counter()
+                valor = funcion(*args)
+                cache.guardar(args, valor, time.perf_counter() - inicio)
+            else:
+                CONSULTAS.incrementar(cache=nombre, resultado="acierto")
+            return valor
+
+        return envoltura
+    return decorador
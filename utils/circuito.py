@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+
+# ==================================================
+# Circuit breaker por host (cerrado / abierto / semiabierto)
+# ==================================================
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class CircuitoAbierto(Exception):
+    """Se lanza sin hacer la petición cuando el circuito del host está abierto."""
+
+
+class Circuito:
+    """
+    Registra el resultado de las últimas llamadas a un host. Si la tasa de
+    fallos (timeouts, errores de conexión o 5xx, según utils/http.py, y
+    respuestas más lentas que `umbral_lento`) supera `tasa_fallos`, el
+    circuito se abre y las llamadas fallan al instante durante `espera`
+    segundos. Después se deja pasar una llamada de prueba
+    (semiabierto): si sale bien se cierra, si falla vuelve a abrirse.
+    """
+
+    def __init__(self, host, ventana=20, minimo_llamadas=5, tasa_fallos=0.5,
+                 espera=30.0, umbral_lento=5.0):
+        self.host = host
+        self.minimo_llamadas = minimo_llamadas
+        self.tasa_fallos = tasa_fallos
+        self.espera = espera
+        self.umbral_lento = umbral_lento
+
+        self.estado = CERRADO
+        self.abierto_desde = None
+        self.aperturas = 0
+        self._resultados = deque(maxlen=ventana)
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """Indica si se puede hacer una llamada ahora (y reserva la de prueba)."""
+        with self._lock:
+            if self.estado == CERRADO:
+                return True
+            if self.estado == ABIERTO:
+                if time.time() - self.abierto_desde < self.espera:
+                    return False
+                self.estado = SEMIABIERTO
+                self._prueba_en_curso = False
+            if self._prueba_en_curso:
+                return False
+            self._prueba_en_curso = True
+            return True
+
+    def registrar(self, exito, duracion):
+        with self._lock:
+            exito = exito and duracion <= self.umbral_lento
+
+            if self.estado == SEMIABIERTO:
+                self._prueba_en_curso = False
+                if exito:
+                    self.estado = CERRADO
+                    self._resultados.clear()
+                else:
+                    self._abrir()
+                return
+
+            self._resultados.append(exito)
+            fallos = self._resultados.count(False)
+            if (len(self._resultados) >= self.minimo_llamadas
+                    and fallos / len(self._resultados) >= self.tasa_fallos):
+                self._abrir()
+
+    def _abrir(self):
+        self.estado = ABIERTO
+        self.abierto_desde = time.time()
+        self.aperturas += 1
+
+    def resumen(self):
+        with self._lock:
+            total = len(self._resultados)
+            return {
+                "estado": self.estado,
+                "llamadas_en_ventana": total,
+                "tasa_fallos": (self._resultados.count(False) / total) if total else 0.0,
+                "aperturas": self.aperturas,
+                "abierto_desde": self.abierto_desde if self.estado != CERRADO else None,
+            }
+
+
+_circuitos = {}
+_lock_registro = threading.Lock()
+
+
+def circuito_para(host):
+    with _lock_registro:
+        if host not in _circuitos:
+            _circuitos[host] = Circuito(host)
+        return _circuitos[host]
+
+
+def estado_circuitos():
+    """Estado de todos los circuitos, para monitoreo."""
+    with _lock_registro:
+        circuitos = list(_circuitos.values())
+    return {c.host: c.resumen() for c in circuitos}
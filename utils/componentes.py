@@ -0,0 +1,94 @@
+import dash
+from dash import dcc, html, Input, Output, MATCH
+
+from utils import assets, estaticos
+
+# ==================================================
+# Componentes reutilizables entre páginas
+# ==================================================
+
+_medidores = set()
+
+
+def medidor_ancho(id_grafica):
+    """
+    dcc.Store con el ancho en píxeles de la gráfica `id_grafica`; lo llena
+    el navegador al cargar la página. Se usa como State para calcular el
+    presupuesto de puntos (utils.series.presupuesto_puntos).
+    """
+    id_store = f"ancho-{id_grafica}"
+    if id_grafica not in _medidores:
+        _medidores.add(id_grafica)
+        dash.clientside_callback(
+            """
+            function(id) {
+                var el = document.getElementById(id);
+                return el ? el.offsetWidth : null;
+            }
+            """,
+            Output(id_store, "data"),
+            Input(id_grafica, "id"),
+        )
+    return dcc.Store(id=id_store)
+
+
+FIGURA_COMPLETA = "completa"
+
+
+def estado_grafica(id_grafica):
+    """
+    dcc.Store "estado-<id_grafica>": el callback de la gráfica guarda
+    FIGURA_COMPLETA cuando envía la figura entera. Solo entonces se puede
+    responder con un Patch; si la carga inicial devolvió no_update (entrada
+    vacía, límite excedido) la gráfica no tiene figura que parchear.
+    """
+    return dcc.Store(id=f"estado-{id_grafica}")
+
+
+# Figuras estáticas: un solo callback (MATCH) para todas las páginas,
+# registrado al importar el módulo
+dash.clientside_callback(
+    """
+    function(url) {
+        if (!url) { return window.dash_clientside.no_update; }
+        return fetch(url).then(function(r) { return r.json(); });
+    }
+    """,
+    Output({"tipo": "figura-estatica", "nombre": MATCH}, "figure"),
+    Input({"tipo": "url-figura-estatica", "nombre": MATCH}, "data"),
+)
+
+
+def grafica_estatica(nombre, **props):
+    """
+    dcc.Graph de la figura estática `nombre` (utils.estaticos): el layout
+    solo lleva su URL con huella y el navegador descarga el JSON, que
+    queda en su caché. Se usa dentro de layouts que son funciones, para
+    que la URL se resuelva en cada visita.
+    """
+    return html.Div([
+        dcc.Graph(id={"tipo": "figura-estatica", "nombre": nombre}, **props),
+        dcc.Store(id={"tipo": "url-figura-estatica", "nombre": nombre}, data=estaticos.url(nombre)),
+    ])
+
+
+def imagen_responsiva(archivo, tamanos, **props):
+    """
+    Imagen de assets/images con variantes WebP/JPEG por ancho (utils.assets);
+    `tamanos` es el atributo sizes. Sin variantes construidas, la original.
+    """
+    variantes = assets.variantes_imagen(archivo)
+    if variantes is None:
+        return html.Img(src=f"assets/images/{archivo}", **props)
+    return html.Picture([
+        html.Source(type="image/webp", srcSet=variantes["webp"], sizes=tamanos),
+        html.Source(type="image/jpeg", srcSet=variantes["jpg"], sizes=tamanos),
+        html.Img(src=variantes["src"], **props),
+    ])
+
+
+def aviso(texto):
+    """Mensaje destacado (límites de tamaño, simulaciones reducidas); None si no hay texto."""
+    if not texto:
+        return None
+    return html.Div(f"⚠ {texto}", style={"color": "rgb(254,128,25)", "fontWeight": "bold", "marginBottom": "8px"})
@@ -0,0 +1,82 @@
+import gzip
+
+import flask
+
+# ==================================================
+# Compresión gzip / brotli de las respuestas de app.server
+# ==================================================
+# Se comprimen las respuestas de texto (HTML, CSS, JS, JSON de callbacks)
+# según el Accept-Encoding del navegador. Brotli se usa si el paquete
+# `brotli` está instalado. Las respuestas con caché larga (bundles de Dash
+# con versión, archivos de /estaticos/) son siempre iguales, así que se
+# comprimen una vez al máximo nivel y se guardan en memoria.
+
+MINIMO_BYTES = 500
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+UN_ANIO = 31536000
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_comprimidos = {}
+
+
+def _comprimir_bytes(datos, codificacion, maximo=False):
+    if codificacion == "br":
+        return brotli.compress(datos, quality=11 if maximo else NIVEL_BROTLI)
+    return gzip.compress(datos, compresslevel=9 if maximo else NIVEL_GZIP)
+
+
+def _codificacion_aceptada():
+    aceptadas = flask.request.headers.get("Accept-Encoding", "")
+    if brotli is not None and "br" in aceptadas:
+        return "br"
+    if "gzip" in aceptadas:
+        return "gzip"
+    return None
+
+
+def _es_inmutable(respuesta):
+    cache = respuesta.cache_control
+    return bool(cache.immutable) or (cache.max_age or 0) >= UN_ANIO
+
+
+def comprimir_respuesta(respuesta):
+    """after_request: comprime la respuesta si conviene."""
+    # Los archivos (send_file) llegan como direct_passthrough; otros streams no
+    if (respuesta.status_code != 200
+            or (respuesta.is_streamed and not respuesta.direct_passthrough)
+            or "Content-Encoding" in respuesta.headers
+            or not (respuesta.mimetype or "").startswith(TIPOS_COMPRIMIBLES)):
+        return respuesta
+
+    codificacion = _codificacion_aceptada()
+    if codificacion is None:
+        return respuesta
+
+    respuesta.direct_passthrough = False
+    datos = respuesta.get_data()
+    if len(datos) < MINIMO_BYTES:
+        return respuesta
+
+    if _es_inmutable(respuesta):
+        clave = (flask.request.path, codificacion, len(datos))
+        if clave not in _comprimidos:
+            _comprimidos[clave] = _comprimir_bytes(datos, codificacion, maximo=True)
+        comprimido = _comprimidos[clave]
+    else:
+        comprimido = _comprimir_bytes(datos, codificacion)
+
+    respuesta.set_data(comprimido)
+    respuesta.headers["Content-Encoding"] = codificacion
+    respuesta.vary.add("Accept-Encoding")
+    return respuesta
+
+
+def activar_compresion(server):
+    """Registra la compresión en el servidor Flask (se llama desde app.py)."""
+    server.after_request(comprimir_respuesta)
@@ -0,0 +1,20 @@
+import os
+
+# ==================================================
+# URLs base de las APIs externas
+# ==================================================
+# Cada una se puede cambiar por variable de entorno. APIS_BASE_URL apunta
+# las tres a la vez a otro servidor (p. ej. el simulador local de
+# utils/apis_simuladas.py para pruebas y benchmarks).
+
+URLS_POR_DEFECTO = {
+    "clima": ("URL_OPEN_METEO", "https://api.open-meteo.com"),
+    "covid": ("URL_DISEASE_SH", "https://disease.sh"),
+    "sunat": ("URL_SUNAT", "https://api.apis.net.pe"),
+}
+
+
+def url_base(fuente):
+    """URL base de una fuente; se lee en cada llamada para poder cambiarla en caliente."""
+    variable, defecto = URLS_POR_DEFECTO[fuente]
+    return (os.environ.get(variable) or os.environ.get("APIS_BASE_URL") or defecto).rstrip("/")
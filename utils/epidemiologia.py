@@ -0,0 +1,52 @@
+import numpy as np
+
+# ==================================================
+# Métricas epidemiológicas derivadas (vectorizadas)
+# ==================================================
+
+# Intervalo serial aproximado de COVID-19 (días), usado para estimar Rt
+INTERVALO_SERIAL = 5.0
+
+
+def serie_desde_timeline(timeline):
+    """
+    Convierte el `timeline` de disease.sh ({"cases": {...}, "deaths": {...}})
+    en un DataFrame indexado por fecha con columnas `casos` y `muertes`.
+    """
+    import pandas as pd  # perezoso: no se carga al arrancar el worker
+
+    casos = pd.Series(timeline.get("cases", {}), dtype="float64")
+    muertes = pd.Series(timeline.get("deaths", {}), dtype="float64")
+
+    df = pd.DataFrame({"casos": casos, "muertes": muertes})
+    df.index = pd.to_datetime(df.index, format="%m/%d/%y")
+    return df.sort_index()
+
+
+def calcular_metricas(df):
+    """
+    Añade al DataFrame acumulado las métricas derivadas:
+
+    - nuevos_casos / nuevas_muertes: diferencias diarias (sin negativos)
+    - casos_7d, casos_14d, muertes_7d, muertes_14d: promedios móviles
+    - crecimiento: tasa de crecimiento diaria (log) del promedio de 7 días
+    - duplicacion: tiempo de duplicación en días (solo si hay crecimiento)
+    - rt: número reproductivo efectivo aproximado, Rt = exp(r · Tserial)
+    """
+    df = df.copy()
+
+    df["nuevos_casos"] = df["casos"].diff().clip(lower=0).fillna(0)
+    df["nuevas_muertes"] = df["muertes"].diff().clip(lower=0).fillna(0)
+
+    for ventana in (7, 14):
+        df[f"casos_{ventana}d"] = df["nuevos_casos"].rolling(ventana, min_periods=1).mean()
+        df[f"muertes_{ventana}d"] = df["nuevas_muertes"].rolling(ventana, min_periods=1).mean()
+
+    log_casos = np.log(df["casos_7d"].where(df["casos_7d"] > 0))
+    r = log_casos.diff()
+
+    df["crecimiento"] = r
+    df["duplicacion"] = np.log(2) / r.where(r > 0)
+    df["rt"] = np.exp(r * INTERVALO_SERIAL)
+
+    return df
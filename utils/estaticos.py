@@ -0,0 +1,166 @@
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import flask
+from plotly.io.json import to_json_plotly
+
+try:
+    import fcntl   # solo Unix
+except ImportError:
+    fcntl = None
+
+# ==================================================
+# Archivos estáticos con huella: figuras precompiladas (pág. 1 y 2)
+# y assets (CSS e imágenes, ver utils/assets.py)
+# ==================================================
+# Las figuras que nunca cambian se escriben una vez como JSON con la huella
+# del contenido en el nombre (pag1.3f2a9c1b4d5e.json) y se sirven con caché
+# de un año: el navegador las descarga una sola vez y el layout de la
+# página ya no las incluye. Se construyen con
+#     python scripts/construir_estaticos.py
+# y, si falta alguna, la primera visita la construye y la guarda.
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "estaticos")
+MANIFIESTO = os.path.join(DIRECTORIO, "manifiesto.json")
+BLOQUEO = os.path.join(DIRECTORIO, "manifiesto.lock")
+RUTA_URL = "/estaticos/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_constructores = {}
+_manifiesto = None
+_lock = threading.Lock()
+
+
+def registrar(nombre, funcion):
+    """Registra la función que arma la figura estática `nombre`."""
+    _constructores[nombre] = funcion
+
+
+def _version(nombre):
+    """Huella del código que arma la figura: si cambia, se reconstruye."""
+    fuente = inspect.getsource(_constructores[nombre])
+    return hashlib.sha256(fuente.encode()).hexdigest()[:12]
+
+
+def _leer_manifiesto(recargar=False):
+    """Manifiesto en memoria; `recargar` lo vuelve a leer (otro proceso pudo escribirlo)."""
+    global _manifiesto
+    if _manifiesto is None or recargar:
+        try:
+            with open(MANIFIESTO, encoding="utf-8") as f:
+                _manifiesto = json.load(f)
+        except (OSError, ValueError):
+            _manifiesto = {}
+    return _manifiesto
+
+
+def entrada(nombre):
+    """Entrada del manifiesto (archivo, versión, bytes) o None."""
+    return _leer_manifiesto().get(nombre)
+
+
+def entradas(prefijo=""):
+    """Entradas del manifiesto cuyo nombre empieza con `prefijo`."""
+    return [e for nombre, e in _leer_manifiesto().items() if nombre.startswith(prefijo)]
+
+
+@contextmanager
+def _bloqueo():
+    """
+    Exclusión para leer-modificar-escribir el manifiesto: el lock del
+    proceso entre hilos y flock sobre BLOQUEO entre workers de gunicorn
+    (si dos escriben a la vez, sin esto uno pisa la entrada del otro).
+    """
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(DIRECTORIO, exist_ok=True)
+        with open(BLOQUEO, "a") as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+def guardar(nombre, contenido, extension, version=None):
+    """
+    Escribe `contenido` (bytes) como <nombre>.<huella>.<extension> y lo
+    anota en el manifiesto. También lo usan los assets (utils/assets.py).
+    """
+    base = nombre[:-len(extension) - 1] if nombre.endswith(f".{extension}") else nombre
+    archivo = f"{base}.{hashlib.sha256(contenido).hexdigest()[:12]}.{extension}"
+
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    with open(os.path.join(DIRECTORIO, archivo), "wb") as f:
+        f.write(contenido)
+
+    with _bloqueo():
+        manifiesto = _leer_manifiesto(recargar=True)
+        manifiesto[nombre] = {"archivo": archivo, "version": version, "bytes": len(contenido)}
+        temporal = f"{MANIFIESTO}.{os.getpid()}"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, indent=2)
+        os.replace(temporal, MANIFIESTO)
+        _borrar_anteriores(base, extension, archivo)
+    return manifiesto[nombre]
+
+
+def _borrar_anteriores(base, extension, actual):
+    """
+    Borra las versiones anteriores (<base>.<otra huella>.<extension>): ya no
+    están en el manifiesto, así que servir() tampoco las entregaría.
+    """
+    patron = re.compile(rf"{re.escape(base)}\.[0-9a-f]{{12}}\.{re.escape(extension)}")
+    for archivo in os.listdir(DIRECTORIO):
+        if archivo != actual and patron.fullmatch(archivo):
+            try:
+                os.remove(os.path.join(DIRECTORIO, archivo))
+            except OSError:
+                pass
+
+
+def vigente(nombre, version):
+    """True si `nombre` está en el manifiesto con esa versión y su archivo existe."""
+    actual = entrada(nombre)
+    return (actual is not None and actual.get("version") == version
+            and os.path.exists(os.path.join(DIRECTORIO, actual["archivo"])))
+
+
+def construir(nombre):
+    """Escribe el JSON de la figura `nombre` y lo anota en el manifiesto."""
+    contenido = to_json_plotly(_constructores[nombre]()).encode()
+    return guardar(nombre, contenido, "json", version=_version(nombre))
+
+
+def construir_todo():
+    return {nombre: construir(nombre) for nombre in _constructores}
+
+
+def construir_faltantes():
+    """Construye solo las figuras que faltan o cuyo código cambió."""
+    return {nombre: construir(nombre) for nombre in _constructores
+            if not vigente(nombre, _version(nombre))}
+
+
+def url(nombre):
+    """URL con huella de la figura `nombre` (la construye si falta o está vieja)."""
+    if not vigente(nombre, _version(nombre)):
+        construir(nombre)
+    return RUTA_URL + entrada(nombre)["archivo"]
+
+
+def servir(archivo):
+    """Respuesta de Flask para /estaticos/<archivo> (solo archivos del manifiesto)."""
+    if not any(e["archivo"] == archivo for e in _leer_manifiesto().values()):
+        if not any(e["archivo"] == archivo for e in _leer_manifiesto(recargar=True).values()):
+            flask.abort(404)
+    respuesta = flask.send_from_directory(DIRECTORIO, archivo, max_age=31536000)
+    respuesta.headers["Cache-Control"] = CACHE_CONTROL
+    return respuesta
@@ -0,0 +1,250 @@
+import ast
+import atexit
+import json
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils import limites, metricas
+from utils.evaluador_ayudante import ENTORNO, NUMPY_PERMITIDO, evaluar_local, malla
+
+# ==================================================
+# Evaluación aislada de las expresiones de la página 6
+# ==================================================
+# Las ecuaciones dx/dt, dy/dt las escribe el usuario. Aun sin
+# __builtins__, eval puede recibir np.ones((10**5, 10**5)) o 9**9**9 y
+# dejar sin CPU ni memoria al worker web. Por eso se evalúan en un pool de
+# procesos ayudantes (utils/evaluador_ayudante.py), cada uno con:
+#   - límite de CPU por expresión (RLIMIT_CPU: el sistema lo mata);
+#   - límite de memoria (RLIMIT_AS: una asignación enorme da MemoryError);
+#   - plazo de reloj: si no responde a tiempo, se mata y se reemplaza.
+# La malla evaluada vuelve por memoria compartida (un bloque por ayudante,
+# del tamaño de la malla máxima de utils/limites.py), sin pasar por pickle
+# ni por la tubería. Una entrada hostil cuesta un ayudante, no un worker.
+# Los ayudantes necesitan Unix (select sobre tuberías, resource); en otros
+# sistemas se evalúa en el proceso, como antes.
+
+PROCESOS = int(os.environ.get("EVALUADOR_PROCESOS", 2))
+CPU_SEGUNDOS = int(os.environ.get("EVALUADOR_CPU_SEGUNDOS", 2))
+MEMORIA_BYTES = int(float(os.environ.get("EVALUADOR_MEMORIA_MB", 1024)) * 2**20)
+PLAZO_SEGUNDOS = float(os.environ.get("EVALUADOR_PLAZO_SEGUNDOS", 3))
+TAREAS_POR_PROCESO = 500    # luego se recicla (el límite de CPU es acumulado)
+LARGO_MAXIMO = 300          # caracteres por expresión
+DISPONIBLE = os.name == "posix"
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EVALUACIONES = metricas.registrar(metricas.Contador(
+    "evaluador_expresiones_total",
+    "Expresiones de la página 6 evaluadas por resultado (ok, error, limite, ocupado).",
+))
+
+if not DISPONIBLE:
+    print("[EVALUADOR] Sin procesos aislados en este sistema; las expresiones se evalúan en el proceso")
+
+
+class ExpresionInvalida(Exception):
+    """La expresión no se pudo evaluar; el mensaje es para el usuario."""
+
+
+def validar(expresion):
+    """
+    Rechaza lo que no es una expresión aritmética sobre X, Y, los nombres de
+    ENTORNO y np.<nombre> con `nombre` en NUMPY_PERMITIDO. Cualquier otro
+    atributo (np.lib, np.ctypeslib.ctypes..., X.T, np.sin.__class__) se rechaza.
+    """
+    if not isinstance(expresion, str) or not expresion.strip():
+        raise ExpresionInvalida("Error en la expresión: está vacía.")
+    if len(expresion) > LARGO_MAXIMO:
+        raise ExpresionInvalida(f"Error en la expresión: demasiado larga (máximo {LARGO_MAXIMO} caracteres).")
+    try:
+        arbol = ast.parse(expresion, mode="eval")
+    except SyntaxError as e:
+        raise ExpresionInvalida(f"Error en la expresión: {e.msg}") from None
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Attribute) and not (
+                isinstance(nodo.value, ast.Name) and nodo.value.id == "np"
+                and nodo.attr in NUMPY_PERMITIDO):
+            raise ExpresionInvalida(f"Error en la expresión: atributo no permitido {ast.unparse(nodo)!r}")
+        if isinstance(nodo, ast.Name) and nodo.id not in ENTORNO and nodo.id not in ("X", "Y"):
+            raise ExpresionInvalida(f"Error en la expresión: nombre desconocido {nodo.id!r}")
+        if isinstance(nodo, (ast.Lambda, ast.comprehension, ast.NamedExpr)):
+            raise ExpresionInvalida("Error en la expresión: solo se permiten expresiones aritméticas.")
+
+
+# ==================================================
+# Un ayudante
+# ==================================================
+class _Caido(Exception):
+    pass
+
+
+class _Ayudante:
+    """Lado del worker web: proceso, tuberías y bloque de memoria compartida."""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.memoria = shared_memory.SharedMemory(create=True, size=2 * capacidad * 8)
+        self.datos = np.ndarray((2, capacidad), dtype=np.float64, buffer=self.memoria.buf)
+        self.proceso = subprocess.Popen(
+            [sys.executable, "-m", "utils.evaluador_ayudante", self.memoria.name, str(capacidad),
+             str(CPU_SEGUNDOS), str(MEMORIA_BYTES), str(TAREAS_POR_PROCESO)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=RAIZ, text=True,
+            # Un hilo de BLAS basta y reserva mucho menos espacio de direcciones
+            env=dict(os.environ, OPENBLAS_NUM_THREADS="1", OMP_NUM_THREADS="1", MKL_NUM_THREADS="1"),
+        )
+        self.tareas = 0
+
+    def evaluar(self, fx_str, fy_str, xmax, ymax, n):
+        self.tareas += 1
+        try:
+            self.proceso.stdin.write(json.dumps([fx_str, fy_str, xmax, ymax, n]) + "\n")
+            self.proceso.stdin.flush()
+        except OSError:
+            raise _Caido(f"código {self.proceso.poll()}") from None
+        listos, _, _ = select.select([self.proceso.stdout], [], [], PLAZO_SEGUNDOS)
+        if not listos:
+            raise _Caido("plazo")
+        linea = self.proceso.stdout.readline()
+        if not linea:
+            # Murió (SIGXCPU por tiempo de CPU, u otra señal)
+            try:
+                self.proceso.wait(1)
+            except subprocess.TimeoutExpired:
+                pass
+            raise _Caido(f"código {self.proceso.returncode}")
+        respuesta = json.loads(linea)
+        if respuesta["estado"] != "ok":
+            raise ExpresionInvalida(respuesta["mensaje"])
+        # Copia (memcpy) porque el bloque se reutiliza en la próxima tarea
+        return (self.datos[0, :n * n].reshape(n, n).copy(),
+                self.datos[1, :n * n].reshape(n, n).copy())
+
+    def cerrar(self):
+        try:
+            self.proceso.stdin.close()   # EOF: el ayudante sale solo
+            self.proceso.wait(0.5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proceso.kill()
+            self.proceso.wait()
+        self.proceso.stdout.close()
+        del self.datos
+        self.memoria.close()
+        self.memoria.unlink()
+
+
+# ==================================================
+# Pool
+# ==================================================
+class Evaluador:
+    def __init__(self, procesos=PROCESOS):
+        self.procesos = procesos
+        self._libres = None
+        self._todos = []
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._tras_fork)
+
+    def _tras_fork(self):
+        # Los ayudantes pertenecen al proceso que los creó (p. ej. el maestro)
+        self._libres = None
+        self._todos = []
+        self._lock = threading.Lock()
+
+    def _nuevo(self):
+        ayudante = _Ayudante(limites.maximo_malla() ** 2)
+        with self._lock:
+            self._todos.append(ayudante)
+        return ayudante
+
+    def _reemplazar(self, ayudante):
+        with self._lock:
+            if ayudante in self._todos:
+                self._todos.remove(ayudante)
+        ayudante.cerrar()
+        return self._nuevo()
+
+    def _iniciar(self):
+        with self._lock:
+            if self._libres is not None:
+                return
+            # LIFO: se reutiliza el ayudante más reciente (ya cargado y en caché)
+            self._libres = queue.LifoQueue()
+        for _ in range(self.procesos):
+            self._libres.put(self._nuevo())
+
+    def precalentar(self):
+        """Arranca los ayudantes y espera a que respondan (así no lo paga el primer pedido)."""
+        if not DISPONIBLE:
+            return
+        self._iniciar()
+        ayudantes = [self._libres.get() for _ in range(self.procesos)]
+        for ayudante in ayudantes:
+            try:
+                ayudante.evaluar("X", "Y", 1.0, 1.0, 2)
+            except _Caido:
+                ayudante = self._reemplazar(ayudante)
+            self._libres.put(ayudante)
+
+    def evaluar(self, fx_str, fy_str, xmax, ymax, n):
+        """
+        (fx, fy) evaluadas sobre la malla n × n en un ayudante aislado.
+        Lanza ExpresionInvalida (mensaje para el usuario) o
+        limites.LimiteExcedido si todos los ayudantes están ocupados.
+        """
+        try:
+            validar(fx_str)
+            validar(fy_str)
+            if not DISPONIBLE:
+                try:
+                    return evaluar_local(fx_str, fy_str, *malla(xmax, ymax, n))
+                except Exception as e:
+                    raise ExpresionInvalida(f"Error en la expresión: {e}") from None
+        except ExpresionInvalida:
+            EVALUACIONES.incrementar(resultado="error")
+            raise
+
+        self._iniciar()
+        try:
+            ayudante = self._libres.get(timeout=limites.PLAZO_SEGUNDOS)
+        except queue.Empty:
+            EVALUACIONES.incrementar(resultado="ocupado")
+            raise limites.LimiteExcedido("El evaluador de expresiones está ocupado; "
+                                         "intente en unos segundos.") from None
+
+        inicio = time.monotonic()
+        try:
+            resultado = ayudante.evaluar(fx_str, fy_str, float(xmax), float(ymax), int(n))
+            EVALUACIONES.incrementar(resultado="ok")
+            return resultado
+        except ExpresionInvalida:
+            EVALUACIONES.incrementar(resultado="error")
+            raise
+        except _Caido as e:
+            EVALUACIONES.incrementar(resultado="limite")
+            print(f"[EVALUADOR] Ayudante detenido ({e}) tras {time.monotonic() - inicio:.1f} s: "
+                  f"{fx_str!r}, {fy_str!r}")
+            ayudante = self._reemplazar(ayudante)
+            raise ExpresionInvalida("La expresión superó los límites de tiempo o memoria "
+                                    "y fue detenida.") from None
+        finally:
+            if ayudante.tareas >= TAREAS_POR_PROCESO:
+                ayudante = self._reemplazar(ayudante)
+            self._libres.put(ayudante)
+
+    def cerrar(self):
+        with self._lock:
+            todos, self._todos = self._todos, []
+            self._libres = None
+        for ayudante in todos:
+            ayudante.cerrar()
+
+
+evaluador = Evaluador()
+atexit.register(evaluador.cerrar)
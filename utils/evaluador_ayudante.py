@@ -0,0 +1,113 @@
+import json
+import math
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+# ==================================================
+# Proceso ayudante de utils/evaluador.py
+# ==================================================
+# python -m utils.evaluador_ayudante <memoria> <capacidad> <cpu_s> <memoria_bytes> <tareas>
+# Lee una tarea JSON por línea en stdin ([fx, fy, xmax, ymax, n]), escribe
+# fx y fy en el bloque de memoria compartida y responde una línea JSON en
+# stdout ({"estado": "ok" | "error" | "limite", "mensaje": ...}).
+# Solo importa NumPy: arranca rápido y no carga Dash ni la app.
+
+# Lo único de NumPy que se puede usar como np.<nombre>. La expresión no
+# recibe el módulo: np.load, np.lib, np.ctypeslib, etc. no existen para ella
+NUMPY_PERMITIDO = (
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2", "hypot",
+    "sinh", "cosh", "tanh", "arcsinh", "arccosh", "arctanh",
+    "exp", "expm1", "log", "log1p", "log2", "log10",
+    "sqrt", "cbrt", "square", "power", "abs", "absolute", "sign",
+    "floor", "ceil", "round", "mod", "minimum", "maximum",
+    "pi", "e",
+)
+
+# Lo único visible para la expresión (además de X e Y)
+ENTORNO = {
+    'np': SimpleNamespace(**{nombre: getattr(np, nombre) for nombre in NUMPY_PERMITIDO}),
+    'sin': np.sin, 'cos': np.cos,
+    'tan': np.tan, 'exp': np.exp,
+    'sqrt': np.sqrt,
+    'pi': np.pi, 'e': np.e,
+}
+
+
+def malla(xmax, ymax, n):
+    x = np.linspace(-xmax, xmax, n)
+    y = np.linspace(-ymax, ymax, n)
+    return np.meshgrid(x, y)
+
+
+def evaluar_local(fx_str, fy_str, X, Y):
+    """Evalúa ambas expresiones sobre la malla (en el proceso actual)."""
+    entorno = dict(ENTORNO, X=X, Y=Y)
+    fx = eval(fx_str, {"__builtins__": {}}, entorno)
+    fy = eval(fy_str, {"__builtins__": {}}, entorno)
+    return (np.broadcast_to(np.asarray(fx, dtype=float), X.shape),
+            np.broadcast_to(np.asarray(fy, dtype=float), Y.shape))
+
+
+# ==================================================
+# Límites del proceso
+# ==================================================
+def limitar_recursos(cpu_segundos, memoria_bytes, tareas):
+    import resource   # solo Unix
+
+    # Memoria: una asignación enorme falla con MemoryError
+    resource.setrlimit(resource.RLIMIT_AS, (memoria_bytes, memoria_bytes))
+    # CPU: el límite es acumulado por proceso; el duro cubre toda su vida
+    # (el worker lo recicla tras `tareas`) y el blando se corre por tarea
+    total = cpu_segundos * (tareas + 2)
+    resource.setrlimit(resource.RLIMIT_CPU, (total, total))
+
+
+def cpu_para_tarea(cpu_segundos):
+    """Límite blando = CPU usada hasta ahora + cpu_segundos (al pasarlo: SIGXCPU)."""
+    import resource
+
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    duro = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    blando = min(math.ceil(uso.ru_utime + uso.ru_stime) + cpu_segundos, duro)
+    resource.setrlimit(resource.RLIMIT_CPU, (blando, duro))
+
+
+def _responder(estado, mensaje=None):
+    sys.stdout.write(json.dumps({"estado": estado, "mensaje": mensaje}) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv):
+    nombre, capacidad, cpu_segundos, memoria_bytes, tareas = argv
+    capacidad, cpu_segundos = int(capacidad), int(cpu_segundos)
+
+    memoria = shared_memory.SharedMemory(name=nombre)
+    # El bloque es del worker web (lo crea y lo borra él): que el
+    # resource_tracker de este proceso no lo borre si muere
+    resource_tracker.unregister(memoria._name, "shared_memory")
+    salida = np.ndarray((2, capacidad), dtype=np.float64, buffer=memoria.buf)
+
+    limitar_recursos(cpu_segundos, int(memoria_bytes), int(tareas))
+
+    for linea in sys.stdin:
+        fx_str, fy_str, xmax, ymax, n = json.loads(linea)
+        cpu_para_tarea(cpu_segundos)
+        try:
+            fx, fy = evaluar_local(fx_str, fy_str, *malla(xmax, ymax, n))
+            salida[0, :n * n] = fx.ravel()
+            salida[1, :n * n] = fy.ravel()
+            _responder("ok")
+        except MemoryError:
+            _responder("limite", "La expresión necesita demasiada memoria.")
+        except Exception as e:
+            _responder("error", f"Error en la expresión: {e}")
+
+    del salida
+    memoria.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
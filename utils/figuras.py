@@ -0,0 +1,184 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+from _plotly_utils.utils import to_typed_array_spec
+from dash import Patch
+
+from utils import tema
+from utils.metricas import medir_fase
+
+# ==================================================
+# Utilidades para construir / actualizar figuras
+# ==================================================
+
+# Variantes de layout sobre la plantilla Gruvbox
+_ejes_marcados = dict(gridwidth=1, zeroline=True, zerolinewidth=2,
+                      zerolinecolor=tema.VERDE_LIMA, showline=True, linewidth=2)
+_encabezado = dict(title=tema.TITULO, legend=tema.LEYENDA)
+
+BASES = {
+    # Series y simulaciones (pág. 4, 5, 7, Proyecto 2.1)
+    "serie": _encabezado,
+    # Solo colores y ejes, título y leyenda como los pone plotly (pág. 8, 9)
+    "sencilla": {},
+    # Curvas con ejes cartesianos resaltados (pág. 1, 2, 3)
+    "ejes": dict(_encabezado, xaxis=_ejes_marcados, yaxis=_ejes_marcados),
+    # Campo vectorial con ejes iguales (pág. 6)
+    "campo": dict(
+        _encabezado,
+        xaxis=dict(zeroline=True, zerolinecolor=tema.DORADO, zerolinewidth=2, mirror=False),
+        yaxis=dict(zeroline=True, zerolinecolor=tema.DORADO, zerolinewidth=2, mirror=False,
+                   scaleanchor="x", scaleratio=1),
+        font=dict(size=13),
+    ),
+}
+
+
+# Trazas scatter con más puntos que esto se dibujan con WebGL (scattergl).
+# Se puede cambiar con la variable de entorno FIGURAS_UMBRAL_WEBGL.
+UMBRAL_WEBGL = int(os.environ.get("FIGURAS_UMBRAL_WEBGL", 2000))
+
+
+@lru_cache(maxsize=None)
+def _layout_base(nombre):
+    """Layout validado una sola vez por variante y reutilizado en cada figura."""
+    tema.registrar_plantilla()
+    return go.Layout(template="gruvbox", **BASES[nombre])
+
+
+@medir_fase("figura")
+def figura_base(nombre="serie", **layout):
+    """
+    Figura vacía con el tema Gruvbox y la variante `nombre` de BASES.
+    Los callbacks solo agregan trazas y lo propio de su gráfica
+    (título, nombres de ejes, anotaciones).
+    """
+    fig = go.Figure(layout=_layout_base(nombre))
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+# ==================================================
+# Figuras crudas (dicts) para los callbacks más frecuentes
+# ==================================================
+# go.Figure / go.Scatter validan cada propiedad en cada llamada. Las
+# páginas interactivas (3, 4, 5, 6) arman la figura como dict plano
+# con el mismo contenido; scripts/verificar_figuras.py comprueba que
+# coincide con la versión validada.
+
+@lru_cache(maxsize=None)
+def _layout_base_crudo(nombre):
+    """Layout base como dict (la plantilla incluida), calculado una vez."""
+    return _layout_base(nombre).to_plotly_json()
+
+
+def _desplegar(cambios):
+    """
+    Aplica la notación con guion bajo de plotly (xaxis_title -> xaxis.title)
+    y convierte los títulos de texto en {"text": ...}.
+    """
+    salida = {}
+    for clave, valor in cambios.items():
+        *ruta, ultima = clave.split("_")
+        if isinstance(valor, dict):
+            valor = _desplegar(valor)
+        elif ultima == "title" and isinstance(valor, str):
+            valor = {"text": valor}
+        destino = salida
+        for parte in ruta:
+            destino = destino.setdefault(parte, {})
+        if isinstance(valor, dict) and isinstance(destino.get(ultima), dict):
+            valor = _fusionar(destino[ultima], valor)
+        destino[ultima] = valor
+    return salida
+
+
+def _fusionar(base, cambios):
+    """Copia de `base` con `cambios` aplicados (sin modificar `base`)."""
+    resultado = dict(base)
+    for clave, valor in cambios.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            valor = _fusionar(resultado[clave], valor)
+        resultado[clave] = valor
+    return resultado
+
+
+@medir_fase("figura")
+def figura_cruda(nombre="serie", **layout):
+    """
+    Equivalente a figura_base() como dict, sin validación. Las trazas se
+    agregan a fig["data"] con traza(); shapes y anotaciones van como
+    listas de dicts en el layout.
+    """
+    return {"data": [], "layout": _fusionar(_layout_base_crudo(nombre), _desplegar(layout))}
+
+
+@medir_fase("figura")
+def traza(tipo="scatter", **propiedades):
+    """
+    Traza como dict (equivale a go.Scatter(...) para tipo='scatter').
+    Pasa a scattergl sola si supera UMBRAL_WEBGL puntos.
+    """
+    return a_webgl({"type": tipo, **propiedades})
+
+
+# ==================================================
+# WebGL automático para series grandes
+# ==================================================
+def _num_puntos(traza):
+    return max((len(traza[eje]) for eje in ("x", "y")
+                if hasattr(traza.get(eje), "__len__") and not isinstance(traza[eje], (str, dict))),
+               default=0)
+
+
+def _tipo_traza(num_puntos, linea=None):
+    """scattergl por encima del umbral (salvo curvas spline, que WebGL no dibuja)."""
+    if num_puntos > UMBRAL_WEBGL and (linea or {}).get("shape") != "spline":
+        return "scattergl"
+    return "scatter"
+
+
+def a_webgl(traza):
+    """
+    Copia de la traza (dict) como scattergl si es un scatter grande; si no,
+    la misma traza. El estilo (línea, marcadores, relleno, hover) se
+    conserva: scattergl acepta las mismas propiedades que usa la app.
+    También se aplica al serializar las figuras hechas con go.Figure.
+    """
+    if traza.get("type", "scatter") != "scatter":
+        return traza
+    tipo = _tipo_traza(_num_puntos(traza), traza.get("line"))
+    return traza if tipo == "scatter" else {**traza, "type": tipo}
+
+
+def validar_figura(figura):
+    """Pasa la figura cruda por los validadores de plotly (go.Figure)."""
+    return go.Figure(figura)
+
+
+@medir_fase("figura")
+def parche_trazas(series, patch=None):
+    """
+    Patch que solo reemplaza x/y (y el tipo) de las trazas: `series` es [(x, y), ...]
+    en el mismo orden que `fig.data`. El layout no se vuelve a enviar.
+    """
+    patch = Patch() if patch is None else patch
+    for i, (x, y) in enumerate(series):
+        patch["data"][i]["x"] = _compacto(x)
+        patch["data"][i]["y"] = _compacto(y)
+        # El tipo acompaña al tamaño (scatter <-> scattergl)
+        patch["data"][i]["type"] = _tipo_traza(len(x))
+    return patch
+
+
+def _compacto(valores):
+    """
+    Los arrays de NumPy dentro de un Patch se serializarían como listas JSON;
+    se codifican como typed arrays base64 igual que en una figura completa.
+    """
+    if isinstance(valores, np.ndarray):
+        return to_typed_array_spec(valores)
+    return valores
@@ -0,0 +1,141 @@
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from utils import metricas
+from utils.circuito import CERRADO, CircuitoAbierto, circuito_para, estado_circuitos
+
+# ==================================================
+# Métricas de las peticiones salientes (por host y endpoint)
+# ==================================================
+# Cada llamada registra su duración, bytes, código HTTP, reintentos y
+# resultado (ok, http_4xx, http_5xx, timeout, error_red, json_invalido,
+# circuito_abierto). Se exportan en /metrics junto a las de los callbacks:
+# comparando dash_callback_duracion_segundos con estas se distingue "la
+# API está lenta" de "nuestro código está lento".
+
+DURACION = metricas.registrar(metricas.Histograma(
+    "http_saliente_duracion_segundos",
+    "Duración de las peticiones a APIs externas (incluye reintentos).",
+    metricas.BUCKETS_SEGUNDOS,
+))
+RESPUESTA_BYTES = metricas.registrar(metricas.Histograma(
+    "http_saliente_respuesta_bytes",
+    "Tamaño del cuerpo de las respuestas de APIs externas.",
+    metricas.BUCKETS_BYTES,
+))
+LLAMADAS = metricas.registrar(metricas.Contador(
+    "http_saliente_llamadas_total",
+    "Peticiones a APIs externas por host, endpoint, código HTTP y resultado.",
+))
+REINTENTOS = metricas.registrar(metricas.Contador(
+    "http_saliente_reintentos_total",
+    "Reintentos de peticiones a APIs externas.",
+))
+metricas.registrar(metricas.Medidor(
+    "http_saliente_circuito_abierto",
+    "1 si el circuit breaker del host no está cerrado (abierto o semiabierto).",
+    lambda: [({"host": h}, int(e["estado"] != CERRADO)) for h, e in estado_circuitos().items()],
+))
+
+# Últimas peticiones (panel /admin/rendimiento): (marca, host, endpoint, s, resultado)
+RECIENTES = deque(maxlen=metricas.TAMANO_RECIENTES)
+
+# Errores de red o 5xx se reintentan (GET es idempotente); los timeouts no,
+# porque duplicarían la espera
+REINTENTOS_POR_DEFECTO = 1
+ESPERA_REINTENTO = 0.2
+
+
+def _resultado_error(error):
+    import requests
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return f"http_{error.response.status_code // 100}xx"
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.RequestException):
+        return "error_red"
+    if isinstance(error, ValueError):
+        return "json_invalido"
+    return "error"
+
+
+def _falla_del_host(error):
+    """
+    Solo timeouts, errores de conexión y 5xx cuentan como fallo para el
+    circuit breaker: un 4xx (p. ej. un país inválido en la pág. 8) o un JSON
+    inválido son culpa del pedido, no de un host caído.
+    """
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+
+def _reintentable(error):
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, requests.ConnectionError)
+
+
+# ==================================================
+# Peticiones salientes protegidas por circuit breaker
+# ==================================================
+def obtener_json(url, params=None, timeout=10, endpoint=None, reintentos=REINTENTOS_POR_DEFECTO):
+    """
+    GET que devuelve el JSON de la respuesta. Si el circuito del host está
+    abierto lanza CircuitoAbierto sin esperar el timeout, para que la página
+    use de inmediato los datos en caché o el fallback.
+
+    `endpoint` es la etiqueta de las métricas; conviene pasar la plantilla
+    ("/v3/covid-19/countries/{pais}") para no crear una serie por país.
+    """
+    import requests  # perezoso: solo las páginas con APIs lo necesitan
+
+    partes = urlsplit(url)
+    etiquetas = {"host": partes.netloc, "endpoint": endpoint or partes.path or "/"}
+    circuito = circuito_para(partes.netloc)
+
+    inicio = time.perf_counter()
+    estado, intento = "-", 0
+    try:
+        while True:
+            if not circuito.permitir():
+                raise CircuitoAbierto(f"Circuito abierto para {circuito.host}")
+            inicio_intento = time.perf_counter()
+            try:
+                resp = requests.get(url, params=params, timeout=timeout)
+                estado = str(resp.status_code)
+                resp.raise_for_status()
+                datos = resp.json()
+            except Exception as e:
+                circuito.registrar(not _falla_del_host(e), time.perf_counter() - inicio_intento)
+                if intento < reintentos and _reintentable(e):
+                    intento += 1
+                    REINTENTOS.incrementar(**etiquetas)
+                    time.sleep(ESPERA_REINTENTO * intento)
+                    continue
+                raise
+            circuito.registrar(True, time.perf_counter() - inicio_intento)
+            break
+    except Exception as e:
+        resultado = "circuito_abierto" if isinstance(e, CircuitoAbierto) else _resultado_error(e)
+        _registrar(etiquetas, estado, resultado, inicio)
+        print(f"[HTTP] GET {etiquetas['host']}{etiquetas['endpoint']} -> {resultado} "
+              f"(estado {estado}, {intento} reintentos): {e}")
+        raise
+
+    _registrar(etiquetas, estado, "ok", inicio)
+    RESPUESTA_BYTES.observar(len(resp.content), **etiquetas)
+    return datos
+
+
+def _registrar(etiquetas, estado, resultado, inicio):
+    duracion = time.perf_counter() - inicio
+    DURACION.observar(duracion, resultado=resultado, **etiquetas)
+    LLAMADAS.incrementar(estado=estado, resultado=resultado, **etiquetas)
+    RECIENTES.append((time.time(), etiquetas["host"], etiquetas["endpoint"], duracion, resultado))
@@ -0,0 +1,209 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TiempoAgotado
+
+from utils import metricas
+
+# ==================================================
+# Guardas de costo para tamaños elegidos por el usuario
+# ==================================================
+# tmax (pág. 4 y 5) y n (pág. 6) vienen directo de un dcc.Input: un 10⁸
+# significaría minutos de bucle en Python y GB de memoria en un worker.
+# Antes de simular se estima el costo con lo medido en
+# scripts/benchmark_callbacks.py y se decide:
+#   - directo:   cabe en INTERACTIVO_SEGUNDOS, se calcula en el callback;
+#   - reducido:  se usa un paso más grueso (varios días por iteración) si
+#                el esquema sigue siendo estable (paso · tasa ≤ ESTABILIDAD);
+#   - fondo:     se calcula en un hilo aparte (HILOS_FONDO por proceso) y el
+#                callback espera hasta PLAZO_SEGUNDOS; si no terminó, avisa
+#                y el resultado queda en la caché de memoizar para el
+#                siguiente intento;
+#   - rechazo:   LimiteExcedido con un mensaje para el usuario.
+# Todo cálculo corre además con un plazo: los bucles llaman a verificar()
+# cada BLOQUE pasos y se cortan con PlazoExcedido si se pasa.
+
+INTERACTIVO_SEGUNDOS = float(os.environ.get("LIMITES_INTERACTIVO_SEGUNDOS", 0.25))
+PLAZO_SEGUNDOS = float(os.environ.get("LIMITES_PLAZO_SEGUNDOS", 5))
+FONDO_SEGUNDOS = float(os.environ.get("LIMITES_FONDO_SEGUNDOS", 20))
+MAXIMO_BYTES = int(float(os.environ.get("LIMITES_MAXIMO_MB", 256)) * 2**20)
+MAXIMO_RESPUESTA_BYTES = int(float(os.environ.get("LIMITES_RESPUESTA_MB", 4)) * 2**20)
+HILOS_FONDO = 1
+MAXIMO_EN_FONDO = 4     # simulaciones grandes en curso o en cola por proceso
+ESTABILIDAD = 0.5       # máximo de paso · tasa para el esquema de Euler
+BLOQUE = 4096           # pasos entre verificaciones del plazo
+
+# Costo por paso (bucle) o por punto (malla), medido con
+# scripts/benchmark_callbacks.py y redondeado hacia arriba
+COSTOS = {
+    "sir": {"segundos": 2.5e-6, "bytes": 4 * 8},        # t, S, I, R
+    "seir": {"segundos": 4.5e-6, "bytes": 5 * 8},       # t, S, E, I, R
+    "campo": {"segundos": 2e-7, "bytes": 130},          # bytes de respuesta por vector
+}
+
+DECISIONES = metricas.registrar(metricas.Contador(
+    "limites_decisiones_total",
+    "Decisiones de las guardas de costo por modelo (directo, reducido, fondo, rechazo, plazo).",
+))
+
+
+class LimiteExcedido(Exception):
+    """El pedido es demasiado grande; el mensaje es para el usuario."""
+
+
+class PlazoExcedido(LimiteExcedido):
+    pass
+
+
+class EnCurso(LimiteExcedido):
+    """La simulación sigue calculándose en segundo plano."""
+
+
+# ==================================================
+# Plazos
+# ==================================================
+_local = threading.local()
+
+
+def verificar():
+    """Lanza PlazoExcedido si el cálculo en curso pasó su plazo."""
+    limite = getattr(_local, "limite", None)
+    if limite is not None and time.monotonic() > limite:
+        raise PlazoExcedido("La simulación superó el tiempo máximo por pedido; reduzca el tamaño.")
+
+
+def _con_plazo(segundos, funcion, args):
+    anterior = getattr(_local, "limite", None)
+    _local.limite = time.monotonic() + segundos
+    try:
+        return funcion(*args)
+    finally:
+        _local.limite = anterior
+
+
+# ==================================================
+# Estimación y plan
+# ==================================================
+class Plan:
+    def __init__(self, modelo, accion, paso, pasos):
+        self.modelo = modelo
+        self.accion = accion
+        self.paso = paso
+        self.segundos = pasos * COSTOS[modelo]["segundos"]
+        self.bytes = pasos * COSTOS[modelo]["bytes"]
+
+    @property
+    def aviso(self):
+        """Texto para el usuario si el resultado no es el pedido tal cual (o "")."""
+        if self.paso > 1:
+            return (f"Simulación reducida: un paso cada {self.paso} días "
+                    f"(con paso diario tardaría ≈ {self.segundos * self.paso:.0f} s).")
+        return ""
+
+
+def planificar(modelo, tmax, tasas):
+    """
+    Plan para simular `tmax` días con las `tasas` del modelo (β, γ, σ…).
+    Lanza LimiteExcedido si no hay forma razonable de hacerlo.
+    """
+    if tmax < 2:
+        raise LimiteExcedido("El tiempo de simulación debe ser de al menos 2 días.")
+    costo = COSTOS[modelo]
+    tasa = max((abs(t) for t in tasas), default=0.0)
+    # Paso más grueso que mantiene estable el esquema discreto
+    paso_estable = max(1, int(ESTABILIDAD / tasa)) if tasa > 0 else tmax
+
+    def cabe(paso, segundos):
+        pasos = tmax / paso
+        return pasos * costo["segundos"] <= segundos and pasos * costo["bytes"] <= MAXIMO_BYTES
+
+    if cabe(1, INTERACTIVO_SEGUNDOS):
+        plan = Plan(modelo, "directo", 1, tmax)
+    else:
+        paso = math.ceil(tmax * costo["segundos"] / INTERACTIVO_SEGUNDOS)
+        paso = max(paso, math.ceil(tmax * costo["bytes"] / MAXIMO_BYTES))
+        if paso <= paso_estable:
+            plan = Plan(modelo, "reducido", paso, tmax // paso)
+        elif cabe(1, FONDO_SEGUNDOS):
+            plan = Plan(modelo, "fondo", 1, tmax)
+        elif cabe(paso_estable, FONDO_SEGUNDOS):
+            plan = Plan(modelo, "fondo", paso_estable, tmax // paso_estable)
+        else:
+            DECISIONES.incrementar(modelo=modelo, decision="rechazo")
+            maximo = round(min(FONDO_SEGUNDOS / costo["segundos"], MAXIMO_BYTES / costo["bytes"]) * paso_estable)
+            raise LimiteExcedido(
+                f"Simular {tmax:,} días tomaría ≈ {tmax * costo['segundos']:.0f} s y "
+                f"{tmax * costo['bytes'] / 2**20:,.0f} MB. Con estos parámetros el máximo es ≈ {maximo:,} días."
+            )
+    DECISIONES.incrementar(modelo=modelo, decision=plan.accion)
+    return plan
+
+
+def maximo_malla():
+    """Mayor n tal que la respuesta de una malla n × n cabe en MAXIMO_RESPUESTA_BYTES."""
+    return int(math.sqrt(MAXIMO_RESPUESTA_BYTES / COSTOS["campo"]["bytes"]))
+
+
+def limitar_malla(n):
+    """
+    Resolución efectiva (n, aviso) de una malla n × n para que la respuesta
+    no pase MAXIMO_RESPUESTA_BYTES. Lanza LimiteExcedido si n no es válido.
+    """
+    if n is None or n < 2:
+        raise LimiteExcedido("La resolución de la malla debe ser al menos 2.")
+    maximo = maximo_malla()
+    if n <= maximo:
+        DECISIONES.incrementar(modelo="campo", decision="directo")
+        return int(n), ""
+    DECISIONES.incrementar(modelo="campo", decision="reducido")
+    return maximo, f"Malla reducida de {int(n)} × {int(n)} a {maximo} × {maximo} vectores."
+
+
+# ==================================================
+# Ejecución
+# ==================================================
+_pool = ThreadPoolExecutor(max_workers=HILOS_FONDO, thread_name_prefix="limites")
+_en_fondo = {}
+_lock = threading.Lock()
+
+
+def _tras_fork():
+    global _pool, _lock
+    _pool = ThreadPoolExecutor(max_workers=HILOS_FONDO, thread_name_prefix="limites")
+    _lock = threading.Lock()
+    _en_fondo.clear()
+
+
+os.register_at_fork(after_in_child=_tras_fork)
+
+
+def ejecutar(plan, funcion, *args):
+    """
+    Llama funcion(*args) según el plan, con plazo. En modo "fondo" los
+    pedidos iguales comparten el mismo cálculo y, si no termina dentro de
+    PLAZO_SEGUNDOS, se lanza EnCurso (el cálculo sigue y su resultado queda
+    memoizado).
+    """
+    try:
+        if plan.accion != "fondo":
+            return _con_plazo(PLAZO_SEGUNDOS, funcion, args)
+
+        llave = (funcion.__module__, funcion.__qualname__, args)
+        with _lock:
+            futuro = _en_fondo.get(llave)
+            if futuro is None:
+                if len(_en_fondo) >= MAXIMO_EN_FONDO:
+                    raise LimiteExcedido("El servidor está ocupado con otras simulaciones grandes; "
+                                         "intente en unos segundos.")
+                futuro = _pool.submit(_con_plazo, 2 * FONDO_SEGUNDOS, funcion, args)
+                _en_fondo[llave] = futuro
+                futuro.add_done_callback(lambda _: _en_fondo.pop(llave, None))
+        try:
+            return futuro.result(timeout=PLAZO_SEGUNDOS)
+        except TiempoAgotado:
+            raise EnCurso(f"Simulación grande (≈ {plan.segundos:.0f} s) calculándose en segundo plano; "
+                          "vuelva a intentarlo en unos segundos.") from None
+    except PlazoExcedido:
+        DECISIONES.incrementar(modelo=plan.modelo, decision="plazo")
+        raise
@@ -0,0 +1,123 @@
+import hashlib
+import importlib.util
+import re
+import textwrap
+from functools import lru_cache
+from io import BytesIO
+
+from dash import dcc, html
+
+from utils import estaticos
+
+# ==================================================
+# Fórmulas LaTeX pre-renderizadas como SVG
+# ==================================================
+# Cada fórmula se convierte una sola vez a SVG con matplotlib (mathtext) y
+# se publica en estaticos/ con huella y caché inmutable. Así no hace falta
+# MathJax en el navegador ni servicios externos (latex.codecogs.com).
+# matplotlib es opcional: sin él, o si mathtext no entiende una fórmula,
+# el texto se deja con MathJax como antes.
+
+HAY_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
+
+# Color del texto de las páginas (--text-main en assets/css/base.css)
+COLOR_TEXTO = "rgb(235,219,178)"
+
+TAMANO_TEXTO = 12      # pt (~16 px), fórmulas dentro del texto
+TAMANO_BLOQUE = 14     # pt, fórmulas en su propia línea ($$ ... $$)
+
+# Comandos de LaTeX que mathtext no conoce y su equivalente
+SUSTITUCIONES = {r"\tfrac": r"\frac"}
+
+# $$...$$, \[...\] (bloque) y $...$, \(...\) (en línea)
+_FORMULA = re.compile(r"\$\$(.+?)\$\$|\\\[(.+?)\\\]|\$(.+?)\$|\\\((.+?)\\\)", re.S)
+
+
+class FormulaNoSoportada(ValueError):
+    """mathtext no puede dibujar la fórmula (o matplotlib no está instalado)."""
+
+
+def _color_hex(color):
+    """'rgb(r,g,b)' (formato de la app) -> '#rrggbb' (formato de matplotlib)."""
+    m = re.fullmatch(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)", color.strip())
+    return "#{:02x}{:02x}{:02x}".format(*map(int, m.groups())) if m else color
+
+
+def _renderizar(expresion, tamano, color):
+    """SVG de la fórmula (bytes). matplotlib se importa solo aquí."""
+    from matplotlib import mathtext, rc_context
+    from matplotlib.font_manager import FontProperties
+
+    for comando, equivalente in SUSTITUCIONES.items():
+        expresion = expresion.replace(comando, equivalente)
+    buffer = BytesIO()
+    with rc_context({"mathtext.fontset": "cm", "svg.fonttype": "path", "svg.hashsalt": "formula"}):
+        mathtext.math_to_image(f"${expresion}$", buffer, prop=FontProperties(size=tamano),
+                               format="svg", color=_color_hex(color))
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def url_formula(expresion, tamano=TAMANO_TEXTO, color=COLOR_TEXTO):
+    """URL con huella del SVG de la fórmula; lo genera la primera vez."""
+    expresion = " ".join(expresion.split())
+    version = hashlib.sha256(f"{expresion}|{tamano}|{color}".encode()).hexdigest()[:12]
+    nombre = f"formula-{version}"
+    if not estaticos.vigente(nombre, version):
+        if not HAY_MATPLOTLIB:
+            raise FormulaNoSoportada("matplotlib no está instalado")
+        try:
+            svg = _renderizar(expresion, tamano, color)
+        except ValueError as e:  # ParseFatalException de mathtext
+            raise FormulaNoSoportada(str(e)) from e
+        estaticos.guardar(nombre, svg, "svg", version=version)
+    return estaticos.RUTA_URL + estaticos.entrada(nombre)["archivo"]
+
+
+@lru_cache(maxsize=None)
+def _markdown_con_svg(texto, color):
+    """Markdown con cada fórmula reemplazada por su imagen SVG."""
+    def imagen(m):
+        bloque = m.group(1) or m.group(2)
+        expresion = bloque or m.group(3) or m.group(4)
+        url = url_formula(expresion, TAMANO_BLOQUE if bloque else TAMANO_TEXTO, color)
+        # Texto alternativo: el LaTeX con los caracteres de Markdown escapados
+        alt = re.sub(r"([\\`*_{}\[\]()#+\-.!|<>])", r"\\\1", " ".join(expresion.split()))
+        return f"\n\n![{alt}]({url})\n\n" if bloque else f"![{alt}]({url})"
+    # Se quita la sangría común antes de insertar líneas nuevas (como dedent de dcc.Markdown)
+    return _FORMULA.sub(imagen, textwrap.dedent(texto))
+
+
+def markdown_matematico(texto, color=COLOR_TEXTO, className=None, **props):
+    """
+    dcc.Markdown con fórmulas LaTeX pre-renderizadas. Reemplaza a
+    dcc.Markdown(texto, mathjax=True); si alguna fórmula no se puede
+    dibujar, ese bloque sigue usando MathJax.
+    """
+    clases = " ".join(c for c in ("markdown-matematico", className) if c)
+    try:
+        return dcc.Markdown(_markdown_con_svg(texto, color), className=clases, **props)
+    except FormulaNoSoportada:
+        return dcc.Markdown(texto, mathjax=True, className=className, **props)
+
+
+def formula(expresion, color=COLOR_TEXTO, tamano=TAMANO_BLOQUE, **props):
+    """html.Img con una fórmula suelta; sin matplotlib, MathJax en bloque."""
+    try:
+        return html.Img(src=url_formula(expresion, tamano, color), alt=expresion, **props)
+    except FormulaNoSoportada:
+        return dcc.Markdown(f"$$\n{expresion}\n$$", mathjax=True, style=props.get("style"))
+
+
+def construir_formulas():
+    """
+    Genera los SVG que falten armando el layout de cada página (las
+    fórmulas se dibujan al armarlo). Lo usan scripts/construir_estaticos.py
+    y el maestro de gunicorn, así los workers no tienen que escribirlas.
+    """
+    import dash
+
+    for pagina in dash.page_registry.values():
+        if callable(pagina["layout"]):
+            pagina["layout"]()
+    return estaticos.entradas("formula-")
@@ -0,0 +1,266 @@
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from utils import metricas
+
+# ==================================================
+# Presupuesto global de memoria de las cachés en proceso
+# ==================================================
+# Cada caché en memoria (CacheTTL de utils/cache.py, las entradas de
+# utils/refresco.py) anota aquí cuántos bytes ocupa cada entrada y cuánto
+# costó calcularla. Si la suma de todas pasa PRESUPUESTO_BYTES:
+#   1. las entradas frías (sin uso hace FRIO_SEGUNDOS) se comprimen, si la
+#      caché lo admite (zlib, y con CACHE_FRIO=float32 también a float32);
+#   2. si no alcanza, se desalojan las de menor valor, sin importar la
+#      caché: GreedyDual-Size, prioridad = L + costo / tamaño, donde L sube
+#      con cada desalojo (lo que no se usa envejece).
+# Con varios workers cada proceso tiene su propio presupuesto.
+
+PRESUPUESTO_BYTES = int(float(os.environ.get("CACHE_MEMORIA_MB", 256)) * 2**20)
+OBJETIVO = 0.9                 # tras ajustar se baja a este fragmento del presupuesto
+FRIO_SEGUNDOS = float(os.environ.get("CACHE_FRIO_SEGUNDOS", 120))
+MODO_FRIO = os.environ.get("CACHE_FRIO", "zlib").lower()   # "zlib", "float32" o "no"
+MINIMO_COMPRIMIR = 16 * 1024   # bytes; lo más chico no vale la pena
+COSTO_DESCONOCIDO = 1e-3       # s, para entradas sin costo medido
+
+MEMORIA = metricas.registrar(metricas.Medidor(
+    "cache_memoria_bytes",
+    "Bytes ocupados por cada caché en memoria del proceso.",
+    lambda: [({"cache": c}, b) for c, b in presupuesto.uso_por_cache().items()],
+))
+DESALOJOS = metricas.registrar(metricas.Contador(
+    "cache_desalojos_total",
+    "Entradas desalojadas o comprimidas por el presupuesto de memoria.",
+))
+
+
+# ==================================================
+# Tamaño y arreglos de solo lectura
+# ==================================================
+def tamano_bytes(valor, vistos=None):
+    """
+    Bytes que ocupa `valor`. Los arreglos de NumPy cuentan sus datos
+    (nbytes) exactos, los DataFrame, Series e Index de pandas su memory_usage;
+    tuplas, listas y dicts se recorren; un mismo objeto se cuenta una vez.
+    """
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if isinstance(valor, np.ndarray):
+        # Una vista (p. ej. las filas de sol.T, o lo que devuelve pickle)
+        # mantiene viva toda la memoria de su arreglo raíz: se cuenta esa,
+        # una sola vez aunque haya varias vistas
+        encabezado = sys.getsizeof(valor) - (valor.nbytes if valor.flags.owndata else 0)
+        raiz = valor
+        while isinstance(raiz.base, np.ndarray):
+            raiz = raiz.base
+        if raiz is not valor:
+            if id(raiz) in vistos:
+                return encabezado
+            vistos.add(id(raiz))
+        return encabezado + raiz.nbytes
+    if isinstance(valor, Comprimido):
+        return sys.getsizeof(valor.datos)
+    if isinstance(valor, (tuple, list, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v, vistos) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamano_bytes(k, vistos) + tamano_bytes(v, vistos) for k, v in valor.items()
+        )
+    pd = sys.modules.get("pandas")   # si nadie lo importó, no hay DataFrames
+    if pd is not None and isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if hasattr(uso, "sum") else uso)
+    return sys.getsizeof(valor)
+
+
+def solo_lectura(valor):
+    """
+    Marca como no modificables los arreglos de NumPy dentro de `valor`
+    (también en tuplas, listas y dicts). Lo que se guarda en una caché
+    compartida se devuelve así: quien lo reciba no necesita copiarlo y un
+    intento de modificarlo falla en vez de corromper la caché.
+
+    Los DataFrame y Series de pandas no quedan protegidos: con
+    copy-on-write lo que se derive de ellos es una copia, pero df.loc[...] =
+    sobre el objeto guardado lo modifica. No se deben modificar en el lugar.
+    """
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (tuple, list)):
+        for v in valor:
+            solo_lectura(v)
+    elif isinstance(valor, dict):
+        for v in valor.values():
+            solo_lectura(v)
+    return valor
+
+
+# ==================================================
+# Almacenamiento comprimido de entradas frías
+# ==================================================
+class Comprimido:
+    __slots__ = ("datos",)
+
+    def __init__(self, datos):
+        self.datos = datos
+
+
+def _reducir_precision(valor):
+    if isinstance(valor, np.ndarray) and valor.dtype == np.float64:
+        return valor.astype(np.float32)
+    if isinstance(valor, tuple):
+        return tuple(_reducir_precision(v) for v in valor)
+    if isinstance(valor, list):
+        return [_reducir_precision(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _reducir_precision(v) for k, v in valor.items()}
+    return valor
+
+
+def comprimir(valor):
+    if MODO_FRIO == "float32":
+        valor = _reducir_precision(valor)
+    return Comprimido(zlib.compress(pickle.dumps(valor, pickle.HIGHEST_PROTOCOL), 1))
+
+
+def descomprimir(comprimido):
+    return solo_lectura(pickle.loads(zlib.decompress(comprimido.datos)))
+
+
+# ==================================================
+# Presupuesto
+# ==================================================
+class _Anotacion:
+    __slots__ = ("cache", "clave", "tamano", "costo", "prioridad", "ultimo_uso", "comprimida")
+
+    def __init__(self, cache, clave, tamano, costo, prioridad):
+        self.cache = cache
+        self.clave = clave
+        self.tamano = tamano
+        self.costo = costo or COSTO_DESCONOCIDO
+        self.prioridad = prioridad
+        self.ultimo_uso = time.monotonic()
+        self.comprimida = False
+
+
+class Presupuesto:
+    """
+    Contabilidad de las entradas de todas las cachés. Las cachés deben
+    tener `nombre` y `desalojar(clave)`; si además tienen
+    `comprimir(clave)` (devuelve el nuevo tamaño o None) sus entradas frías
+    se pueden comprimir. Las cachés llaman a anotar / usar / quitar sin
+    tener tomado su propio lock.
+    """
+
+    def __init__(self, limite):
+        self.limite = limite
+        self.total = 0
+        self._l = 0.0           # "inflación" de GreedyDual-Size
+        self._anotaciones = {}  # (id(cache), clave) -> _Anotacion
+        self._lock = threading.Lock()
+        self._ajustando = threading.Lock()
+
+    def _prioridad(self, anotacion):
+        return self._l + anotacion.costo / max(anotacion.tamano, 1)
+
+    def anotar(self, cache, clave, tamano, costo=0.0):
+        """Registra (o reemplaza) una entrada; ajusta si se pasó del presupuesto."""
+        with self._lock:
+            anterior = self._anotaciones.pop((id(cache), clave), None)
+            if anterior is not None:
+                self.total -= anterior.tamano
+                costo = costo or anterior.costo
+            anotacion = _Anotacion(cache, clave, tamano, costo, 0.0)
+            anotacion.prioridad = self._prioridad(anotacion)
+            self._anotaciones[(id(cache), clave)] = anotacion
+            self.total += tamano
+            excedido = self.total > self.limite
+        if excedido:
+            self.ajustar()
+
+    def usar(self, cache, clave):
+        with self._lock:
+            anotacion = self._anotaciones.get((id(cache), clave))
+            if anotacion is not None:
+                anotacion.ultimo_uso = time.monotonic()
+                anotacion.prioridad = self._prioridad(anotacion)
+
+    def quitar(self, cache, clave):
+        with self._lock:
+            anotacion = self._anotaciones.pop((id(cache), clave), None)
+            if anotacion is not None:
+                self.total -= anotacion.tamano
+
+    def quitar_todo(self, cache):
+        with self._lock:
+            for llave in [k for k in self._anotaciones if k[0] == id(cache)]:
+                self.total -= self._anotaciones.pop(llave).tamano
+
+    def uso_por_cache(self):
+        uso = {}
+        with self._lock:
+            for anotacion in self._anotaciones.values():
+                nombre = anotacion.cache.nombre
+                uso[nombre] = uso.get(nombre, 0) + anotacion.tamano
+        return uso
+
+    def ajustar(self):
+        """Comprime entradas frías y desaloja hasta bajar a OBJETIVO × límite."""
+        if not self._ajustando.acquire(blocking=False):
+            return   # otro hilo ya está ajustando
+        try:
+            objetivo = self.limite * OBJETIVO
+            if MODO_FRIO != "no":
+                self._comprimir_frias(objetivo)
+            self._desalojar(objetivo)
+        finally:
+            self._ajustando.release()
+
+    def _comprimir_frias(self, objetivo):
+        frontera = time.monotonic() - FRIO_SEGUNDOS
+        with self._lock:
+            candidatas = sorted(
+                (a for a in self._anotaciones.values()
+                 if not a.comprimida and a.ultimo_uso < frontera and a.tamano >= MINIMO_COMPRIMIR
+                 and hasattr(a.cache, "comprimir")),
+                key=lambda a: a.prioridad,
+            )
+        for anotacion in candidatas:
+            if self.total <= objetivo:
+                return
+            # Fuera del lock: comprimir cuesta CPU y toma el lock de la caché
+            nuevo = anotacion.cache.comprimir(anotacion.clave)
+            if nuevo is None:
+                continue
+            with self._lock:
+                if self._anotaciones.get((id(anotacion.cache), anotacion.clave)) is anotacion:
+                    self.total += nuevo - anotacion.tamano
+                    anotacion.tamano = nuevo
+                    anotacion.comprimida = True
+            DESALOJOS.incrementar(cache=anotacion.cache.nombre, motivo="comprimida")
+
+    def _desalojar(self, objetivo):
+        with self._lock:
+            victimas = []
+            total = self.total
+            for anotacion in sorted(self._anotaciones.values(), key=lambda a: a.prioridad):
+                if total <= objetivo:
+                    break
+                victimas.append(anotacion)
+                total -= anotacion.tamano
+                self._l = max(self._l, anotacion.prioridad)
+        for anotacion in victimas:
+            anotacion.cache.desalojar(anotacion.clave)
+            self.quitar(anotacion.cache, anotacion.clave)
+            DESALOJOS.incrementar(cache=anotacion.cache.nombre, motivo="presupuesto")
+
+
+presupuesto = Presupuesto(PRESUPUESTO_BYTES)
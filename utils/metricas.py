@@ -0,0 +1,303 @@
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from dash.exceptions import PreventUpdate
+
+from utils import perfilado
+
+# ==================================================
+# Métricas por callback (latencia, tamaño, disparador)
+# ==================================================
+# Cada callback registrado se envuelve para medir cuánto tarda en total y
+# cuánto de eso es cálculo (la función de la página), armado de figuras y
+# serialización a JSON. "figura" es lo que corre dentro de medir_fase:
+# los constructores de utils/figuras.py, la codificación de arreglos de
+# utils/serializacion.py y los bloques donde una página arma su figura con
+# go.Figure/add_trace; lo demás cuenta como cálculo. También se cuentan
+# los bytes (UTF-8) de la respuesta y qué input la disparó. Todo se
+# exporta en /metrics con el formato de texto de Prometheus. El mismo
+# envoltorio activa el perfilado bajo demanda (utils/perfilado.py).
+
+# Límites superiores de los buckets de los histogramas
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+FASES = ("calculo", "figura", "serializacion")
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+_local = threading.local()
+_nombres = set()
+
+
+class Histograma:
+    """Histograma acumulativo por combinación de etiquetas (como en Prometheus)."""
+
+    def __init__(self, nombre, ayuda, buckets):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observar(self, valor, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with _lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][bisect.bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+
+    def series(self):
+        """[(etiquetas, conteos por bucket, suma)] con una copia de los datos."""
+        with _lock:
+            return [(dict(k), list(v[0]), v[1]) for k, v in self._series.items()]
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for etiquetas, conteos, suma in sorted(self.series(), key=lambda s: sorted(s[0].items())):
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + ("+Inf",), conteos):
+                acumulado += conteo
+                le = limite if limite == "+Inf" else f"{limite:g}"
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(etiquetas, le=le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(etiquetas)} {suma:.9g}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(etiquetas)} {acumulado}")
+        return lineas
+
+
+class Contador:
+    """Contador monotónico por combinación de etiquetas."""
+
+    def __init__(self, nombre, ayuda):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._series = {}
+
+    def incrementar(self, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with _lock:
+            self._series[clave] = self._series.get(clave, 0) + 1
+
+    def series(self):
+        with _lock:
+            return [(dict(k), v) for k, v in self._series.items()]
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for etiquetas, valor in sorted(self.series(), key=lambda s: sorted(s[0].items())):
+            lineas.append(f"{self.nombre}{_etiquetas(etiquetas)} {valor}")
+        return lineas
+
+
+class Medidor:
+    """Valor instantáneo (gauge) que se calcula al exportar: funcion() -> [(etiquetas, valor)]."""
+
+    def __init__(self, nombre, ayuda, funcion):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} gauge"]
+        for etiquetas, valor in sorted(self.funcion(), key=lambda s: sorted(s[0].items())):
+            lineas.append(f"{self.nombre}{_etiquetas(etiquetas)} {valor}")
+        return lineas
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _etiquetas(etiquetas, **extra):
+    todas = {**etiquetas, **extra}
+    if not todas:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in todas.items()) + "}"
+
+
+DURACION = Histograma(
+    "dash_callback_duracion_segundos",
+    "Tiempo de cada callback por fase (total, calculo, figura, serializacion).",
+    BUCKETS_SEGUNDOS,
+)
+RESPUESTA_BYTES = Histograma(
+    "dash_callback_respuesta_bytes",
+    "Tamaño del JSON de respuesta de cada callback.",
+    BUCKETS_BYTES,
+)
+LLAMADAS = Contador(
+    "dash_callback_llamadas_total",
+    "Llamadas por callback, input que la disparó y resultado (ok, sin_cambios, error).",
+)
+
+# Métricas que se exportan en /metrics; otros módulos agregan las suyas
+# con registrar() (p. ej. las de las APIs externas en utils/http.py)
+_registro = [DURACION, RESPUESTA_BYTES, LLAMADAS]
+
+
+def registrar(metrica):
+    _registro.append(metrica)
+    return metrica
+
+
+# ==================================================
+# Últimas llamadas y memoria del proceso (panel /admin/rendimiento)
+# ==================================================
+# Los histogramas acumulan desde que arrancó el proceso; para ver lo que
+# pasa ahora se guardan también las últimas llamadas en anillos de tamaño
+# fijo (deque con maxlen: agregar es O(1) y seguro entre hilos). Con
+# varios workers cada proceso tiene los suyos.
+
+TAMANO_RECIENTES = 2000
+INTERVALO_MEMORIA = 1.0   # s mínimos entre muestras de memoria
+
+# (marca, callback, total s, {fase: s}, bytes, resultado)
+RECIENTES = deque(maxlen=TAMANO_RECIENTES)
+# (marca, bytes residentes)
+MEMORIA = deque(maxlen=600)
+
+
+def memoria_proceso():
+    """(residente actual, pico) en bytes del proceso (worker) actual."""
+    try:
+        import resource   # solo Unix
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024   # KiB en Linux
+    except ImportError:
+        pico = 0
+    try:
+        with open("/proc/self/statm") as f:
+            actual = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        actual = pico   # sin /proc solo se conoce el pico
+    return actual, pico
+
+
+def muestrear_memoria():
+    """Agrega una muestra a MEMORIA si pasó INTERVALO_MEMORIA desde la última."""
+    ahora = time.time()
+    if MEMORIA and ahora - MEMORIA[-1][0] < INTERVALO_MEMORIA:
+        return
+    MEMORIA.append((ahora, memoria_proceso()[0]))
+
+
+registrar(Medidor(
+    "proceso_memoria_residente_bytes",
+    "Memoria residente del proceso (worker) que atiende /metrics.",
+    lambda: [({"pid": os.getpid()}, memoria_proceso()[0])],
+))
+
+
+# ==================================================
+# Fases dentro de una llamada
+# ==================================================
+@contextmanager
+def medir_fase(fase):
+    """
+    Suma el tiempo del bloque a `fase` de la llamada en curso (si hay una).
+    Sirve también como decorador. Dentro de otra fase no se cuenta de nuevo:
+    el bloque exterior ya incluye ese tiempo.
+    """
+    fases = getattr(_local, "fases", None)
+    if fases is None or getattr(_local, "fase", None) is not None:
+        yield
+        return
+    _local.fase = fase
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fases[fase] = fases.get(fase, 0.0) + time.perf_counter() - inicio
+        _local.fase = None
+
+
+def _disparador(contexto):
+    """prop_id de los inputs que dispararon el callback ("inicial" si ninguno)."""
+    disparados = getattr(contexto, "triggered_inputs", None) or []
+    return ",".join(sorted(t["prop_id"] for t in disparados)) or "inicial"
+
+
+def _instrumentar(funcion):
+    nombre = f"{funcion.__module__}.{funcion.__name__}"
+
+    @functools.wraps(funcion)
+    def medida(*args, **kwargs):
+        disparador = _disparador(kwargs.get("callback_context"))
+        _local.fases, _local.fase = {}, None
+        fases = _local.fases
+        resultado = "ok"
+        respuesta = None
+        sesion = perfilado.iniciar(nombre)
+        inicio = time.perf_counter()
+        try:
+            respuesta = funcion(*args, **kwargs)
+            return respuesta
+        except PreventUpdate:
+            resultado = "sin_cambios"
+            raise
+        except Exception:
+            resultado = "error"
+            raise
+        finally:
+            total = time.perf_counter() - inicio
+            _local.fases = None
+            if sesion is not None:
+                sesion.terminar()
+            fases["calculo"] = max(0.0, total - fases.get("figura", 0.0) - fases.get("serializacion", 0.0))
+            DURACION.observar(total, callback=nombre, fase="total")
+            for fase in FASES:
+                DURACION.observar(fases.get(fase, 0.0), callback=nombre, fase=fase)
+            if isinstance(respuesta, str):
+                # Bytes, no caracteres (el JSON puede traer tildes o emojis)
+                tamano = len(respuesta) if respuesta.isascii() else len(respuesta.encode())
+            else:
+                tamano = len(respuesta) if isinstance(respuesta, bytes) else 0
+            if tamano:
+                RESPUESTA_BYTES.observar(tamano, callback=nombre)
+            LLAMADAS.incrementar(callback=nombre, disparador=disparador, resultado=resultado)
+            RECIENTES.append((time.time(), nombre, total, fases, tamano, resultado))
+            muestrear_memoria()
+
+    medida.instrumentado = True
+    return medida
+
+
+def nombres_callbacks():
+    """Nombres (módulo.función) de los callbacks instrumentados."""
+    return sorted(_nombres)
+
+
+def instrumentar_callbacks(app):
+    """
+    Envuelve todos los callbacks de servidor registrados (con dash.callback
+    o app.callback). Se llama desde app.py después de crear la app, cuando
+    las páginas ya registraron los suyos. Los async y los clientside no se
+    tocan. Devuelve cuántos se instrumentaron.
+    """
+    import dash._callback
+
+    total = 0
+    for mapa in (dash._callback.GLOBAL_CALLBACK_MAP, app.callback_map):
+        for entrada in mapa.values():
+            funcion = entrada.get("callback")
+            if (funcion is None or getattr(funcion, "instrumentado", False)
+                    or inspect.iscoroutinefunction(funcion)):
+                continue
+            entrada["callback"] = _instrumentar(funcion)
+            _nombres.add(f"{funcion.__module__}.{funcion.__name__}")
+            total += 1
+    return total
+
+
+def exportar():
+    """Texto de /metrics en formato Prometheus."""
+    lineas = []
+    for metrica in _registro:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
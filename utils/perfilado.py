@@ -0,0 +1,250 @@
+import cProfile
+import hashlib
+import hmac
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+
+import flask
+
+# ==================================================
+# Perfilado bajo demanda de callbacks individuales
+# ==================================================
+# Un administrador arma las próximas N llamadas de un callback
+# (POST /admin/perfilado) o pide perfilar una petición concreta con la
+# cabecera X-Perfilar. Cada llamada perfilada escribe en PERFILADO_DIRECTORIO:
+#   - muestreo:     <…>.folded  pilas "a;b;c cuenta" (flamegraph.pl, speedscope)
+#   - determinista: <…>.prof    cProfile (snakeviz, speedscope) y <…>.txt resumen
+#   - siempre:      <…>.memoria.txt  mayores asignaciones según tracemalloc
+# Todo exige el token de PERFILADO_TOKEN (cabecera X-Admin-Token); sin esa
+# variable el perfilado está deshabilitado. Sin nada armado, el costo por
+# llamada es revisar un diccionario vacío.
+
+DIRECTORIO = os.environ.get(
+    "PERFILADO_DIRECTORIO",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "perfiles"),
+)
+MODOS = ("muestreo", "determinista")
+INTERVALO_MUESTREO = 0.001   # s entre muestras de la pila
+MAXIMO_ARMADO = 20           # llamadas por armado
+TOP_MEMORIA = 25             # líneas del resumen de memoria
+TOP_ESCRITOS = 20            # archivos recientes que lista /admin/perfilado
+CABECERA_TOKEN = "X-Admin-Token"
+CABECERA_PERFILAR = "X-Perfilar"
+# El navegador no puede enviar la cabecera: /admin/entrar deja esta cookie
+# (derivada del token, no el token mismo) para el panel /admin/rendimiento
+COOKIE_ADMIN = "admin_sesion"
+
+_armados = {}                 # callback -> [restantes, modo]
+_lock = threading.Lock()
+_ocupado = threading.Lock()   # tracemalloc es global: una sesión a la vez
+_escritos = deque(maxlen=TOP_ESCRITOS)
+
+
+def _token():
+    return os.environ.get("PERFILADO_TOKEN")
+
+
+def valor_cookie():
+    """Valor de COOKIE_ADMIN para el token actual (None si no hay token)."""
+    token = _token()
+    if not token:
+        return None
+    return hmac.new(token.encode(), b"admin_sesion", hashlib.sha256).hexdigest()
+
+
+def token_valido(recibido):
+    token = _token()
+    return bool(token) and hmac.compare_digest((recibido or "").encode(), token.encode())
+
+
+def autorizado(peticion):
+    """True si la petición trae el token de administrador (cabecera) o su cookie."""
+    if token_valido(peticion.headers.get(CABECERA_TOKEN)):
+        return True
+    esperado = valor_cookie()
+    recibido = peticion.cookies.get(COOKIE_ADMIN, "")
+    return esperado is not None and hmac.compare_digest(recibido.encode(), esperado.encode())
+
+
+# ==================================================
+# Armado
+# ==================================================
+def armar(callback, n=1, modo="muestreo"):
+    """Perfila las próximas `n` llamadas de `callback` (módulo.función)."""
+    if modo not in MODOS:
+        raise ValueError(f"modo debe ser uno de {MODOS}")
+    n = max(1, min(int(n), MAXIMO_ARMADO))
+    with _lock:
+        _armados[callback] = [n, modo]
+    return n
+
+
+def desarmar(callback=None):
+    with _lock:
+        if callback is None:
+            _armados.clear()
+        else:
+            _armados.pop(callback, None)
+
+
+def estado():
+    """Armados pendientes y últimos archivos escritos (para /admin/perfilado)."""
+    with _lock:
+        armados = {c: {"restantes": r, "modo": m} for c, (r, m) in _armados.items()}
+        return {"directorio": DIRECTORIO, "armados": armados, "escritos": list(_escritos)}
+
+
+def _consumir(callback):
+    with _lock:
+        armado = _armados.get(callback)
+        if armado is None:
+            return None
+        armado[0] -= 1
+        if armado[0] <= 0:
+            del _armados[callback]
+        return armado[1]
+
+
+def _devolver(callback, modo):
+    with _lock:
+        armado = _armados.setdefault(callback, [0, modo])
+        armado[0] += 1
+
+
+def _modo_por_cabecera():
+    if not flask.has_request_context():
+        return None
+    modo = flask.request.headers.get(CABECERA_PERFILAR)
+    if not modo:
+        return None
+    if not autorizado(flask.request):
+        return None
+    return modo if modo in MODOS else "muestreo"
+
+
+# ==================================================
+# Sesión de perfilado
+# ==================================================
+class _Muestreador:
+    """Toma la pila del hilo del callback cada INTERVALO_MUESTREO segundos."""
+
+    def __init__(self, hilo):
+        self.pilas = Counter()
+        self._hilo = hilo
+        self._fin = threading.Event()
+        self._thread = threading.Thread(target=self._ciclo, name="perfilado", daemon=True)
+
+    def _ciclo(self):
+        while not self._fin.wait(INTERVALO_MUESTREO):
+            frame = sys._current_frames().get(self._hilo)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            if pila:
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def iniciar(self):
+        self._thread.start()
+
+    def detener(self):
+        self._fin.set()
+        self._thread.join()
+
+
+class Sesion:
+    def __init__(self, callback, modo):
+        self.callback = callback
+        self.modo = modo
+        self._perfil = None
+        self._muestreador = None
+
+    def iniciar(self):
+        self._detener_traza = not tracemalloc.is_tracing()
+        tracemalloc.start()
+        self._memoria = tracemalloc.take_snapshot()
+        if self.modo == "determinista":
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        else:
+            self._muestreador = _Muestreador(threading.get_ident())
+            self._muestreador.iniciar()
+        self._inicio = time.perf_counter()
+        return self
+
+    def terminar(self):
+        duracion = time.perf_counter() - self._inicio
+        if self._perfil is not None:
+            self._perfil.disable()
+        if self._muestreador is not None:
+            self._muestreador.detener()
+        despues = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        if self._detener_traza:
+            tracemalloc.stop()
+        try:
+            self._escribir(duracion, despues.compare_to(self._memoria, "lineno"), pico)
+        finally:
+            _ocupado.release()
+
+    def _escribir(self, duracion, diferencias, pico):
+        os.makedirs(DIRECTORIO, exist_ok=True)
+        marca = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        nombre = re.sub(r"[^\w.-]", "_", self.callback)
+        base = os.path.join(DIRECTORIO, f"{marca}_{nombre}")
+        archivos = []
+
+        if self._perfil is not None:
+            self._perfil.dump_stats(f"{base}.prof")
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                pstats.Stats(self._perfil, stream=f).sort_stats("cumulative").print_stats(40)
+            archivos += [f"{base}.prof", f"{base}.txt"]
+        else:
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                for pila, cuenta in self._muestreador.pilas.most_common():
+                    f.write(f"{pila} {cuenta}\n")
+            archivos.append(f"{base}.folded")
+
+        with open(f"{base}.memoria.txt", "w", encoding="utf-8") as f:
+            f.write(f"callback: {self.callback}\nduracion: {duracion * 1000:.1f} ms\n")
+            f.write(f"pico de memoria trazada: {pico / 1024:.1f} KiB\n\n")
+            for diferencia in diferencias[:TOP_MEMORIA]:
+                f.write(f"{diferencia}\n")
+        archivos.append(f"{base}.memoria.txt")
+
+        with _lock:
+            _escritos.extend(os.path.basename(a) for a in archivos)
+        print(f"[PERFILADO] {self.callback}: {duracion * 1000:.1f} ms -> {base}.*")
+
+
+def iniciar(callback):
+    """
+    Sesión de perfilado ya iniciada si esta llamada de `callback` debe
+    perfilarse (armada o con cabecera X-Perfilar), o None. Lo llama el
+    envoltorio de utils/metricas.py; quien la recibe debe llamar terminar().
+    """
+    if not _armados and not _token():
+        return None
+    modo = _consumir(callback) if _armados else None
+    armado = modo is not None
+    modo = modo or _modo_por_cabecera()
+    if modo is None:
+        return None
+    if not _ocupado.acquire(blocking=False):
+        # Otra sesión en curso: se reintenta en la próxima llamada
+        if armado:
+            _devolver(callback, modo)
+        return None
+    try:
+        return Sesion(callback, modo).iniciar()
+    except Exception:
+        _ocupado.release()
+        raise
@@ -0,0 +1,247 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import cache, memoria, metricas
+
+# ==================================================
+# Refresco en segundo plano (stale-while-revalidate)
+# ==================================================
+# Cada fuente externa se registra con una función que descarga y procesa
+# sus datos. Los usuarios reciben siempre el último valor bueno de inmediato
+# (con su antigüedad) y la recarga ocurre en segundo plano poco antes de
+# que expire.
+# Con varios workers (gunicorn.conf.py, CACHE_BACKEND=sqlite) cada recarga
+# se publica en la caché compartida: si otro worker ya trajo un valor
+# reciente, se adopta en vez de volver a llamar a la API.
+# Los botones "Actualizar" piden obtener(..., forzar=True): esperan una
+# recarga inmediata salvo que el valor tenga menos de MINIMO_FORZADO
+# segundos (así varios clics seguidos no vuelven a golpear la API).
+
+# Configuración por fuente (segundos). Se puede sobrescribir con variables
+# de entorno, p. ej. REFRESCO_COVID_INTERVALO=900 o REFRESCO_CLIMA_JITTER=30
+FUENTES = {
+    "clima": {"intervalo": 600, "jitter": 60, "anticipacion": 60},
+    "covid": {"intervalo": 1800, "jitter": 120, "anticipacion": 120},
+    "sunat": {"intervalo": 900, "jitter": 60, "anticipacion": 60},
+}
+
+# Resultado de cada lectura (fresco, vencido, espera, forzado, sin_datos)
+# y de cada recarga (ok, fallo, adoptado de otro worker), exportados en
+# /metrics
+LECTURAS = metricas.registrar(metricas.Contador(
+    "refresco_lecturas_total",
+    "Lecturas de datos externos por fuente y resultado de la caché.",
+))
+RECARGAS = metricas.registrar(metricas.Contador(
+    "refresco_recargas_total",
+    "Recargas en segundo plano por fuente y resultado.",
+))
+
+# Claves que nadie pide durante tantos intervalos dejan de refrescarse
+INTERVALOS_INACTIVIDAD = 6
+TICK = 5
+# Un "Actualizar" no recarga valores más nuevos que esto (segundos)
+MINIMO_FORZADO = float(os.environ.get("REFRESCO_MINIMO_FORZADO", 30))
+
+
+def configuracion_fuente(nombre):
+    """Configuración de una fuente con los overrides del entorno aplicados."""
+    config = dict(FUENTES.get(nombre, {"intervalo": 600, "jitter": 60, "anticipacion": 60}))
+    for campo in config:
+        valor = os.environ.get(f"REFRESCO_{nombre.upper()}_{campo.upper()}")
+        if valor:
+            config[campo] = float(valor)
+    return config
+
+
+def formatear_edad(segundos):
+    if segundos is None:
+        return "sin datos"
+    if segundos < 60:
+        return "hace unos segundos"
+    if segundos < 3600:
+        return f"hace {int(segundos // 60)} min"
+    return f"hace {segundos / 3600:.1f} h"
+
+
+class _Entrada:
+    __slots__ = ("valor", "obtenido", "proximo", "ultimo_uso")
+
+    def __init__(self, valor, obtenido, proximo):
+        self.valor = valor
+        self.obtenido = obtenido
+        self.proximo = proximo
+        self.ultimo_uso = obtenido
+
+
+class Refrescador:
+    nombre = "refresco"   # en el presupuesto de memoria (utils/memoria.py)
+
+    def __init__(self, hilos=4):
+        self._hilos = hilos
+        self._fuentes = {}
+        self._entradas = {}
+        self._compartida = None
+        self._preparar_hilos()
+        self._hilo = None
+        # Los hilos no sobreviven a un fork (gunicorn con preload_app):
+        # cada worker crea los suyos y retoma el planificador
+        os.register_at_fork(after_in_child=self._tras_fork)
+
+    def _preparar_hilos(self):
+        self._en_curso = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self._hilos, thread_name_prefix="refresco")
+
+    def _tras_fork(self):
+        activo = self._hilo is not None
+        self._preparar_hilos()
+        self._hilo = None
+        if activo:
+            self.iniciar()
+
+    # ------------------------- registro -------------------------
+    def registrar(self, nombre, funcion):
+        """
+        Registra una fuente. `funcion(*clave)` debe devolver los datos
+        procesados o None si la descarga falló.
+        """
+        self._fuentes[nombre] = (funcion, configuracion_fuente(nombre))
+
+    # ------------------------- lectura -------------------------
+    def obtener(self, nombre, *clave, forzar=False):
+        """
+        Devuelve (valor, edad_en_segundos). Si hay un valor guardado se
+        devuelve al instante aunque esté vencido (y se agenda su recarga).
+        Solo la primera petición de una clave espera a la descarga, o una
+        con `forzar` si el valor tiene al menos MINIMO_FORZADO segundos (si
+        esa recarga falla, se devuelve el último valor bueno).
+        """
+        ahora = time.time()
+        futuro = None
+        with self._lock:
+            entrada = self._entradas.get((nombre, clave))
+            if entrada is None:
+                futuro = self._agendar(nombre, clave)
+            elif forzar and ahora - entrada.obtenido >= MINIMO_FORZADO:
+                entrada.ultimo_uso = ahora
+                futuro = self._agendar(nombre, clave, vigencia=MINIMO_FORZADO)
+            else:
+                entrada.ultimo_uso = ahora
+                vencido = ahora >= entrada.proximo
+                if vencido:
+                    self._agendar(nombre, clave)
+                valor, obtenido = entrada.valor, entrada.obtenido
+
+        if futuro is None:
+            # Fuera del lock: el presupuesto toma el suyo y puede llamar a
+            # desalojar(), que toma self._lock (mismo orden que al desalojar)
+            memoria.presupuesto.usar(self, (nombre, clave))
+            LECTURAS.incrementar(fuente=nombre, resultado="vencido" if vencido else "fresco")
+            return valor, ahora - obtenido
+
+        forzado = entrada is not None
+        futuro.result()
+        with self._lock:
+            entrada = self._entradas.get((nombre, clave))
+        if entrada is None:
+            LECTURAS.incrementar(fuente=nombre, resultado="sin_datos")
+            return None, None
+        LECTURAS.incrementar(fuente=nombre, resultado="forzado" if forzado else "espera")
+        return entrada.valor, time.time() - entrada.obtenido
+
+    # ------------------------- recarga -------------------------
+    def _agendar(self, nombre, clave, vigencia=None):
+        """Lanza la recarga de una clave si no hay otra en curso (con lock)."""
+        futuro = self._en_curso.get((nombre, clave))
+        if futuro is None:
+            futuro = self._pool.submit(self._recargar, nombre, clave, vigencia)
+            self._en_curso[(nombre, clave)] = futuro
+        return futuro
+
+    def _cache_compartida(self):
+        """CacheSQLite común a todos los workers, o None con el backend en memoria."""
+        if self._compartida is None and cache.backend() == "sqlite":
+            ttl = max(c["intervalo"] for _, c in self._fuentes.values()) * INTERVALOS_INACTIVIDAD
+            self._compartida = cache.CacheSQLite("refresco", ttl)
+        return self._compartida
+
+    def _recargar(self, nombre, clave, vigencia=None):
+        """`vigencia`: antigüedad máxima (s) de un valor de otro worker para adoptarlo."""
+        funcion, config = self._fuentes[nombre]
+        if vigencia is None:
+            vigencia = config["intervalo"] - config["anticipacion"]
+        compartida = self._cache_compartida()
+        reciente = compartida.obtener((nombre, clave)) if compartida else None
+        if reciente is not None and time.time() - reciente[1] < vigencia:
+            # Otro worker ya lo recargó: se adopta su valor y su antigüedad
+            valor, obtenido = reciente
+            costo = 0.0
+            RECARGAS.incrementar(fuente=nombre, resultado="adoptado")
+        else:
+            inicio = time.perf_counter()
+            try:
+                valor = funcion(*clave)
+            except Exception as e:
+                print(f"[REFRESCO] Error al recargar {nombre}{clave}: {e}")
+                valor = None
+            costo = time.perf_counter() - inicio
+            obtenido = time.time()
+            RECARGAS.incrementar(fuente=nombre, resultado="fallo" if valor is None else "ok")
+            if valor is not None and compartida:
+                compartida.guardar((nombre, clave), (valor, obtenido))
+
+        ahora = time.time()
+        with self._lock:
+            self._en_curso.pop((nombre, clave), None)
+            entrada = self._entradas.get((nombre, clave))
+            if valor is None:
+                # Se conserva el último valor bueno; se reintenta en un tick
+                if entrada is not None:
+                    entrada.proximo = ahora + TICK
+                return
+            proximo = max(
+                obtenido
+                + config["intervalo"]
+                - config["anticipacion"]
+                + random.uniform(-config["jitter"], config["jitter"]),
+                ahora + TICK,
+            )
+            nueva = _Entrada(valor, obtenido, proximo)
+            if entrada is not None:
+                nueva.ultimo_uso = entrada.ultimo_uso
+            self._entradas[(nombre, clave)] = nueva
+        memoria.presupuesto.anotar(self, (nombre, clave), memoria.tamano_bytes(valor), costo)
+
+    def desalojar(self, llave):
+        """Lo llama el presupuesto de memoria: la próxima lectura esperará la descarga."""
+        with self._lock:
+            self._entradas.pop(llave, None)
+
+    def _ciclo(self):
+        while True:
+            time.sleep(TICK)
+            ahora = time.time()
+            inactivas = []
+            with self._lock:
+                for (nombre, clave), entrada in list(self._entradas.items()):
+                    intervalo = self._fuentes[nombre][1]["intervalo"]
+                    if ahora - entrada.ultimo_uso > INTERVALOS_INACTIVIDAD * intervalo:
+                        del self._entradas[(nombre, clave)]
+                        inactivas.append((nombre, clave))
+                    elif ahora >= entrada.proximo:
+                        self._agendar(nombre, clave)
+            for llave in inactivas:
+                memoria.presupuesto.quitar(self, llave)
+
+    def iniciar(self):
+        """Arranca el planificador (una vez por proceso)."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ciclo, name="refrescador", daemon=True)
+            self._hilo.start()
+
+
+refrescador = Refrescador()
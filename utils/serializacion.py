@@ -0,0 +1,109 @@
+import numbers
+
+import numpy as np
+import plotly.io as pio
+from _plotly_utils.utils import to_typed_array_spec
+from dash import Patch
+from plotly.basedatatypes import BaseFigure
+from plotly.io.json import to_json_plotly
+
+from utils.figuras import a_webgl
+from utils.metricas import medir_fase
+
+# ==================================================
+# Serialización binaria de figuras en las respuestas de callbacks
+# ==================================================
+# plotly.js decodifica de forma nativa los typed arrays en base64
+# ({"dtype": "f8", "bdata": "..."}). Aquí se codifican así todos los
+# arreglos numéricos de las trazas (arrays de NumPy y listas largas de
+# números) y el resto se serializa con orjson si está instalado.
+#
+# Dash no ofrece un punto de extensión para serializar las respuestas de
+# callbacks (dash.hooks no lo tiene), así que se reemplaza su to_json. Las
+# versiones probadas están fijadas en requeriment.txt y
+# activar_serializacion_binaria() falla al arrancar si ese punto cambió.
+
+# Listas numéricas más cortas se dejan como JSON (no compensa)
+LARGO_MINIMO = 16
+
+try:
+    import orjson  # noqa: F401
+    MOTOR_JSON = "orjson"
+except ImportError:
+    MOTOR_JSON = "json"
+
+
+def _es_numerica(lista):
+    return all(
+        isinstance(v, numbers.Real) and not isinstance(v, bool) for v in lista
+    )
+
+
+def _codificar_valor(valor):
+    """Typed array si `valor` es un arreglo numérico; si no, lo deja igual."""
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind in "fiu" and valor.size >= LARGO_MINIMO:
+            return to_typed_array_spec(valor)
+        return valor
+    if isinstance(valor, (list, tuple)) and len(valor) >= LARGO_MINIMO and _es_numerica(valor):
+        return to_typed_array_spec(np.asarray(valor, dtype="float64"))
+    if isinstance(valor, dict) and "bdata" not in valor:
+        return {k: _codificar_valor(v) for k, v in valor.items()}
+    return valor
+
+
+def codificar_figura(figura):
+    """
+    Devuelve la figura (go.Figure, dict o Patch) como estructura JSON con
+    los arreglos de las trazas codificados en base64.
+    """
+    if isinstance(figura, Patch):
+        patch = figura.to_plotly_json()
+        for op in patch["operations"]:
+            if op["location"][:1] == ["data"] and "value" in op["params"]:
+                op["params"]["value"] = _codificar_valor(op["params"]["value"])
+        return patch
+
+    if isinstance(figura, BaseFigure):
+        # Traza por traza: evita la copia profunda de la figura entera
+        figura = {"data": [traza.to_plotly_json() for traza in figura.data],
+                  "layout": figura.layout.to_plotly_json()}
+    if isinstance(figura, dict) and isinstance(figura.get("data"), (list, tuple)):
+        figura = dict(figura)
+        figura["data"] = [_codificar_valor(a_webgl(traza)) for traza in figura["data"]]
+    return figura
+
+
+def a_json(valor):
+    """
+    Reemplazo de dash._utils.to_json: en las respuestas de callbacks
+    codifica las props `figure` y serializa con el motor rápido.
+    """
+    if isinstance(valor, dict) and isinstance(valor.get("response"), dict):
+        with medir_fase("figura"):
+            for props in valor["response"].values():
+                if isinstance(props, dict) and "figure" in props:
+                    props["figure"] = codificar_figura(props["figure"])
+    with medir_fase("serializacion"):
+        return to_json_plotly(valor, engine=MOTOR_JSON)
+
+
+def activar_serializacion_binaria():
+    """Activa la serialización binaria en toda la app (se llama desde app.py)."""
+    import inspect
+
+    import dash
+    import dash._callback
+    import dash._utils
+
+    original = getattr(dash._callback, "to_json", None)
+    if original is a_json:
+        return
+    if (original is not dash._utils.to_json
+            or list(inspect.signature(original).parameters) != ["value"]):
+        raise RuntimeError(
+            f"dash {dash.__version__}: dash._callback.to_json ya no es el punto de "
+            "serialización esperado; revisar utils/serializacion.py antes de actualizar dash"
+        )
+    pio.json.config.default_engine = MOTOR_JSON
+    dash._callback.to_json = a_json
@@ -0,0 +1,167 @@
+import numpy as np
+
+# ==================================================
+# Pirámide multirresolución y reducción de puntos
+# ==================================================
+
+# Columnas acumuladas: al agregar se toma el último valor del periodo.
+# El resto (diarios, promedios, tasas) se agrega con la media.
+COLUMNAS_ACUMULADAS = ("casos", "muertes")
+
+NIVELES = (
+    ("diario", None),
+    ("semanal", "W"),
+    ("mensual", "MS"),
+)
+
+# Puntos por píxel de ancho de la gráfica
+PUNTOS_POR_PIXEL = 0.5
+PRESUPUESTO_MIN = 100
+PRESUPUESTO_DEFECTO = 400
+
+
+def presupuesto_puntos(ancho_px):
+    """Número máximo de puntos por traza según el ancho de la gráfica."""
+    if not ancho_px:
+        return PRESUPUESTO_DEFECTO
+    return max(PRESUPUESTO_MIN, int(ancho_px * PUNTOS_POR_PIXEL))
+
+
+def construir_piramide(df):
+    """
+    Precalcula los niveles diario, semanal y mensual de una serie indexada
+    por fecha. Se hace una vez por ingesta y se guarda junto a los datos.
+    """
+    agregacion = {
+        col: ("last" if col in COLUMNAS_ACUMULADAS else "mean") for col in df.columns
+    }
+    piramide = {}
+    for nombre, regla in NIVELES:
+        piramide[nombre] = df if regla is None else df.resample(regla).agg(agregacion)
+    return piramide
+
+
+def lttb(x, y, n):
+    """
+    Largest-Triangle-Three-Buckets: devuelve los índices de `n` puntos que
+    conservan la forma de la curva (siempre incluye el primero y el último).
+    Los valores NaN se tratan como 0 al elegir puntos.
+    """
+    total = len(y)
+    if n >= total or n < 3:
+        return np.arange(total)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.nan_to_num(np.asarray(y, dtype="float64"))
+
+    bordes = np.linspace(1, total - 1, n - 1).astype(int)
+    indices = np.empty(n, dtype=int)
+    indices[0] = 0
+    indices[-1] = total - 1
+
+    a = 0
+    for i in range(n - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        sig_ini, sig_fin = bordes[i + 1], (bordes[i + 2] if i + 2 < n - 1 else total)
+        media_x = x[sig_ini:sig_fin].mean()
+        media_y = y[sig_ini:sig_fin].mean()
+
+        areas = np.abs(
+            (x[a] - media_x) * (y[ini:fin] - y[a])
+            - (x[a] - x[ini:fin]) * (media_y - y[a])
+        )
+        a = ini + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+def ventana_desde_relayout(relayout):
+    """
+    Extrae el rango del eje x de `relayoutData`.
+    Devuelve (inicio, fin), "auto" si se pidió autorange, o None si el
+    evento no cambia el eje x (p. ej. {"autosize": True}).
+    """
+    if not relayout:
+        return None
+    if relayout.get("xaxis.autorange"):
+        return "auto"
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    if "xaxis.range" in relayout:
+        return tuple(relayout["xaxis.range"][:2])
+    return None
+
+
+def seleccionar_nivel(piramide, columnas, presupuesto, ventana=None):
+    """
+    Devuelve (nombre_nivel, {columna: Serie}) con el nivel más fino cuya
+    cantidad de puntos en la ventana cabe en el presupuesto. Si ninguno cabe,
+    reduce el nivel más grueso con LTTB. Así el tamaño por traza queda
+    acotado sin importar la longitud del histórico.
+    """
+    inicio = fin = None
+    if ventana not in (None, "auto"):
+        import pandas as pd  # perezoso: solo lo usan las páginas con series de tiempo
+
+        inicio, fin = pd.Timestamp(ventana[0]), pd.Timestamp(ventana[1])
+        margen = (fin - inicio) / 2
+        inicio, fin = inicio - margen, fin + margen
+
+    for nombre, _ in NIVELES:
+        df = piramide[nombre].loc[inicio:fin]
+        if len(df) <= presupuesto:
+            return nombre, {col: df[col] for col in columnas}
+
+    x = df.index.asi8
+    seleccion = {}
+    for col in columnas:
+        idx = lttb(x, df[col].to_numpy(), presupuesto)
+        seleccion[col] = df[col].iloc[idx]
+    return nombre + " (LTTB)", seleccion
+
+
+def indices_reduccion(series, presupuesto, obligatorios=()):
+    """
+    Índices comunes para reducir varias trayectorias que comparten el eje x
+    (p. ej. S, I, R de un solver) a lo sumo ~`presupuesto` puntos.
+
+    Divide la serie en bloques y conserva, para cada trayectoria, el mínimo y
+    el máximo de cada bloque (así no se pierden picos), además de los extremos
+    y los índices `obligatorios` (p. ej. el pico de infectados).
+    """
+    series = [np.asarray(s, dtype="float64") for s in series]
+    n = len(series[0])
+    if n <= presupuesto:
+        return np.arange(n)
+
+    # Se empieza con presupuesto/2 bloques y se reduce si la unión de
+    # mínimos y máximos de todas las trayectorias no cabe
+    bloques = max(2, presupuesto // 2)
+    while True:
+        idx = _minimos_maximos(series, bloques, obligatorios)
+        if len(idx) <= presupuesto or bloques <= 2:
+            return idx
+        bloques = max(2, bloques * presupuesto // len(idx) - 1)
+
+
+def _minimos_maximos(series, bloques, obligatorios):
+    n = len(series[0])
+    bloque = np.arange(n) * bloques // n
+    # Posición del primer/último elemento de cada bloque en el orden (bloque, valor)
+    inicios = np.flatnonzero(np.diff(bloque, prepend=-1))
+    finales = np.append(inicios[1:], n) - 1
+
+    elegidos = [np.array([0, n - 1]), np.asarray(obligatorios, dtype=int)]
+    for y in series:
+        orden = np.lexsort((np.nan_to_num(y), bloque))
+        elegidos.append(orden[inicios])   # mínimo de cada bloque
+        elegidos.append(orden[finales])   # máximo de cada bloque
+
+    return np.unique(np.concatenate(elegidos))
+
+
+def reducir_trayectorias(t, series, presupuesto, obligatorios=()):
+    """Aplica `indices_reduccion` y devuelve (t, [series reducidas])."""
+    idx = indices_reduccion(series, presupuesto, obligatorios)
+    return np.asarray(t)[idx], [np.asarray(s)[idx] for s in series]
@@ -0,0 +1,56 @@
+from functools import lru_cache
+
+# ==================================================
+# Tema Gruvbox registrado como plantilla de plotly
+# ==================================================
+# Se registra una sola vez y queda como plantilla por defecto: las figuras
+# ya no repiten colores de fondo, fuentes y ejes, y el layout serializado es
+# mucho más pequeño que con la plantilla "plotly". El registro valida la
+# plantilla con plotly (~80 ms), así que se hace al armar la primera figura
+# (utils/figuras.py) y no al importar el módulo.
+
+FONDO = 'rgb(40,40,40)'
+FONDO_GRAFICA = 'rgb(50,48,47)'
+TEXTO = 'rgb(213,196,161)'
+DORADO = 'rgb(250,189,47)'
+GRILLA = 'rgb(80,73,69)'
+EJE = 'rgb(102,92,84)'
+VERDE_LIMA = 'rgb(184,187,38)'
+
+# Título dorado centrado y leyenda horizontal sobre la gráfica: no van en
+# la plantilla (que queda como la de plotly por defecto y afectaría a toda
+# figura), sino en las variantes de utils/figuras.py que los usan
+TITULO = dict(x=0.5, font=dict(size=20, color=DORADO))
+LEYENDA = dict(orientation='h', yanchor='bottom', y=1.02,
+               xanchor='center', x=0.5, bgcolor='rgba(0,0,0,0)')
+
+_ejes = dict(
+    showgrid=True,
+    gridcolor=GRILLA,
+    linecolor=EJE,
+    zerolinecolor=EJE,
+    mirror=True,
+)
+
+PLANTILLA = dict(
+    layout=dict(
+        paper_bgcolor=FONDO,
+        plot_bgcolor=FONDO_GRAFICA,
+        font=dict(family='Outfit', size=12, color=TEXTO),
+        xaxis=_ejes,
+        yaxis=_ejes,
+        margin=dict(l=40, r=40, t=60, b=40),
+        colorway=['rgb(250,189,47)', 'rgb(69,133,136)', 'rgb(251,73,52)',
+                  'rgb(184,187,38)', 'rgb(142,192,124)', 'rgb(211,134,155)'],
+    )
+)
+
+
+@lru_cache(maxsize=None)
+def registrar_plantilla():
+    """Registra "gruvbox" en plotly y la deja por defecto (solo la primera vez)."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    pio.templates["gruvbox"] = go.layout.Template(PLANTILLA)
+    pio.templates.default = "gruvbox"